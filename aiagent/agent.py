@@ -1,10 +1,135 @@
-from typing import List
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from time import perf_counter
+from typing import Dict, List, Optional, Set
 
-from groq import Groq
-
-from contracts.agent_contract import AgentInput, AgentOutput
+from contracts.agent_contract import AgentOutput
 from contracts.common_types import ResponseStyle
-from app.config import GROQ_API_KEY
+from contracts.trusted import AgentInput
+from aiagent.client import get_async_client, get_client
+from aiagent.context import ContextWindow, estimate_tokens
+from aiagent.reply_cache import ReplyCache
+from aiagent.templates import template_reply
+from app.config import (
+    AGENT_REPLY_BUDGET_SECONDS,
+    AGENT_TEMPLATE_FALLBACK,
+    CONTEXT_MAX_MESSAGES,
+    CONTEXT_SUMMARY_MAX_SESSIONS,
+    CONTEXT_SUMMARY_TOKENS,
+    CONTEXT_SUMMARY_TTL_SECONDS,
+    CONTEXT_TOKEN_BUDGET,
+    GROQ_API_KEY,
+    GROQ_MAX_CONNECTIONS,
+    REPLY_CACHE_MAX_ENTRIES,
+    REPLY_CACHE_MAX_REUSE,
+    REPLY_CACHE_TTL_SECONDS,
+    REPLY_CACHE_WINDOW,
+)
+from metrics.registry import REGISTRY
+
+MODEL_NAME = "llama-3.1-8b-instant"
+TEMPERATURE = 0.6
+MAX_TOKENS = 120
+
+# ======================
+# Metrics
+# ======================
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "fraudguard_llm_request_seconds",
+    "Groq chat completion latency, by outcome (ok, empty, error)",
+    ("outcome",),
+)
+LLM_ERRORS = REGISTRY.counter(
+    "fraudguard_llm_errors_total",
+    "Failed Groq chat completion calls, by exception type",
+    ("error",),
+)
+TEMPLATE_REPLIES = REGISTRY.counter(
+    "fraudguard_template_replies_total",
+    "Agent replies answered from local templates, by reason (no_api_key, llm_failed, deadline)",
+    ("reason",),
+)
+PROMPT_TOKENS = REGISTRY.histogram(
+    "fraudguard_llm_prompt_tokens",
+    "Estimated prompt tokens per LLM request",
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384),
+)
+_LLM_OK = LLM_REQUEST_SECONDS.labels("ok")
+_LLM_EMPTY = LLM_REQUEST_SECONDS.labels("empty")
+_LLM_ERROR = LLM_REQUEST_SECONDS.labels("error")
+
+
+def _record_llm_call(started: float, output: AgentOutput) -> AgentOutput:
+    (_LLM_OK if output.reply else _LLM_EMPTY).observe(perf_counter() - started)
+    return output
+
+
+def _record_llm_error(started: float, error: Exception) -> None:
+    _LLM_ERROR.observe(perf_counter() - started)
+    LLM_ERRORS.labels(type(error).__name__).inc()
+
+
+# ======================
+# Reply cache
+# ======================
+_REPLY_CACHE = ReplyCache(
+    REPLY_CACHE_MAX_ENTRIES,
+    REPLY_CACHE_TTL_SECONDS,
+    REPLY_CACHE_MAX_REUSE,
+    REPLY_CACHE_WINDOW,
+)
+
+
+def reply_cache_stats() -> Dict[str, float]:
+    return _REPLY_CACHE.stats()
+
+
+def _reply_cache_key(agent_input: AgentInput) -> Optional[bytes]:
+    if not _REPLY_CACHE.enabled:
+        return None
+    return _REPLY_CACHE.key(
+        agent_input.responseStyle.value,
+        agent_input.metadata.language,
+        agent_input.metadata.locale,
+        agent_input.history,
+        agent_input.currentMessage,
+    )
+
+
+def _cached_output(key: Optional[bytes]) -> Optional[AgentOutput]:
+    reply = _REPLY_CACHE.get(key) if key is not None else None
+    if reply is None:
+        return None
+    return AgentOutput(status="success", reply=reply)
+
+
+def _remember(key: Optional[bytes], output: AgentOutput) -> AgentOutput:
+    if key is not None and output.status == "success":
+        _REPLY_CACHE.put(key, output.reply)
+    return output
+
+
+# ======================
+# Prompt context
+# ======================
+_CONTEXT = ContextWindow(
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_MAX_MESSAGES,
+    CONTEXT_SUMMARY_TOKENS,
+    ttl_seconds=CONTEXT_SUMMARY_TTL_SECONDS,
+    max_sessions=CONTEXT_SUMMARY_MAX_SESSIONS,
+)
+
+
+def context_stats() -> Dict[str, int]:
+    return _CONTEXT.stats()
+
+
+def clear_caches() -> None:
+    # Cached replies and context summaries; counters are kept
+    _REPLY_CACHE.clear()
+    _CONTEXT.clear()
 
 
 def _build_system_prompt(style: ResponseStyle, language: str, locale: str) -> str:
@@ -67,54 +192,196 @@ def _build_conversation(history: List, current_message) -> List[dict]:
     return messages
 
 
-def generate_reply(agent_input: AgentInput) -> AgentOutput:
-    # ======================
-    # API Key from config.py
-    # ======================
-    if not GROQ_API_KEY:
-        return AgentOutput(
-            status="fail",
-            reply="",
-        )
-
-    client = Groq(api_key=GROQ_API_KEY)
-
+def _build_messages(agent_input: AgentInput) -> List[dict]:
     system_prompt = _build_system_prompt(
         agent_input.responseStyle,
         agent_input.metadata.language,
         agent_input.metadata.locale,
     )
 
+    fixed_tokens = estimate_tokens(system_prompt) + estimate_tokens(agent_input.currentMessage.text)
+    summary, recent = _CONTEXT.build(agent_input.sessionId, agent_input.history, fixed_tokens)
+
     conversation = _build_conversation(
-        agent_input.history,
+        recent,
         agent_input.currentMessage,
     )
 
-    messages = [{"role": "system", "content": system_prompt}] + conversation
+    messages = [{"role": "system", "content": system_prompt}]
+    if summary is not None:
+        # Quotes the other side, so it goes in as context from the user
+        # role; the system prompt stays fixed
+        messages.append({"role": "user", "content": summary})
+    messages += conversation
+    PROMPT_TOKENS.observe(sum(estimate_tokens(m["content"]) for m in messages))
+    return messages
 
-    try:
-        completion = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=messages,
-            temperature=0.6,
-            max_tokens=120,
+
+def _to_output(completion) -> AgentOutput:
+    reply_text = completion.choices[0].message.content.strip()
+
+    if not reply_text:
+        return AgentOutput(
+            status="fail",
+            reply="",
         )
 
-        reply_text = completion.choices[0].message.content.strip()
+    return AgentOutput(
+        status="success",
+        reply=reply_text,
+    )
 
-        if not reply_text:
-            return AgentOutput(
-                status="fail",
-                reply="",
-            )
 
-        return AgentOutput(
-            status="success",
-            reply=reply_text,
+def _failed() -> AgentOutput:
+    return AgentOutput(
+        status="fail",
+        reply="",
+    )
+
+
+def _fallback(agent_input: AgentInput, reason: str) -> AgentOutput:
+    if not AGENT_TEMPLATE_FALLBACK:
+        return _failed()
+
+    TEMPLATE_REPLIES.labels(reason).inc()
+    return AgentOutput(
+        status="success",
+        reply=template_reply(
+            agent_input.sessionId,
+            agent_input.responseStyle,
+            agent_input.metadata.language,
+            agent_input.history,
+        ),
+    )
+
+
+# ======================
+# LLM calls
+# ======================
+def _complete(agent_input: AgentInput) -> AgentOutput:
+    started = perf_counter()
+    try:
+        completion = get_client().chat.completions.create(
+            model=MODEL_NAME,
+            messages=_build_messages(agent_input),
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
         )
+        return _record_llm_call(started, _to_output(completion))
 
-    except Exception:
-        return AgentOutput(
-            status="fail",
-            reply="",
+    except Exception as e:
+        _record_llm_error(started, e)
+        return _failed()
+
+
+async def _complete_async(agent_input: AgentInput) -> AgentOutput:
+    started = perf_counter()
+    try:
+        completion = await get_async_client().chat.completions.create(
+            model=MODEL_NAME,
+            messages=_build_messages(agent_input),
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
         )
+        return _record_llm_call(started, _to_output(completion))
+
+    except Exception as e:
+        _record_llm_error(started, e)
+        return _failed()
+
+
+# ======================
+# Reply deadline
+# ======================
+# The LLM call races AGENT_REPLY_BUDGET_SECONDS. When the budget runs out
+# the turn is answered from the templates, but the call is left to finish
+# and its reply still goes into the reply cache for the next session at
+# the same point of the script. The sync path runs the call on a small
+# pool so it can stop waiting for it.
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+# Late async calls, referenced until they finish
+_LATE_CALLS: Set[asyncio.Task] = set()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=GROQ_MAX_CONNECTIONS, thread_name_prefix="llm")
+    return _POOL
+
+
+def _remember_late(key: Optional[bytes], output: AgentOutput) -> None:
+    if output.reply:
+        _remember(key, output)
+
+
+def _reply_within_budget(agent_input: AgentInput, key: Optional[bytes]) -> Optional[AgentOutput]:
+    # None when the budget ran out
+    if AGENT_REPLY_BUDGET_SECONDS <= 0:
+        return _complete(agent_input)
+
+    future = _pool().submit(_complete, agent_input)
+    try:
+        return future.result(timeout=AGENT_REPLY_BUDGET_SECONDS)
+    except FutureTimeout:
+        future.add_done_callback(lambda done: _remember_late(key, done.result()))
+        return None
+
+
+async def _reply_within_budget_async(agent_input: AgentInput, key: Optional[bytes]) -> Optional[AgentOutput]:
+    if AGENT_REPLY_BUDGET_SECONDS <= 0:
+        return await _complete_async(agent_input)
+
+    task = asyncio.ensure_future(_complete_async(agent_input))
+    done, _ = await asyncio.wait({task}, timeout=AGENT_REPLY_BUDGET_SECONDS)
+    if done:
+        return task.result()
+
+    _LATE_CALLS.add(task)
+    task.add_done_callback(_LATE_CALLS.discard)
+    task.add_done_callback(lambda late: late.cancelled() or _remember_late(key, late.result()))
+    return None
+
+
+# ======================
+# Entry
+# ======================
+def generate_reply(agent_input: AgentInput) -> AgentOutput:
+    # ======================
+    # API Key from config.py
+    # ======================
+    if not GROQ_API_KEY:
+        return _fallback(agent_input, "no_api_key")
+
+    key = _reply_cache_key(agent_input)
+    cached = _cached_output(key)
+    if cached is not None:
+        return cached
+
+    output = _reply_within_budget(agent_input, key)
+    if output is None:
+        return _fallback(agent_input, "deadline")
+    if not output.reply:
+        return _fallback(agent_input, "llm_failed")
+    return _remember(key, output)
+
+
+async def generate_reply_async(agent_input: AgentInput) -> AgentOutput:
+    if not GROQ_API_KEY:
+        return _fallback(agent_input, "no_api_key")
+
+    key = _reply_cache_key(agent_input)
+    cached = _cached_output(key)
+    if cached is not None:
+        return cached
+
+    output = await _reply_within_budget_async(agent_input, key)
+    if output is None:
+        return _fallback(agent_input, "deadline")
+    if not output.reply:
+        return _fallback(agent_input, "llm_failed")
+    return _remember(key, output)
@@ -0,0 +1,92 @@
+import threading
+from typing import Optional
+
+import httpx
+from groq import AsyncGroq, Groq
+
+from app.config import (
+    GROQ_API_KEY,
+    GROQ_BASE_URL,
+    GROQ_CONNECT_TIMEOUT_SECONDS,
+    GROQ_KEEPALIVE_EXPIRY_SECONDS,
+    GROQ_MAX_CONNECTIONS,
+    GROQ_MAX_KEEPALIVE_CONNECTIONS,
+    GROQ_MAX_RETRIES,
+    GROQ_TIMEOUT_SECONDS,
+)
+
+
+# ======================
+# Process-wide clients
+# ======================
+_CLIENT: Optional[Groq] = None
+_ASYNC_CLIENT: Optional[AsyncGroq] = None
+_LOCK = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=GROQ_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(GROQ_TIMEOUT_SECONDS, connect=GROQ_CONNECT_TIMEOUT_SECONDS)
+
+
+def get_client() -> Groq:
+    global _CLIENT
+
+    if _CLIENT is None:
+        with _LOCK:
+            if _CLIENT is None:
+                _CLIENT = Groq(
+                    api_key=GROQ_API_KEY,
+                    base_url=GROQ_BASE_URL,
+                    timeout=_timeout(),
+                    max_retries=GROQ_MAX_RETRIES,
+                    http_client=httpx.Client(limits=_limits(), timeout=_timeout()),
+                )
+
+    return _CLIENT
+
+
+def get_async_client() -> AsyncGroq:
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is None:
+        with _LOCK:
+            if _ASYNC_CLIENT is None:
+                _ASYNC_CLIENT = AsyncGroq(
+                    api_key=GROQ_API_KEY,
+                    base_url=GROQ_BASE_URL,
+                    timeout=_timeout(),
+                    max_retries=GROQ_MAX_RETRIES,
+                    http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout()),
+                )
+
+    return _ASYNC_CLIENT
+
+
+def close_clients() -> None:
+    global _CLIENT
+
+    with _LOCK:
+        client, _CLIENT = _CLIENT, None
+
+    if client is not None:
+        client.close()
+
+
+async def aclose_clients() -> None:
+    global _ASYNC_CLIENT
+
+    close_clients()
+
+    with _LOCK:
+        client, _ASYNC_CLIENT = _ASYNC_CLIENT, None
+
+    if client is not None:
+        await client.close()
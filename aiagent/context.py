@@ -0,0 +1,198 @@
+import threading
+import time
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token, the usual rule of thumb for the
+    # BPE tokenizers of the hosted models on chat text. Counting words and
+    # punctuation with a regex lands within a token or two of this and
+    # costs about 100x more, on every history message of every turn.
+    return (len(text) + 3) // 4
+
+
+_HEADER = "Earlier in this conversation (shortened):"
+_HEADER_TOKENS = estimate_tokens(_HEADER)
+
+
+# Fields that decide whether a history message is unchanged
+_ENTRY_KEY = attrgetter("sender", "text", "timestamp")
+
+
+def _bounds(history: List, count: int) -> Tuple:
+    return _ENTRY_KEY(history[0]), _ENTRY_KEY(history[count - 1])
+
+
+def _summary_line(message, words: int) -> str:
+    # The agent persona is the "user" sender
+    speaker = "You" if message.sender == "user" else "Them"
+    parts = message.text.split()
+    text = " ".join(parts[:words])
+    if len(parts) > words:
+        text += " ..."
+    return f"{speaker}: {text}"
+
+
+class _Summary(NamedTuple):
+    count: int
+    bounds: Tuple
+    lines: Tuple[str, ...]
+    tokens: Tuple[int, ...]
+    touched: float
+
+
+# ======================
+# Prompt context window
+# ======================
+# The prompt is the system prompt, the most recent history messages (at
+# most `max_messages`, and only as many as fit in `budget_tokens` with
+# the rest of the prompt) and the current message. Messages older than
+# the window are replaced by a summary: one clipped line per message,
+# trimmed from the oldest end to `summary_tokens`, sent as a user message
+# before the window (it quotes the other side, so never as system text).
+#
+# The summary is kept per session and extended with only the messages
+# that left the window since the last turn. An entry is reused only if
+# the session's history still has the first and last message it covers
+# at the same places; otherwise it is rebuilt. Unlike the validated
+# history cache this does not hash the whole prefix: a summary is lossy
+# anyway, and checking two messages keeps a turn's cost independent of
+# the conversation length.
+# The window never starts before the messages a summary already covers,
+# so on a reused entry the summary and the window do not overlap.
+class ContextWindow:
+    def __init__(
+        self,
+        budget_tokens: int,
+        max_messages: int,
+        summary_tokens: int,
+        summary_words: int = 16,
+        ttl_seconds: float = 0,
+        max_sessions: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # budget_tokens 0 sends the whole history; ttl/max_sessions 0
+        # disables the corresponding limit
+        self.budget_tokens = budget_tokens
+        self.max_messages = max_messages
+        self.summary_tokens = summary_tokens
+        self.summary_words = summary_words
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._clock = clock
+        # LRU order: the front is the least recently used session
+        self._entries: "OrderedDict[str, _Summary]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.summarized = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_tokens > 0
+
+    def build(self, session_id: str, history: List, fixed_tokens: int) -> Tuple[Optional[str], List]:
+        # Returns (summary of the older messages or None, recent messages).
+        # fixed_tokens: system prompt and current message.
+        if not self.enabled or not history:
+            return None, history
+
+        available = self.budget_tokens - fixed_tokens
+        start = self._window_start(history, available)
+        if start == 0:
+            return None, history
+
+        cached = self._cached(session_id, history)
+        if cached is not None and cached.count >= start:
+            start = cached.count
+            lines, tokens = cached.lines, cached.tokens
+        else:
+            # Extend from what is still valid, or from the start
+            done = cached.count if cached is not None else 0
+            lines, tokens = self._extend(cached, history[done:start])
+            self._store(session_id, _Summary(start, _bounds(history, start), lines, tokens, 0.0))
+
+        return self._render(lines), history[start:]
+
+    def _window_start(self, history: List, available: int) -> int:
+        # Index of the first message sent verbatim
+        limit = len(history) - self.max_messages if self.max_messages else 0
+        if limit <= 0 and sum(estimate_tokens(m.text) for m in history) <= available:
+            return 0
+
+        # Not everything fits: leave room for the summary
+        available -= self.summary_tokens + _HEADER_TOKENS
+        start = len(history)
+        while start > max(limit, 0):
+            cost = estimate_tokens(history[start - 1].text)
+            if cost > available:
+                break
+            available -= cost
+            start -= 1
+        return start
+
+    def _extend(self, cached: Optional[_Summary], messages: List) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+        lines = list(cached.lines) if cached is not None else []
+        tokens = list(cached.tokens) if cached is not None else []
+        for message in messages:
+            line = _summary_line(message, self.summary_words)
+            lines.append(line)
+            tokens.append(estimate_tokens(line))
+        self.summarized += len(messages)
+
+        # Drop the oldest lines over the summary budget
+        total = sum(tokens)
+        drop = 0
+        while drop < len(lines) and total > self.summary_tokens:
+            total -= tokens[drop]
+            drop += 1
+        return tuple(lines[drop:]), tuple(tokens[drop:])
+
+    @staticmethod
+    def _render(lines: Tuple[str, ...]) -> Optional[str]:
+        if not lines:
+            return None
+        return _HEADER + "\n" + "\n".join(lines)
+
+    def _cached(self, session_id: str, history: List) -> Optional[_Summary]:
+        with self._lock:
+            cached = self._entries.get(session_id)
+
+        if cached is not None and cached.count <= len(history) and _bounds(history, cached.count) == cached.bounds:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        return None
+
+    def _store(self, session_id: str, entry: _Summary) -> None:
+        now = self._clock()
+        entry = entry._replace(touched=now)
+        with self._lock:
+            self._entries[session_id] = entry
+            self._entries.move_to_end(session_id)
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            deadline = now - self.ttl_seconds
+            while self._entries and next(iter(self._entries.values())).touched <= deadline:
+                self._entries.popitem(last=False)
+
+        if self.max_sessions:
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "contextSummaries": len(self._entries),
+            "contextSummaryHits": self.hits,
+            "contextSummaryMisses": self.misses,
+            "contextMessagesSummarized": self.summarized,
+        }
@@ -0,0 +1,124 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+_DIGITS = re.compile(r"\d+")
+
+
+def _normalize(text: str) -> str:
+    # Campaigns send the same script with different amounts, numbers,
+    # UPI IDs and links; those are replaced so the scripts line up.
+    # Token-wise (no regex over whole tokens) to stay linear on any input.
+    words = []
+    for word in text.lower().split():
+        if "@" in word or word.startswith(("http://", "https://", "www.")):
+            word = "<id>"
+        words.append(word)
+    return _DIGITS.sub("0", " ".join(words))
+
+
+class _Reply:
+    __slots__ = ("text", "expires", "uses")
+
+    def __init__(self, text: str, expires: float):
+        self.text = text
+        self.expires = expires
+        self.uses = 0
+
+
+# ======================
+# Reply cache
+# ======================
+# Scam campaigns replay the same script across many sessions, so the same
+# conversation window keeps coming back with the same reply style. The
+# agent reply for such a window is cached, keyed on the response style,
+# language/locale and a fingerprint of the last `window` messages (both
+# sides, normalized). An entry is served at most `max_reuse` times and is
+# then dropped, so the next session at that point of the script gets a
+# fresh LLM reply instead of the same sentence over and over.
+class ReplyCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_reuse: int,
+        window: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # max_entries 0 disables the cache; ttl/max_reuse 0 means no limit
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_reuse = max_reuse
+        self.window = max(1, window)
+        self._clock = clock
+        # LRU order: the front is the least recently used entry
+        self._entries: "OrderedDict[bytes, _Reply]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.exhausted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(self, style: str, language: str, locale: str, history: List, current_message) -> bytes:
+        recent = history[-(self.window - 1):] if self.window > 1 else []
+        parts = [style, language, locale]
+        for message in recent:
+            parts.append(f"{message.sender}:{_normalize(message.text)}")
+        parts.append(f"{current_message.sender}:{_normalize(current_message.text)}")
+        return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.ttl_seconds and entry.expires <= now:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            entry.uses += 1
+            if self.max_reuse and entry.uses >= self.max_reuse:
+                # Served for the last time
+                del self._entries[key]
+                self.exhausted += 1
+            else:
+                self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.text
+
+    def put(self, key: bytes, reply: str) -> None:
+        if not reply:
+            return
+
+        with self._lock:
+            self._entries[key] = _Reply(reply, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "replyCacheEntries": len(self._entries),
+            "replyCacheHits": self.hits,
+            "replyCacheMisses": self.misses,
+            "replyCacheExpired": self.expired,
+            "replyCacheExhausted": self.exhausted,
+            "replyCacheHitRate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,109 @@
+import zlib
+from typing import Dict, List
+
+from contracts.common_types import ResponseStyle
+
+
+# ======================
+# Template replies
+# ======================
+# Local phrase bank per response style, used when the LLM is unavailable,
+# fails, or misses the reply deadline. The phrases follow the same
+# personas as the system prompts (and the same rules: no accusations, no
+# mention of scams). Picking one is a hash and a few set lookups, so it
+# answers in microseconds.
+
+_ENGLISH: Dict[ResponseStyle, List[str]] = {
+    ResponseStyle.NAIVE: [
+        "Oh okay, what do I need to do for this?",
+        "Is this from the bank? How does it work?",
+        "I did not know about this. Can you tell me more?",
+        "Okay, where should I send it?",
+        "Will it be fixed today if I do this?",
+        "What is the next step?",
+    ],
+    ResponseStyle.CONFUSED: [
+        "Sorry, I don't understand. Which account are you talking about?",
+        "I am a bit confused, can you explain again?",
+        "What do you mean exactly? I didn't get it.",
+        "Why is this happening to my account?",
+        "Can you tell me slowly what I have to do?",
+        "I am not sure what this is about, can you explain?",
+    ],
+    ResponseStyle.HESITANT: [
+        "Hmm, I am not sure about this. Who is this exactly?",
+        "Let me think about it first. Why is it so urgent?",
+        "I usually don't share these things. Is there another way?",
+        "My son handles these things, can it wait a little?",
+        "Can you send the details once more? I want to check.",
+        "I am a little worried. How do I know this is correct?",
+    ],
+    ResponseStyle.NEUTRAL: [
+        "Okay, I will look into it later.",
+        "I am busy right now, I will check it myself.",
+        "Alright, noted.",
+        "I will visit the branch and sort it out.",
+        "Okay. I have to go now.",
+        "Fine, I will handle it.",
+    ],
+}
+
+# Romanized Hindi, as typed on phones
+_HINDI: Dict[ResponseStyle, List[str]] = {
+    ResponseStyle.NAIVE: [
+        "Achha, mujhe kya karna hoga?",
+        "Yeh bank se hai kya? Kaise hota hai yeh?",
+        "Mujhe iske baare mein pata nahi tha. Thoda aur batao?",
+        "Theek hai, kahan bhejna hai?",
+        "Aaj hi ho jayega kya agar main yeh karun?",
+        "Aage kya karna hai?",
+    ],
+    ResponseStyle.CONFUSED: [
+        "Maaf kijiye, samajh nahi aaya. Kaunsa account?",
+        "Main thoda confuse hoon, phir se samjhao na?",
+        "Matlab kya hai aapka? Mujhe samajh nahi aaya.",
+        "Mere account ke saath aisa kyun ho raha hai?",
+        "Dheere dheere batao kya karna hai?",
+        "Yeh kis baare mein hai, samjha sakte ho?",
+    ],
+    ResponseStyle.HESITANT: [
+        "Hmm, mujhe pakka nahi pata. Aap kaun bol rahe ho?",
+        "Pehle sochne do. Itni jaldi kyun hai?",
+        "Main yeh sab share nahi karta. Koi aur tareeka hai?",
+        "Yeh sab mera beta dekhta hai, thoda ruk sakte ho?",
+        "Details ek baar phir bhejo, main check karna chahta hoon.",
+        "Mujhe thoda darr lag raha hai. Kaise pata yeh sahi hai?",
+    ],
+    ResponseStyle.NEUTRAL: [
+        "Theek hai, main baad mein dekh lunga.",
+        "Abhi busy hoon, khud check kar lunga.",
+        "Achha, theek hai.",
+        "Main branch jaakar dekh lunga.",
+        "Theek hai. Abhi jaana hai.",
+        "Chaliye, main sambhal lunga.",
+    ],
+}
+
+_BANKS = {
+    "en": _ENGLISH,
+    "english": _ENGLISH,
+    "hi": _HINDI,
+    "hindi": _HINDI,
+    "hinglish": _HINDI,
+}
+
+
+def template_reply(session_id: str, style: ResponseStyle, language: str, history: List) -> str:
+    # Unknown languages get English; other styles get the neutral
+    # phrases, as _build_system_prompt does
+    styles = _BANKS.get(language.strip().lower(), _ENGLISH)
+    bank = styles.get(style, styles[ResponseStyle.NEUTRAL])
+    # Start at a per-session, per-turn position so sessions don't all
+    # answer alike, and skip phrases this session already received
+    said = {m.text for m in history if m.sender == "user"}
+    start = zlib.crc32(session_id.encode("utf-8")) + len(history)
+    for offset in range(len(bank)):
+        phrase = bank[(start + offset) % len(bank)]
+        if phrase not in said:
+            return phrase
+    return bank[start % len(bank)]
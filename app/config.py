@@ -5,3 +5,115 @@ load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# ======================
+# Groq HTTP client pool
+# ======================
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20"))
+GROQ_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("GROQ_KEEPALIVE_EXPIRY_SECONDS", "30"))
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "20"))
+GROQ_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GROQ_CONNECT_TIMEOUT_SECONDS", "5"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+# Point the clients at another OpenAI-compatible endpoint (e.g. the stub
+# server of bench.replay); unset uses the Groq API
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# ======================
+# Agent reply cache
+# ======================
+# Replies reused for repeated scam scripts (same style, language/locale
+# and recent conversation window); 0 entries disables the cache. Each
+# cached reply is served at most REPLY_CACHE_MAX_REUSE times.
+REPLY_CACHE_MAX_ENTRIES = int(os.getenv("REPLY_CACHE_MAX_ENTRIES", "10000"))
+REPLY_CACHE_TTL_SECONDS = float(os.getenv("REPLY_CACHE_TTL_SECONDS", "3600"))
+REPLY_CACHE_MAX_REUSE = int(os.getenv("REPLY_CACHE_MAX_REUSE", "20"))
+# Messages (current one included) that make up the cache key
+REPLY_CACHE_WINDOW = int(os.getenv("REPLY_CACHE_WINDOW", "4"))
+
+# ======================
+# Agent reply deadline
+# ======================
+# Without a usable LLM reply (no API key, error, or no answer within
+# AGENT_REPLY_BUDGET_SECONDS) the agent answers from local templates.
+# A budget of 0 waits for the LLM.
+AGENT_TEMPLATE_FALLBACK = os.getenv("AGENT_TEMPLATE_FALLBACK", "true").lower() in ("1", "true", "yes")
+AGENT_REPLY_BUDGET_SECONDS = float(os.getenv("AGENT_REPLY_BUDGET_SECONDS", "5"))
+
+# ======================
+# Agent prompt context
+# ======================
+# Prompts hold at most CONTEXT_MAX_MESSAGES recent history messages within
+# CONTEXT_TOKEN_BUDGET (estimated) tokens; older messages are replaced by a
+# per-session summary of up to CONTEXT_SUMMARY_TOKENS. A budget of 0 sends
+# the whole history.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1024"))
+CONTEXT_MAX_MESSAGES = int(os.getenv("CONTEXT_MAX_MESSAGES", "12"))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "200"))
+CONTEXT_SUMMARY_TTL_SECONDS = float(os.getenv("CONTEXT_SUMMARY_TTL_SECONDS", "3600"))
+CONTEXT_SUMMARY_MAX_SESSIONS = int(os.getenv("CONTEXT_SUMMARY_MAX_SESSIONS", "100000"))
+
+# ======================
+# Session store
+# ======================
+# "memory" (single process) or "sqlite" (shared across uvicorn workers)
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.sqlite3")
+# Idle sessions are dropped after the TTL; beyond the cap, CLOSED sessions
+# are reclaimed first, then the least recently used (0 disables either)
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "86400"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000000"))
+# Shards of the per-session lock table that orders turns of one session
+SESSION_LOCK_SHARDS = int(os.getenv("SESSION_LOCK_SHARDS", "64"))
+
+# ======================
+# Keyword lists
+# ======================
+# Optional files (one keyword or phrase per line) extending the built-in
+# decision/extraction keyword lists
+SCAM_KEYWORDS_FILE = os.getenv("SCAM_KEYWORDS_FILE", "")
+SUSPICIOUS_KEYWORDS_FILE = os.getenv("SUSPICIOUS_KEYWORDS_FILE", "")
+
+# ======================
+# Message analysis
+# ======================
+# Analyzed messages kept for reuse across decision/extraction (by text)
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+# Characters of a message that keyword/indicator scanning looks at; the
+# rest of an oversized message is ignored (0 scans everything)
+ANALYSIS_MAX_CHARS = int(os.getenv("ANALYSIS_MAX_CHARS", "32768"))
+
+# ======================
+# Conversation history
+# ======================
+# Per-session record of the already-validated history prefix, so each turn
+# only validates the new messages (0 disables either limit)
+HISTORY_CACHE_TTL_SECONDS = float(os.getenv("HISTORY_CACHE_TTL_SECONDS", "3600"))
+HISTORY_CACHE_MAX_SESSIONS = int(os.getenv("HISTORY_CACHE_MAX_SESSIONS", "100000"))
+
+# ======================
+# Server-side history
+# ======================
+# Opt-in: keep each session's history in the session store so clients can
+# omit conversationHistory and send only the new message
+SERVER_HISTORY_ENABLED = os.getenv("SERVER_HISTORY_ENABLED", "false").lower() in ("1", "true", "yes")
+# Most recent messages kept per session (0 keeps everything)
+SERVER_HISTORY_MAX_MESSAGES = int(os.getenv("SERVER_HISTORY_MAX_MESSAGES", "50"))
+
+# ======================
+# Batch ingestion
+# ======================
+# Items accepted per /honeypot/batch call, and sessions processed at once
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "5000"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "64"))
+
+# ======================
+# Sampling profiler
+# ======================
+# Opt-in: profile one turn in PROFILE_SAMPLE_EVERY (0 disables) and dump
+# its stats to PROFILE_DIR, keeping only turns of at least
+# PROFILE_SLOW_SECONDS and the newest PROFILE_MAX_FILES dumps
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
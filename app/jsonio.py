@@ -0,0 +1,29 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib fallback
+    orjson = None
+
+
+# ======================
+# JSON at the HTTP boundary
+# ======================
+# orjson parses bytes and serializes straight to bytes, several times
+# faster than the stdlib on large conversationHistory payloads. Both paths
+# produce the same compact UTF-8 output as FastAPI's JSONResponse.
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: bytes) -> Any:
+    # Raises ValueError on invalid JSON with either backend
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -1,14 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
-from .config import API_KEY
-from orchestrator.orchestrator import handle_request
+from . import jsonio
+from .config import API_KEY, BATCH_MAX_ITEMS, GROQ_API_KEY
+from aiagent.agent import context_stats, reply_cache_stats
+from aiagent.client import aclose_clients, get_async_client, get_client
+from callback.callback import callback_stats, start_callback_worker, stop_callback_worker
+from metrics.registry import CONTENT_TYPE, REGISTRY, render_gauges
+from orchestrator.orchestrator import handle_batch_async, handle_request_async, session_stats
+from receiver.receiver import history_stats
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the pooled Groq clients once, before the first request
+    if GROQ_API_KEY:
+        get_client()
+        get_async_client()
+    start_callback_worker()
 
-@app.post("/honeypot")
-async def honeypot(request: Request):
+    yield
+
+    stop_callback_worker()
+    await aclose_clients()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def _read_payload(request: Request):
     if request.headers.get("content-type") != "application/json":
         raise HTTPException(status_code=400, detail="Invalid content type")
 
@@ -17,18 +39,60 @@ async def honeypot(request: Request):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     try:
-        payload = await request.json()
+        return jsonio.loads(await request.body())
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON")
 
+
+@app.post("/honeypot")
+async def honeypot(request: Request):
+    payload = await _read_payload(request)
+
     try:
-        result = handle_request(payload)
-        return JSONResponse(content=result)
+        result = await handle_request_async(payload)
+        return Response(content=jsonio.dumps(result), media_type="application/json")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@app.post("/honeypot/batch")
+async def honeypot_batch(request: Request):
+    # Body: a JSON array of /honeypot payloads, for any mix of sessions.
+    # Each item gets {"status", "response"} or {"status", "detail"}.
+    payloads = await _read_payload(request)
+    if not isinstance(payloads, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a JSON array")
+    if BATCH_MAX_ITEMS and len(payloads) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} items")
+
+    results = await handle_batch_async(payloads)
+    return Response(content=jsonio.dumps({"results": results}), media_type="application/json")
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "sessions": session_stats(),
+        "callbacks": callback_stats(),
+        "history": history_stats(),
+        "replyCache": reply_cache_stats(),
+        "context": context_stats(),
+    }
+
 
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text format: stage/LLM/callback histograms and counters,
+    # plus the /health stats as gauges
+    body = (
+        REGISTRY.render()
+        + render_gauges("fraudguard_session_store", session_stats())
+        + render_gauges("fraudguard_callback", callback_stats())
+        + render_gauges("fraudguard", history_stats())
+        + render_gauges("fraudguard", reply_cache_stats())
+        + render_gauges("fraudguard", context_stats())
+    )
+    return Response(content=body, media_type=CONTENT_TYPE)
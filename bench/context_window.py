@@ -0,0 +1,128 @@
+# bench/context_window.py
+#
+# Prompt size, prompt build time and LLM latency per turn with the whole
+# history in the prompt vs the token-budgeted window with a per-session
+# summary. Each conversation is replayed turn by turn (history growing
+# as a client would resend it); the LLM is the local stub, made to spend
+# --prefill-ms per prompt token so latency follows prompt size.
+#   python -m bench.context_window
+#   python -m bench.context_window --lengths 20 100 400 --budget 1024 --max-messages 12
+
+import argparse
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from bench.stubs import StubLLM
+
+
+_SCAMMER = [
+    "Dear customer, your SBI account will be blocked today because your KYC is not updated.",
+    "To avoid suspension please verify your details immediately with our officer.",
+    "Pay a refundable fee of Rs 10 to verify.kyc@okaxis and share the screenshot here.",
+    "Sir this is very urgent, after 6 pm the account will be frozen and money cannot be withdrawn.",
+    "You can also open https://sbi-kyc-update.example/verify and enter the OTP you receive.",
+    "Why are you not responding? Our manager is waiting for your confirmation.",
+]
+_AGENT = [
+    "Oh, which account is this about? I have two accounts.",
+    "I did not get any message from the bank, is this really needed today?",
+    "How do I pay it? I am not very good with these apps.",
+    "My son usually does these things, can it wait until he comes home?",
+    "The link is not opening on my phone, can you tell me what to do?",
+    "Okay, what is the next step?",
+]
+
+
+def _conversation(length: int) -> List[Dict]:
+    messages = []
+    for i in range(length):
+        bank = _SCAMMER if i % 2 == 0 else _AGENT
+        messages.append(
+            {"sender": "scammer" if i % 2 == 0 else "user", "text": bank[(i // 2) % len(bank)], "timestamp": f"t{i}"}
+        )
+    return messages
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 40, 100, 200], help="messages per conversation")
+    parser.add_argument("--budget", type=int, default=1024, help="CONTEXT_TOKEN_BUDGET")
+    parser.add_argument("--max-messages", type=int, default=12, help="CONTEXT_MAX_MESSAGES")
+    parser.add_argument("--summary-tokens", type=int, default=200, help="CONTEXT_SUMMARY_TOKENS")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="fixed seconds per stub LLM call")
+    parser.add_argument("--prefill-ms", type=float, default=0.05, help="stub LLM ms per prompt token")
+    parser.add_argument("--repeat", type=int, default=5, help="runs for the build timing")
+    args = parser.parse_args()
+
+    llm = StubLLM(args.llm_latency, prompt_token_seconds=args.prefill_ms / 1000).start()
+    os.environ.update({"GROQ_API_KEY": "stub", "GROQ_BASE_URL": llm.base_url, "GROQ_MAX_RETRIES": "0"})
+    from aiagent import agent
+    from aiagent.client import close_clients
+    from aiagent.context import ContextWindow, estimate_tokens
+    from contracts.common_types import Message, Metadata, ResponseStyle
+    from contracts.trusted import AgentConstraints, AgentInput
+
+    variants = {
+        "full": lambda: ContextWindow(0, 0, 0),
+        "window": lambda: ContextWindow(args.budget, args.max_messages, args.summary_tokens),
+    }
+    print(
+        f"budget {args.budget} tokens, {args.max_messages} messages, summary {args.summary_tokens} tokens; "
+        f"stub LLM {args.llm_latency * 1000:.0f} ms + {args.prefill_ms} ms/token"
+    )
+    print("per turn: prompt tokens mean/last, build us mean, LLM ms p50/p95")
+
+    try:
+        for length in args.lengths:
+            raw = _conversation(length)
+            messages = [Message(**m) for m in raw]
+            inputs = [
+                AgentInput(
+                    sessionId=f"bench-{length}",
+                    currentMessage=messages[turn],
+                    history=messages[:turn],
+                    metadata=Metadata(channel="SMS", language="English", locale="IN"),
+                    responseStyle=ResponseStyle.CONFUSED,
+                    constraints=AgentConstraints(noAccusation=True, noIllegalAdvice=True, softTone=True),
+                )
+                # Every scammer message is a turn; the history is all before it
+                for turn in range(0, length, 2)
+            ]
+            for name, make in variants.items():
+                # Build cost: the whole conversation, best of --repeat fresh runs
+                best = float("inf")
+                for _ in range(args.repeat):
+                    agent._CONTEXT = make()
+                    started = time.perf_counter()
+                    for agent_input in inputs:
+                        agent._build_messages(agent_input)
+                    best = min(best, time.perf_counter() - started)
+
+                agent._CONTEXT = make()
+                tokens, latencies = [], []
+                for agent_input in inputs:
+                    prompt = agent._build_messages(agent_input)
+                    tokens.append(sum(estimate_tokens(m["content"]) for m in prompt))
+                    started = time.perf_counter()
+                    agent._complete(agent_input)
+                    latencies.append(time.perf_counter() - started)
+
+                print(
+                    f"{length:>5} msgs {name:<7} tokens {statistics.mean(tokens):>7.0f}/{tokens[-1]:<6} "
+                    f"build {best / len(inputs) * 1e6:>7.1f} us  "
+                    f"llm {_percentile(latencies, 0.5) * 1000:>6.1f}/{_percentile(latencies, 0.95) * 1000:<6.1f} ms"
+                )
+    finally:
+        close_clients()
+        llm.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# bench/extraction_regex.py
+#
+# Cost per byte of each extractor on typical, long and adversarial input
+# (long digit / digit-space runs, huge tokens around "@", link floods),
+# at growing sizes so super-linear behaviour shows up as ns/byte rising
+# with the size. The previous unbounded patterns are timed alongside on
+# the small sizes (they are quadratic on some of these inputs).
+#   python -m bench.extraction_regex
+#   python -m bench.extraction_regex --sizes 4096 65536 --extractors upi phone
+
+import argparse
+import re
+import time
+import timeit
+from typing import Callable, Dict
+
+from extraction.extraction import KEYWORD_AUTOMATON, PHONE_REGEX, SCANNER, UPI_REGEX, URL_REGEX
+
+
+# ----------------------
+# Extractors
+# ----------------------
+_LEGACY_UPI_REGEX = re.compile(r"\b[a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,}\b", re.IGNORECASE)
+_LEGACY_URL_REGEX = re.compile(r"https?://[^\s]+")
+
+_EXTRACTORS: Dict[str, Callable[[str], object]] = {
+    "url": URL_REGEX.findall,
+    "upi": UPI_REGEX.findall,
+    "phone": PHONE_REGEX.findall,
+    "keywords": lambda text: KEYWORD_AUTOMATON.scan(text.lower()),
+    "scanner": SCANNER.scan,
+}
+_LEGACY: Dict[str, Callable[[str], object]] = {
+    "url": _LEGACY_URL_REGEX.findall,
+    "upi": _LEGACY_UPI_REGEX.findall,
+}
+# Legacy patterns are only timed up to this size
+_LEGACY_MAX_BYTES = 8192
+
+
+# ----------------------
+# Inputs, each built to roughly `size` characters
+# ----------------------
+_SCAM = (
+    "Dear customer your SBI account will be blocked today. "
+    "Verify immediately by paying Rs 10 to refund.desk@okaxis or call "
+    "+91 98765 43210. Click https://sbi-kyc-update.in/verify?id=8812 now. "
+)
+
+
+def _repeat(unit: str, size: int) -> str:
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+_INPUTS: Dict[str, Callable[[int], str]] = {
+    "typical": lambda size: _repeat(_SCAM, size),
+    "digit run": lambda size: _repeat("9", size),
+    "digit-space run": lambda size: _repeat("9 ", size),
+    "dotted token + @": lambda size: _repeat("a.", size - 2) + "@1",
+    "word token + @": lambda size: _repeat("a", size - 3) + "@bc",
+    "@ flood": lambda size: _repeat("a@", size),
+    "huge link": lambda size: "https://" + _repeat("x", size - 8),
+    "link flood": lambda size: _repeat("http://", size),
+    "non-ascii + @": lambda size: "é " + _repeat("a.", size - 4) + "@1",
+}
+
+
+def _bench(fn: Callable[[str], object], text: str, seconds: float) -> float:
+    timer = timeit.Timer(lambda: fn(text))
+    loops, _ = timer.autorange()
+    runs = max(1, int(seconds / 0.2))
+    return min(timer.repeat(repeat=runs, number=loops)) / loops
+
+
+def _once(fn: Callable[[str], object], text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2048, 8192, 32768])
+    parser.add_argument("--extractors", nargs="+", choices=list(_EXTRACTORS), default=list(_EXTRACTORS))
+    parser.add_argument("--inputs", nargs="+", choices=list(_INPUTS), default=list(_INPUTS))
+    parser.add_argument("--seconds", type=float, default=0.4)
+    args = parser.parse_args()
+
+    print("ns/byte per extractor; legacy = previous unbounded pattern")
+    print(f"{'input':<18} {'bytes':>7} " + " ".join(f"{name:>9}" for name in args.extractors)
+          + f" {'legacy url':>11} {'legacy upi':>11}")
+    for input_name in args.inputs:
+        for size in args.sizes:
+            text = _INPUTS[input_name](size)
+            cells = [
+                _bench(_EXTRACTORS[name], text, args.seconds) / len(text) * 1e9
+                for name in args.extractors
+            ]
+            legacy = [
+                f"{_once(_LEGACY[name], text) / len(text) * 1e9:>11.1f}"
+                if size <= _LEGACY_MAX_BYTES else f"{'-':>11}"
+                for name in ("url", "upi")
+            ]
+            print(
+                f"{input_name:<18} {len(text):>7} " + " ".join(f"{c:>9.1f}" for c in cells)
+                + " " + " ".join(legacy)
+            )
+
+
+if __name__ == "__main__":
+    main()
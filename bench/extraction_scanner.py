@@ -0,0 +1,77 @@
+# bench/extraction_scanner.py
+#
+# Throughput of the single-pass IndicatorScanner vs the previous
+# one-findall-per-kind extraction.
+#   python -m bench.extraction_scanner
+
+import argparse
+import re
+import timeit
+from typing import Callable, Dict
+
+from extraction.extraction import (
+    SCANNER,
+    SUSPICIOUS_KEYWORDS,
+    UPI_REGEX,
+    URL_REGEX,
+)
+
+
+# ----------------------
+# Baseline: four separate passes
+# ----------------------
+_LEGACY_PHONE_REGEX = re.compile(r"\b(?:\+91[\s-]?)?[6-9]\d{0,3}(?:[\s-]?\d){9}\b")
+
+
+def _legacy_scan(text: str):
+    lowered = text.lower()
+    return (
+        list(set(UPI_REGEX.findall(text))),
+        list(set(_LEGACY_PHONE_REGEX.findall(text))),
+        list(set(URL_REGEX.findall(text))),
+        [kw for kw in SUSPICIOUS_KEYWORDS if kw in lowered],
+    )
+
+
+def _messages() -> Dict[str, str]:
+    scam = (
+        "Dear customer your SBI account will be blocked today. "
+        "Verify immediately by paying Rs 10 to refund.desk@okaxis or call "
+        "+91 98765 43210. Click https://sbi-kyc-update.in/verify?id=8812 now."
+    )
+    chat = "Hello ji, how are you? I am waiting for your reply since morning."
+    return {
+        "scam (160 B)": scam,
+        "plain chat (66 B)": chat,
+        "long scam (16 KB)": " ".join([scam, chat] * 70),
+        "long plain (16 KB)": " ".join([chat] * 250),
+    }
+
+
+def _bench(fn: Callable[[str], object], text: str, seconds: float) -> float:
+    timer = timeit.Timer(lambda: fn(text))
+    loops, _ = timer.autorange()
+    runs = max(1, int(seconds / 0.2))
+    best = min(timer.repeat(repeat=runs, number=loops)) / loops
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    header = f"{'message':<20} {'legacy us':>10} {'scanner us':>11} {'MB/s':>8} {'speedup':>8}"
+    print(header)
+    for name, text in _messages().items():
+        legacy = _bench(_legacy_scan, text, args.seconds)
+        scanner = _bench(SCANNER.scan, text, args.seconds)
+        mb_per_s = len(text.encode()) / scanner / 1e6
+        print(
+            f"{name:<20} {legacy * 1e6:>10.2f} {scanner * 1e6:>11.2f} "
+            f"{mb_per_s:>8.1f} {legacy / scanner:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# bench/json_boundary.py
+#
+# Parse + serialize time at the /honeypot boundary for growing
+# conversationHistory payloads: stdlib json vs orjson (when installed).
+#   python -m bench.json_boundary --history 10 100 1000
+
+import argparse
+import json
+import timeit
+from typing import Callable, Dict, List
+
+from app import jsonio
+
+
+def _payload(history_size: int) -> bytes:
+    history: List[Dict] = [
+        {
+            "sender": "scammer" if i % 2 == 0 else "user",
+            "text": f"Message {i}: your account will be blocked, verify at https://kyc-{i}.in now",
+            "timestamp": 1767261600000 + i * 1000,
+        }
+        for i in range(history_size)
+    ]
+    payload = {
+        "sessionId": "sess-bench",
+        "message": {"sender": "scammer", "text": "Share the OTP now", "timestamp": 1767262600000},
+        "conversationHistory": history,
+        "metadata": {"channel": "SMS", "language": "English", "locale": "IN"},
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+_RESPONSE = {"status": "success", "reply": "Which OTP? I got two messages, which one do you need?"}
+
+
+def _stdlib_round_trip(body: bytes) -> bytes:
+    # What request.json() + JSONResponse did
+    json.loads(body)
+    return json.dumps(_RESPONSE, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _jsonio_round_trip(body: bytes) -> bytes:
+    jsonio.loads(body)
+    return jsonio.dumps(_RESPONSE)
+
+
+def _bench(fn: Callable[[bytes], object], body: bytes, seconds: float) -> float:
+    timer = timeit.Timer(lambda: fn(body))
+    loops, _ = timer.autorange()
+    runs = max(1, int(seconds / 0.2))
+    return min(timer.repeat(repeat=runs, number=loops)) / loops
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"jsonio backend: {jsonio.BACKEND}")
+    print(f"{'history':>8} {'KB':>8} {'stdlib us':>10} {jsonio.BACKEND + ' us':>10} {'speedup':>8}")
+    for size in args.history:
+        body = _payload(size)
+        stdlib = _bench(_stdlib_round_trip, body, args.seconds)
+        fast = _bench(_jsonio_round_trip, body, args.seconds)
+        print(
+            f"{size:>8} {len(body) / 1024:>8.1f} {stdlib * 1e6:>10.1f} "
+            f"{fast * 1e6:>10.1f} {stdlib / fast:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# bench/model_construction.py
+#
+# Per-turn CPU spent building the stage contracts: validated pydantic
+# models (the original orchestrator), pydantic model_construct, and the
+# trusted slotted dataclasses now used between stages.
+#   python -m bench.model_construction --history 0 20 100
+
+import argparse
+import timeit
+from typing import Callable, Dict, List
+
+from contracts import agent_contract, decision_contract, extraction_contract, trusted
+from contracts.common_types import Message, Metadata, ResponseStyle
+
+
+def _turn(history_size: int) -> Dict:
+    history = [
+        Message(
+            sender="scammer" if i % 2 == 0 else "user",
+            text=f"message {i} about your blocked account",
+            timestamp="2026-01-01T10:00:00+00:00",
+        )
+        for i in range(history_size)
+    ]
+    intelligence = {
+        "bankAccounts": [],
+        "upiIds": ["refund.desk@okaxis"],
+        "phishingLinks": ["https://sbi-kyc-update.in/verify"],
+        "phoneNumbers": ["+91 98765 43210"],
+        "suspiciousKeywords": ["blocked", "verify", "urgent"],
+    }
+    return {
+        "current": Message(sender="scammer", text="Verify now", timestamp="2026-01-01T10:05:00+00:00"),
+        "history": history,
+        "metadata": Metadata(channel="SMS", language="English", locale="IN"),
+        "stats": {
+            "totalMessages": history_size,
+            "scammerMessages": history_size // 2,
+            "agentMessages": history_size // 2,
+            "noNewIntelligenceTurns": 0,
+        },
+        "intelligence": intelligence,
+    }
+
+
+# ----------------------
+# Baseline: validated pydantic contracts, as the orchestrator built them
+# ----------------------
+def _validated_turn(turn: Dict) -> List:
+    decision_input = decision_contract.DecisionInput(
+        sessionId="sess-bench",
+        currentState="ENGAGING",
+        currentMessage=turn["current"],
+        history=turn["history"],
+        metadata=turn["metadata"],
+        extractedIntelligence=turn["intelligence"],
+        sessionStats=decision_contract.SessionStats(**turn["stats"]),
+        flags=decision_contract.DecisionFlags(isFirstMessage=False, hasHistory=True),
+    )
+    decision_output = decision_contract.DecisionOutput(
+        scamDetected=False,
+        scamType=None,
+        continueConversation=True,
+        triggerFinalCallback=False,
+        agentNotes="Actively engaging to extract intelligence.",
+        nextState="ENGAGING",
+        nextAgentAction=decision_contract.NextAgentAction(
+            shouldReply=True, responseStyle=ResponseStyle.HESITANT
+        ),
+    )
+    extraction_input = extraction_contract.ExtractionInput(
+        sessionId="sess-bench",
+        messageText=turn["current"].text,
+        sender=turn["current"].sender,
+        timestamp=turn["current"].timestamp,
+    )
+    extraction_output = extraction_contract.ExtractionOutput(
+        sessionId="sess-bench",
+        intelligence=extraction_contract.ExtractionIntelligence(**turn["intelligence"]),
+        deltaDetected=True,
+    )
+    merged = extraction_output.intelligence.model_dump()
+    agent_input = agent_contract.AgentInput(
+        sessionId="sess-bench",
+        currentMessage=turn["current"],
+        history=turn["history"],
+        metadata=turn["metadata"],
+        responseStyle=ResponseStyle.HESITANT,
+        constraints={"noAccusation": True, "noIllegalAdvice": True, "softTone": True},
+    )
+    return [decision_input, decision_output, extraction_input, merged, agent_input]
+
+
+# ----------------------
+# Trusted path: slotted dataclasses, as the orchestrator builds them now
+# ----------------------
+_CONSTRAINTS = trusted.AgentConstraints(noAccusation=True, noIllegalAdvice=True, softTone=True)
+
+
+def _trusted_turn(turn: Dict) -> List:
+    decision_input = trusted.DecisionInput(
+        sessionId="sess-bench",
+        currentState="ENGAGING",
+        currentMessage=turn["current"],
+        history=turn["history"],
+        metadata=turn["metadata"],
+        extractedIntelligence=trusted.IntelligencePresent(
+            **{field: bool(values) for field, values in turn["intelligence"].items()}
+        ),
+        sessionStats=trusted.SessionStats(**turn["stats"]),
+        flags=trusted.DecisionFlags(isFirstMessage=False, hasHistory=True),
+    )
+    decision_output = trusted.DecisionOutput(
+        scamDetected=False,
+        scamType=None,
+        continueConversation=True,
+        triggerFinalCallback=False,
+        agentNotes="Actively engaging to extract intelligence.",
+        nextState="ENGAGING",
+        nextAgentAction=trusted.NextAgentAction(
+            shouldReply=True, responseStyle=ResponseStyle.HESITANT
+        ),
+    )
+    extraction_output = trusted.ExtractionOutput(
+        sessionId="sess-bench",
+        intelligence=trusted.ExtractionIntelligence(**turn["intelligence"]),
+        deltaDetected=True,
+    )
+    merged = trusted.fields_dict(extraction_output.intelligence)
+    agent_input = trusted.AgentInput(
+        sessionId="sess-bench",
+        currentMessage=turn["current"],
+        history=turn["history"],
+        metadata=turn["metadata"],
+        responseStyle=ResponseStyle.HESITANT,
+        constraints=_CONSTRAINTS,
+    )
+    return [decision_input, decision_output, merged, agent_input]
+
+
+def _model_construct_turn(turn: Dict) -> List:
+    # For reference: pydantic's own unvalidated constructor
+    return [
+        decision_contract.DecisionInput.model_construct(
+            sessionId="sess-bench",
+            currentState="ENGAGING",
+            currentMessage=turn["current"],
+            history=turn["history"],
+            metadata=turn["metadata"],
+            extractedIntelligence=decision_contract.ExtractedIntelligence.model_construct(**turn["intelligence"]),
+            sessionStats=decision_contract.SessionStats.model_construct(**turn["stats"]),
+            flags=decision_contract.DecisionFlags.model_construct(isFirstMessage=False, hasHistory=True),
+        ),
+        decision_contract.DecisionOutput.model_construct(
+            scamDetected=False,
+            scamType=None,
+            continueConversation=True,
+            triggerFinalCallback=False,
+            agentNotes="Actively engaging to extract intelligence.",
+            nextState="ENGAGING",
+            nextAgentAction=decision_contract.NextAgentAction.model_construct(
+                shouldReply=True, responseStyle=ResponseStyle.HESITANT
+            ),
+        ),
+        extraction_contract.ExtractionOutput.model_construct(
+            sessionId="sess-bench",
+            intelligence=extraction_contract.ExtractionIntelligence.model_construct(**turn["intelligence"]),
+            deltaDetected=True,
+        ),
+        agent_contract.AgentInput.model_construct(
+            sessionId="sess-bench",
+            currentMessage=turn["current"],
+            history=turn["history"],
+            metadata=turn["metadata"],
+            responseStyle=ResponseStyle.HESITANT,
+            constraints=agent_contract.AgentConstraints.model_construct(
+                noAccusation=True, noIllegalAdvice=True, softTone=True
+            ),
+        ),
+    ]
+
+
+def _bench(build: Callable[[Dict], List], turn: Dict, seconds: float) -> float:
+    timer = timeit.Timer(lambda: build(turn))
+    loops, _ = timer.autorange()
+    runs = max(1, int(seconds / 0.2))
+    return min(timer.repeat(repeat=runs, number=loops)) / loops
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 20, 100])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'history':>8} {'validated us':>13} {'model_construct us':>19} "
+        f"{'trusted us':>11} {'speedup':>8}"
+    )
+    for size in args.history:
+        turn = _turn(size)
+        validated = _bench(_validated_turn, turn, args.seconds)
+        constructed = _bench(_model_construct_turn, turn, args.seconds)
+        fast = _bench(_trusted_turn, turn, args.seconds)
+        print(
+            f"{size:>8} {validated * 1e6:>13.2f} {constructed * 1e6:>19.2f} "
+            f"{fast * 1e6:>11.2f} {validated / fast:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
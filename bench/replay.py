@@ -0,0 +1,294 @@
+# bench/replay.py
+#
+# End-to-end replay / load test. Feeds a JSONL corpus of conversations
+# through orchestrator.handle_request (threads) and handle_request_async
+# (event loop) against local stub LLM and callback servers, sweeping
+# concurrency and reporting throughput and p50/p95/p99 latency per stage.
+#
+#   python -m bench.replay --conversations 200 --concurrency 1 8 32
+#   python -m bench.replay --corpus conversations.jsonl --llm-latency 0.2 --llm-errors 0.05
+#   python -m bench.replay --no-reply-cache
+#
+# Corpus: one conversation per line,
+#   {"sessionId": "...", "metadata": {...}, "messages": [{"sender": "scammer", "text": "..."}, ...]}
+# sessionId and metadata are optional. Only scammer messages are sent;
+# the agent's replies are appended to conversationHistory like a client
+# would. Each sweep point starts with empty reply and context caches.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from bench.stubs import StubCallback, StubLLM
+
+
+_DEFAULT_METADATA = {"channel": "SMS", "language": "English", "locale": "IN"}
+_STAGES = ("receiver", "session", "agent", "total")
+
+
+# ----------------------
+# Corpus
+# ----------------------
+def load_corpus(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_corpus(count: int, seed: int = 7) -> List[Dict]:
+    # Scam conversations long enough to go through engagement, saturation
+    # and the final callback, mixed with some harmless chats
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        if i % 5 == 4:
+            messages = ["Hi, are we still meeting for lunch tomorrow?", "Okay see you then"]
+        else:
+            messages = [
+                "Your bank account will be blocked today. Verify immediately.",
+                f"Pay Rs 10 to refund{i}@okaxis to keep the account active.",
+                f"Or call our officer on 98{rng.randrange(10**8):08d} urgently.",
+                # Nothing new from here on: saturation, exit, callback
+                "Why are you not responding?",
+                "Sir please do it now.",
+                "Have you done it?",
+                "We are waiting.",
+                "Hello?",
+                "Reply fast.",
+            ]
+        corpus.append(
+            {"messages": [{"sender": "scammer", "text": text} for text in messages]}
+        )
+    return corpus
+
+
+# ----------------------
+# Stage timings
+# ----------------------
+class StageTimer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {stage: [] for stage in _STAGES}
+
+    def wrap(self, stage: str, fn: Callable) -> Callable:
+        samples = self.samples[stage]
+
+        if asyncio.iscoroutinefunction(fn):
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    samples.append(time.perf_counter() - start)
+            return timed_async
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+        return timed
+
+    def report(self) -> str:
+        parts = []
+        for stage in _STAGES:
+            values = sorted(self.samples[stage])
+            if not values:
+                continue
+            pct = [values[min(len(values) - 1, int(q * len(values)))] * 1000 for q in (0.5, 0.95, 0.99)]
+            parts.append(f"{stage} {pct[0]:.2f}/{pct[1]:.2f}/{pct[2]:.2f}")
+        return "  ".join(parts)
+
+
+def _instrument(orchestrator, timer: StageTimer) -> Callable[[], None]:
+    originals = {
+        name: getattr(orchestrator, name)
+        for name in ("handle_receiver", "_advance_session", "generate_reply", "generate_reply_async")
+    }
+    orchestrator.handle_receiver = timer.wrap("receiver", originals["handle_receiver"])
+    orchestrator._advance_session = timer.wrap("session", originals["_advance_session"])
+    orchestrator.generate_reply = timer.wrap("agent", originals["generate_reply"])
+    orchestrator.generate_reply_async = timer.wrap("agent", originals["generate_reply_async"])
+
+    def restore():
+        for name, fn in originals.items():
+            setattr(orchestrator, name, fn)
+    return restore
+
+
+# ----------------------
+# Replay
+# ----------------------
+def _turn_payload(conversation: Dict, session_id: str, message: Dict, history: List[Dict]) -> Dict:
+    return {
+        "sessionId": session_id,
+        "message": {**message, "timestamp": int(time.time() * 1000)},
+        "conversationHistory": list(history),
+        "metadata": conversation.get("metadata", _DEFAULT_METADATA),
+    }
+
+
+def _record_turn(history: List[Dict], payload: Dict, result: Dict) -> None:
+    history.append(payload["message"])
+    if result.get("reply"):
+        history.append({"sender": "user", "text": result["reply"], "timestamp": int(time.time() * 1000)})
+
+
+def run_sync(orchestrator, corpus: List[Dict], run_id: str, concurrency: int, timer: StageTimer) -> int:
+    errors = [0]
+    lock = threading.Lock()
+
+    def replay(index: int) -> None:
+        conversation = corpus[index]
+        session_id = f"{run_id}-{conversation.get('sessionId', index)}"
+        history: List[Dict] = []
+        for message in conversation["messages"]:
+            payload = _turn_payload(conversation, session_id, message, history)
+            start = time.perf_counter()
+            try:
+                result = orchestrator.handle_request(payload)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            timer.samples["total"].append(time.perf_counter() - start)
+            _record_turn(history, payload, result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(replay, range(len(corpus))))
+    return errors[0]
+
+
+def run_async(orchestrator, corpus: List[Dict], run_id: str, concurrency: int, timer: StageTimer) -> int:
+    errors = [0]
+
+    async def replay(index: int, semaphore: asyncio.Semaphore) -> None:
+        conversation = corpus[index]
+        session_id = f"{run_id}-{conversation.get('sessionId', index)}"
+        history: List[Dict] = []
+        async with semaphore:
+            for message in conversation["messages"]:
+                payload = _turn_payload(conversation, session_id, message, history)
+                start = time.perf_counter()
+                try:
+                    result = await orchestrator.handle_request_async(payload)
+                except Exception:
+                    errors[0] += 1
+                    continue
+                timer.samples["total"].append(time.perf_counter() - start)
+                _record_turn(history, payload, result)
+
+    from aiagent.client import aclose_clients
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        try:
+            await asyncio.gather(*(replay(i, semaphore) for i in range(len(corpus))))
+        finally:
+            # The async client's connections belong to this event loop
+            await aclose_clients()
+
+    asyncio.run(main())
+    return errors[0]
+
+
+def _wait_for_callbacks(callback_stats: Callable[[], Dict], timeout: float = 10.0) -> None:
+    # Until the queue is empty and no delivery finished for a short while
+    deadline = time.monotonic() + timeout
+    settled = None
+    while time.monotonic() < deadline:
+        stats = callback_stats()
+        progress = (stats["queueDepth"], stats["delivered"], stats["failed"])
+        if not stats["queueDepth"] and progress == settled:
+            return
+        settled = progress
+        time.sleep(0.25)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="JSONL conversations (default: synthetic)")
+    parser.add_argument("--conversations", type=int, default=200, help="synthetic corpus size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.02)
+    parser.add_argument("--llm-errors", type=float, default=0.0, help="fraction of LLM calls failing")
+    parser.add_argument("--callback-errors", type=float, default=0.0)
+    parser.add_argument("--no-reply-cache", action="store_true", help="call the LLM for every reply")
+    args = parser.parse_args()
+
+    llm = StubLLM(args.llm_latency, args.llm_jitter, args.llm_errors).start()
+    callback = StubCallback(args.callback_errors).start()
+
+    # The app reads its configuration at import time
+    os.environ.update(
+        {
+            "GROQ_API_KEY": "stub",
+            "GROQ_BASE_URL": llm.base_url,
+            "GROQ_MAX_RETRIES": "0",
+            "CALLBACK_URL": callback.url,
+            "CALLBACK_OUTBOX_PATH": "",
+            "CALLBACK_BACKOFF_SECONDS": "0.05",
+            "SESSION_STORE_BACKEND": "memory",
+        }
+    )
+    if args.no_reply_cache:
+        os.environ["REPLY_CACHE_MAX_ENTRIES"] = "0"
+    from aiagent.agent import clear_caches, reply_cache_stats
+    from aiagent.client import close_clients
+    from callback.callback import callback_stats, start_callback_worker, stop_callback_worker
+    from orchestrator import orchestrator
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.conversations)
+    turns = sum(len(c["messages"]) for c in corpus)
+    print(
+        f"{len(corpus)} conversations, {turns} turns; stub LLM {args.llm_latency * 1000:.0f} ms "
+        f"(+{args.llm_jitter * 1000:.0f} ms jitter, {args.llm_errors:.0%} errors)"
+    )
+    print("stage latency in ms as p50/p95/p99")
+
+    start_callback_worker()
+    try:
+        for mode in args.modes:
+            for concurrency in args.concurrency:
+                # Replies cached by an earlier sweep point would skip the LLM
+                clear_caches()
+                timer = StageTimer()
+                restore = _instrument(orchestrator, timer)
+                received_before = len(callback.received)
+                llm_errors_before = llm.errors
+                llm_requests_before = llm.requests
+                cache_before = reply_cache_stats()
+                run = run_sync if mode == "sync" else run_async
+                started = time.perf_counter()
+                try:
+                    errors = run(orchestrator, corpus, f"{mode}{concurrency}", concurrency, timer)
+                finally:
+                    restore()
+                elapsed = time.perf_counter() - started
+                _wait_for_callbacks(callback_stats)
+                cache = reply_cache_stats()
+                hits = cache["replyCacheHits"] - cache_before["replyCacheHits"]
+                lookups = hits + cache["replyCacheMisses"] - cache_before["replyCacheMisses"]
+                print(
+                    f"{mode:>5} c={concurrency:<4} {turns / elapsed:>8.1f} turns/s  "
+                    f"errors {errors}  llm calls {llm.requests - llm_requests_before} "
+                    f"(errors {llm.errors - llm_errors_before}, cache hits {hits}/{lookups})  "
+                    f"callbacks {len(callback.received) - received_before}  "
+                    f"{timer.report()}"
+                )
+    finally:
+        stop_callback_worker()
+        close_clients()
+        llm.stop()
+        callback.stop()
+
+
+if __name__ == "__main__":
+    main()
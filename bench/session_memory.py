@@ -0,0 +1,89 @@
+# bench/session_memory.py
+#
+# Bytes per session for the legacy dict layout vs SessionRecord.
+#   python -m bench.session_memory --sessions 100000 1000000
+
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, Dict
+
+from orchestrator.session_record import RuntimeState, SessionRecord
+
+
+# ----------------------
+# Baseline: the original nested-dict session
+# ----------------------
+def _legacy_session(i: int) -> Dict:
+    session = {
+        "runtimeState": "NEW_MESSAGE",
+        "totalMessages": 0,
+        "scammerMessages": 0,
+        "agentMessages": 0,
+        "noNewIntelligenceTurns": 0,
+        "extractedIntelligence": {
+            "bankAccounts": [],
+            "upiIds": [],
+            "phishingLinks": [],
+            "phoneNumbers": [],
+            "suspiciousKeywords": [],
+        },
+        "callbackSent": False,
+    }
+    if i % 4 == 0:
+        # A quarter of sessions reach engagement and hold intelligence
+        session["runtimeState"] = "ENGAGING"
+        session["totalMessages"] = 6
+        intel = session["extractedIntelligence"]
+        for k, v in _intelligence(i).items():
+            intel[k] = list(set(intel[k] + v))
+    return session
+
+
+def _record_session(i: int) -> SessionRecord:
+    record = SessionRecord()
+    if i % 4 == 0:
+        record.state = RuntimeState.ENGAGING
+        record.total_messages = 6
+        record.merge_intelligence(_intelligence(i))
+    return record
+
+
+def _intelligence(i: int) -> Dict:
+    return {
+        "upiIds": [f"scammer{i % 5000}@upi"],
+        "phoneNumbers": [f"98{i % 100000000:08d}"],
+        # Keywords come out of the extractor as fresh strings each time
+        "suspiciousKeywords": ["".join(["urg", "ent"]), "".join(["ver", "ify"])],
+    }
+
+
+def _measure(build: Callable[[int], object], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    store = {f"sess-{i}": None for i in range(count)}
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    for i in range(count):
+        store[f"sess-{i}"] = build(i)
+
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return (used - baseline) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'sessions':>10} {'dict B/sess':>12} {'record B/sess':>14} {'ratio':>6}")
+    for count in args.sessions:
+        legacy = _measure(_legacy_session, count)
+        record = _measure(_record_session, count)
+        print(f"{count:>10} {legacy:>12.0f} {record:>14.0f} {legacy / record:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
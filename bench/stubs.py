@@ -0,0 +1,176 @@
+# bench/stubs.py
+#
+# Local stand-ins for the Groq API and the callback endpoint, so the
+# pipeline can be driven end to end without network access or API keys.
+# Both are stdlib HTTP servers running on a background thread.
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from aiagent.context import estimate_tokens
+
+
+_REPLIES = [
+    "Sorry, which account do you mean?",
+    "I am not sure I understand, can you explain again?",
+    "Okay, what should I do first?",
+    "My son usually handles this, is it very urgent?",
+]
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many load-test clients connect at once
+    request_queue_size = 1024
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle delays
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else b""
+        return json.loads(body) if body else None
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# ======================
+# Stub LLM (OpenAI-compatible chat completions, as the Groq SDK calls it)
+# ======================
+class StubLLM:
+    def __init__(
+        self,
+        latency_seconds: float = 0.05,
+        jitter_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        port: int = 0,
+        prompt_token_seconds: float = 0.0,
+    ):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.error_rate = error_rate
+        # Added per prompt token, like a model's prefill time
+        self.prompt_token_seconds = prompt_token_seconds
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = _StubServer(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        # The Groq SDK appends /openai/v1/chat/completions
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(_StubHandler):
+            def do_POST(self):
+                request = self._read_json() or {}
+                prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in request.get("messages", []))
+                delay = stub.latency_seconds + random.uniform(0, stub.jitter_seconds)
+                delay += prompt_tokens * stub.prompt_token_seconds
+                if delay > 0:
+                    time.sleep(delay)
+
+                with stub._lock:
+                    stub.requests += 1
+                    stub.prompt_tokens += prompt_tokens
+                    failed = random.random() < stub.error_rate
+                    stub.errors += failed
+
+                if failed:
+                    self._send(500, {"error": {"message": "injected failure"}})
+                    return
+
+                self._send(
+                    200,
+                    {
+                        "id": f"stub-{stub.requests}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "stub"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": random.choice(_REPLIES)},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 0, "total_tokens": prompt_tokens},
+                    },
+                )
+
+        return Handler
+
+    def start(self) -> "StubLLM":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ======================
+# Stub callback endpoint (CALLBACK_URLS["local"])
+# ======================
+class StubCallback:
+    PATH = "/api/updateHoneyPotFinalResult"
+
+    def __init__(self, error_rate: float = 0.0, port: int = 0):
+        self.error_rate = error_rate
+        self.received: List[dict] = []
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = _StubServer(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}{self.PATH}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(_StubHandler):
+            def do_POST(self):
+                payload = self._read_json()
+                with stub._lock:
+                    if random.random() < stub.error_rate:
+                        stub.errors += 1
+                        failed = True
+                    else:
+                        stub.received.append(payload)
+                        failed = False
+                self._send(503 if failed else 200, {"status": "error" if failed else "ok"})
+
+        return Handler
+
+    def start(self) -> "StubCallback":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,6 +1,9 @@
 import os
-import requests
-from typing import Set
+import threading
+from typing import Dict
+from callback.outbox import CallbackOutbox, process_owner
+from callback.sent_sessions import SentSessions
+from callback.worker import CallbackWorker
 from contracts.callback_contract import CallbackPayload
 
 ENV = os.getenv("ENV", "local")
@@ -10,35 +13,107 @@ CALLBACK_URLS = {
     "guvi": "https://hackathon.guvi.in/api/updateHoneyPotFinalResult",
 }
 
-GUVI_CALLBACK_URL = CALLBACK_URLS.get(ENV, CALLBACK_URLS["local"])
+# CALLBACK_URL overrides the per-ENV target (e.g. a local stub)
+GUVI_CALLBACK_URL = os.getenv("CALLBACK_URL") or CALLBACK_URLS.get(ENV, CALLBACK_URLS["local"])
 
 REQUEST_TIMEOUT_SECONDS = 5
-_SENT_SESSIONS: Set[str] = set()
 
+# Reported sessions are remembered for dedupe within bounds; the outbox
+# remains the durable record
+CALLBACK_SENT_TTL_SECONDS = float(os.getenv("CALLBACK_SENT_TTL_SECONDS", "86400"))
+CALLBACK_SENT_MAX_ENTRIES = int(os.getenv("CALLBACK_SENT_MAX_ENTRIES", "1000000"))
+_SENT_SESSIONS = SentSessions(CALLBACK_SENT_TTL_SECONDS, CALLBACK_SENT_MAX_ENTRIES)
 
-def send_callback(payload: CallbackPayload) -> bool:
+# Background delivery (retries with exponential backoff)
+CALLBACK_MAX_ATTEMPTS = int(os.getenv("CALLBACK_MAX_ATTEMPTS", "5"))
+CALLBACK_BACKOFF_SECONDS = float(os.getenv("CALLBACK_BACKOFF_SECONDS", "0.5"))
+CALLBACK_MAX_BACKOFF_SECONDS = float(os.getenv("CALLBACK_MAX_BACKOFF_SECONDS", "30"))
+CALLBACK_QUEUE_SIZE = int(os.getenv("CALLBACK_QUEUE_SIZE", "10000"))
+
+# Durable outbox (SQLite); set CALLBACK_OUTBOX_PATH="" to disable
+CALLBACK_OUTBOX_PATH = os.getenv("CALLBACK_OUTBOX_PATH", "callback_outbox.sqlite3")
+CALLBACK_OUTBOX_CLAIM_TTL_SECONDS = float(os.getenv("CALLBACK_OUTBOX_CLAIM_TTL_SECONDS", "300"))
+# How often the worker refreshes its own claims and takes over rows of
+# processes that are gone; keep well under the claim TTL
+CALLBACK_OUTBOX_RECLAIM_SECONDS = float(os.getenv("CALLBACK_OUTBOX_RECLAIM_SECONDS", "60"))
+CALLBACK_BATCH_SIZE = int(os.getenv("CALLBACK_BATCH_SIZE", "64"))
+CALLBACK_FLUSH_INTERVAL_SECONDS = float(os.getenv("CALLBACK_FLUSH_INTERVAL_SECONDS", "0.05"))
+# Concurrent POSTs per batch
+CALLBACK_CONCURRENCY = int(os.getenv("CALLBACK_CONCURRENCY", "4"))
+CALLBACK_OUTBOX_RETENTION_SECONDS = float(os.getenv("CALLBACK_OUTBOX_RETENTION_SECONDS", "604800"))
+
+
+# ======================
+# Background delivery
+# ======================
+def _open_outbox():
+    if not CALLBACK_OUTBOX_PATH:
+        return None
+
+    return CallbackOutbox(
+        path=CALLBACK_OUTBOX_PATH,
+        owner=process_owner(),
+        claim_ttl_seconds=CALLBACK_OUTBOX_CLAIM_TTL_SECONDS,
+    )
+
+
+_WORKER = CallbackWorker(
+    url=GUVI_CALLBACK_URL,
+    timeout_seconds=REQUEST_TIMEOUT_SECONDS,
+    max_attempts=CALLBACK_MAX_ATTEMPTS,
+    backoff_seconds=CALLBACK_BACKOFF_SECONDS,
+    max_backoff_seconds=CALLBACK_MAX_BACKOFF_SECONDS,
+    max_queue_size=CALLBACK_QUEUE_SIZE,
+    on_delivered=lambda payload: _SENT_SESSIONS.add(payload.sessionId),
+    batch_size=CALLBACK_BATCH_SIZE,
+    flush_interval_seconds=CALLBACK_FLUSH_INTERVAL_SECONDS,
+    retention_seconds=CALLBACK_OUTBOX_RETENTION_SECONDS,
+    reclaim_interval_seconds=CALLBACK_OUTBOX_RECLAIM_SECONDS,
+    max_concurrency=CALLBACK_CONCURRENCY,
+)
+
+
+_START_LOCK = threading.Lock()
+_STARTED = False
+
+
+def enqueue_callback(payload: CallbackPayload) -> bool:
     if not payload.scamDetected:
         return False
-
     if payload.sessionId in _SENT_SESSIONS:
-        return False
+        # Already reported
+        return True
 
-    try:
-        response = requests.post(
-            GUVI_CALLBACK_URL,
-            json=payload.model_dump(),
-            headers={"Content-Type": "application/json"},
-            timeout=REQUEST_TIMEOUT_SECONDS,
-        )
+    if not _STARTED:
+        start_callback_worker()
 
-        if response.status_code != 200:
-            print(f"[CALLBACK ERROR] {response.status_code}")
-            return False
+    return _WORKER.enqueue(payload)
 
-        _SENT_SESSIONS.add(payload.sessionId)
-        print(f"[CALLBACK SUCCESS] ENV={ENV}")
-        return True
 
-    except requests.RequestException as e:
-        print(f"[CALLBACK EXCEPTION] {e}")
-        return False
+def start_callback_worker() -> None:
+    global _STARTED
+
+    # Opened at startup (not import) so every uvicorn worker gets its own
+    # connection and replays whatever a previous process left undelivered
+    with _START_LOCK:
+        if _STARTED:
+            return
+        if _WORKER.outbox is None:
+            _WORKER.outbox = _open_outbox()
+        _WORKER.start()
+        _STARTED = True
+
+
+def stop_callback_worker() -> None:
+    global _STARTED
+
+    with _START_LOCK:
+        _WORKER.stop()
+        if _WORKER.outbox is not None:
+            _WORKER.outbox.close()
+            _WORKER.outbox = None
+        _STARTED = False
+
+
+def callback_stats() -> Dict[str, float]:
+    return {**_WORKER.stats(), **_SENT_SESSIONS.stats()}
@@ -0,0 +1,209 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Iterable, List, Optional
+
+from contracts.callback_contract import CallbackPayload
+
+
+# ======================
+# Durable callback outbox
+# ======================
+PENDING = "pending"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS callback_outbox (
+    session_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    claimed_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def process_owner() -> str:
+    # host:pid:token, new for every opened outbox, so rows left by an
+    # earlier outbox of a reused pid are not taken for live ones
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _owner_alive(owner: str) -> Optional[bool]:
+    # None when it cannot be told from here (another host, another format)
+    parts = owner.split(":")
+    if len(parts) != 3 or parts[0] != socket.gethostname() or not parts[1].isdigit():
+        return None
+
+    pid = int(parts[1])
+    if pid == os.getpid():
+        # An earlier outbox of this process, already closed
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+# Rows are owned by the process that recorded or claimed them. Another
+# process takes them over once the owner is gone: right away when the
+# owner ran on this host and its pid is dead, otherwise when the owner
+# stopped refreshing its claims (touch) for claim_ttl_seconds.
+class CallbackOutbox:
+    def __init__(self, path: str, owner: str, claim_ttl_seconds: float):
+        self.path = path
+        self.owner = owner
+        self.claim_ttl_seconds = claim_ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        # WAL + NORMAL: commits are durable across process crashes without
+        # an fsync per transaction; batching amortises the rest.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ----------------------
+    # Writes (one transaction per batch)
+    # ----------------------
+    def record_many(self, payloads: Iterable[CallbackPayload]) -> List[CallbackPayload]:
+        recorded: List[CallbackPayload] = []
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for payload in payloads:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO callback_outbox "
+                        "(session_id, payload, status, owner, claimed_at, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            payload.sessionId,
+                            payload.model_dump_json(),
+                            PENDING,
+                            self.owner,
+                            now,
+                            now,
+                            now,
+                        ),
+                    )
+                    # Already recorded (by this or another process): skip
+                    if cursor.rowcount == 1:
+                        recorded.append(payload)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return recorded
+
+    def mark(self, session_ids: Iterable[str], status: str) -> None:
+        rows = [(status, time.time(), session_id) for session_id in session_ids]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE callback_outbox SET status = ?, owner = NULL, updated_at = ? "
+                    "WHERE session_id = ?",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def release(self, session_ids: Iterable[str]) -> None:
+        # Recorded but not handed to delivery: left pending without an
+        # owner, so the next claim (of any process) picks them up
+        rows = [(session_id, self.owner, PENDING) for session_id in session_ids]
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE callback_outbox SET owner = NULL WHERE session_id = ? AND owner = ? AND status = ?",
+                rows,
+            )
+
+    def touch(self) -> None:
+        # Keeps this process's pending rows from looking abandoned
+        with self._lock:
+            self._conn.execute(
+                "UPDATE callback_outbox SET claimed_at = ? WHERE owner = ? AND status = ?",
+                (time.time(), self.owner, PENDING),
+            )
+
+    def prune(self, retention_seconds: float) -> int:
+        # Delivered rows only: pending/failed entries are kept for replay
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM callback_outbox WHERE status = ? AND updated_at < ?",
+                (DELIVERED, time.time() - retention_seconds),
+            )
+        return cursor.rowcount
+
+    # ----------------------
+    # Replay
+    # ----------------------
+    def claim_undelivered(self, include_failed: bool = True) -> List[CallbackPayload]:
+        # Takes over rows no live process is delivering and returns them.
+        # include_failed also retries rows whose delivery gave up (startup).
+        now = time.time()
+        statuses = (PENDING, FAILED) if include_failed else (PENDING,)
+        alive = {}
+
+        def abandoned(owner: Optional[str], claimed_at: float) -> bool:
+            if owner is None or claimed_at < now - self.claim_ttl_seconds:
+                return True
+            if owner not in alive:
+                alive[owner] = _owner_alive(owner)
+            return alive[owner] is False
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT session_id, payload, owner, claimed_at FROM callback_outbox "
+                    "WHERE status IN (%s) AND (owner IS NULL OR owner != ?) ORDER BY created_at"
+                    % ",".join("?" * len(statuses)),
+                    (*statuses, self.owner),
+                ).fetchall()
+                claimed = [row for row in rows if abandoned(row[2], row[3])]
+                self._conn.executemany(
+                    "UPDATE callback_outbox SET owner = ?, claimed_at = ?, status = ? WHERE session_id = ?",
+                    [(self.owner, now, PENDING, row[0]) for row in claimed],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return [CallbackPayload(**json.loads(row[1])) for row in claimed]
+
+    def status_of(self, session_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM callback_outbox WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return row[0] if row else None
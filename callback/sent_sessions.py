@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict
+
+
+# ======================
+# Bounded "already reported" set
+# ======================
+class SentSessions:
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # 0 disables the corresponding limit
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # Ordered by insertion time: the front is the oldest report
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = {"expired": 0, "lru": 0}
+
+    def add(self, session_id: str) -> None:
+        with self._lock:
+            now = self._clock()
+            self._entries[session_id] = now
+            self._entries.move_to_end(session_id)
+            self._evict(now)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            self._evict(self._clock())
+            return session_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            deadline = now - self.ttl_seconds
+            while self._entries and next(iter(self._entries.values())) <= deadline:
+                self._entries.popitem(last=False)
+                self.evictions["expired"] += 1
+
+        if self.max_entries:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions["lru"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count = len(self._entries)
+            sample_key = next(reversed(self._entries), "") if count else ""
+
+        # Each entry holds a key string and a float timestamp
+        per_entry = sys.getsizeof(sample_key) + sys.getsizeof(0.0)
+        return {
+            "sentSessions": count,
+            "sentEvictedExpired": self.evictions["expired"],
+            "sentEvictedLru": self.evictions["lru"],
+            "sentMemoryBytes": sys.getsizeof(self._entries) + count * per_entry,
+        }
@@ -0,0 +1,366 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from callback.outbox import DELIVERED, FAILED, CallbackOutbox
+from contracts.callback_contract import CallbackPayload
+from metrics.registry import REGISTRY
+
+class _Attempt:
+    # A callback being delivered; queued: counts towards join()
+    __slots__ = ("payload", "enqueued_at", "attempts", "delay", "queued")
+
+    def __init__(self, payload: CallbackPayload, enqueued_at: float, delay: float, queued: bool = True):
+        self.payload = payload
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+        self.delay = delay
+        self.queued = queued
+
+
+class _Pending:
+    __slots__ = ("payload", "done", "recorded", "error")
+
+    def __init__(self, payload: CallbackPayload):
+        self.payload = payload
+        self.done = False
+        self.recorded = False
+        self.error: Optional[Exception] = None
+
+
+CALLBACK_POST_SECONDS = REGISTRY.histogram(
+    "fraudguard_callback_post_seconds",
+    "Callback POST latency per attempt, by outcome (ok, error)",
+    ("outcome",),
+)
+CALLBACK_DELIVERY_SECONDS = REGISTRY.histogram(
+    "fraudguard_callback_delivery_seconds",
+    "Time from enqueue to successful callback delivery, including retries",
+)
+_POST_OK = CALLBACK_POST_SECONDS.labels("ok")
+_POST_ERROR = CALLBACK_POST_SECONDS.labels("error")
+
+
+# ======================
+# Background delivery
+# ======================
+class CallbackWorker:
+    def __init__(
+        self,
+        url: str,
+        timeout_seconds: float,
+        max_attempts: int,
+        backoff_seconds: float,
+        max_backoff_seconds: float,
+        max_queue_size: int,
+        on_delivered=None,
+        outbox: Optional[CallbackOutbox] = None,
+        batch_size: int = 64,
+        flush_interval_seconds: float = 0.05,
+        retention_seconds: float = 0,
+        prune_interval_seconds: float = 3600,
+        reclaim_interval_seconds: float = 60,
+        max_concurrency: int = 4,
+    ):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.on_delivered = on_delivered
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.retention_seconds = retention_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self.reclaim_interval_seconds = reclaim_interval_seconds
+        self._next_prune = 0.0
+        self._next_reclaim = 0.0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Group commit of outbox records (see _record)
+        self._pending: List[_Pending] = []
+        self._pending_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        # Failed attempts waiting out their backoff: (due, seq, attempt)
+        self._retry: List[Tuple[float, int, _Attempt]] = []
+        self._retry_seq = itertools.count()
+
+        # A batch is posted over up to max_concurrency pooled connections
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="callback-post")
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency))
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency))
+        self._session.headers.update({"Content-Type": "application/json"})
+
+        self._delivered = 0
+        self._failed = 0
+        self._retries = 0
+        self._last_latency = 0.0
+        self._total_latency = 0.0
+
+    # ----------------------
+    # Lifecycle
+    # ----------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="callback-worker",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def join(self) -> None:
+        self._queue.join()
+
+    # ----------------------
+    # Producer side
+    # ----------------------
+    def enqueue(self, payload: CallbackPayload) -> bool:
+        # The payload is in the outbox before this returns, so a crash with
+        # it still queued in memory replays it on the next start. Blocks on
+        # the outbox: async callers run it in a thread.
+        self.start()
+        durable = False
+        if self.outbox is not None:
+            try:
+                if not self._record(payload):
+                    # Already recorded (by this or another process)
+                    return True
+                durable = True
+            except Exception as e:
+                # Outbox unavailable: still deliver, just without durability
+                print(f"[CALLBACK OUTBOX ERROR] {e}")
+
+        try:
+            self._queue.put_nowait(_Attempt(payload, time.monotonic(), self.backoff_seconds))
+            return True
+        except queue.Full:
+            pass
+
+        if durable:
+            # Delivered from the outbox by the next reclaim instead
+            print(f"[CALLBACK QUEUE FULL] {payload.sessionId} left in the outbox")
+            try:
+                self.outbox.release([payload.sessionId])
+                return True
+            except Exception as e:
+                print(f"[CALLBACK OUTBOX ERROR] {e}")
+        print(f"[CALLBACK QUEUE FULL] {payload.sessionId}")
+        return False
+
+    def _record(self, payload: CallbackPayload) -> bool:
+        # Group commit: callers arriving while another one's transaction is
+        # in flight are written together, in one transaction, by the next
+        # caller to get the commit lock. Returns whether the payload was new.
+        entry = _Pending(payload)
+        with self._pending_lock:
+            self._pending.append(entry)
+
+        with self._commit_lock:
+            if not entry.done:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                try:
+                    recorded = {p.sessionId for p in self.outbox.record_many(e.payload for e in batch)}
+                    error = None
+                except Exception as e:
+                    recorded, error = set(), e
+                for pending in batch:
+                    pending.recorded = pending.payload.sessionId in recorded
+                    pending.error = error
+                    pending.done = True
+
+        if entry.error is not None:
+            raise entry.error
+        return entry.recorded
+
+    def stats(self) -> Dict[str, float]:
+        delivered = self._delivered
+        return {
+            "queueDepth": self._queue.qsize(),
+            "retryPending": len(self._retry),
+            "delivered": delivered,
+            "failed": self._failed,
+            "retries": self._retries,
+            "lastDeliveryLatencySeconds": self._last_latency,
+            "avgDeliveryLatencySeconds": self._total_latency / delivered if delivered else 0.0,
+        }
+
+    # ----------------------
+    # Consumer side
+    # ----------------------
+    def _run(self) -> None:
+        # Retries are scheduled, not slept through: a failing callback
+        # waits out its backoff in the retry heap while later ones go out
+        self._reclaim(include_failed=True)
+        self._next_reclaim = time.monotonic() + self.reclaim_interval_seconds
+
+        while not self._stop.is_set() or not self._queue.empty() or self._retry:
+            self._maybe_prune()
+            self._maybe_reclaim()
+            batch = self._due_retries()
+            wait = 0.0 if batch else self._wait_seconds()
+            batch.extend(self._next_batch(wait, self.batch_size - len(batch)))
+            if batch:
+                self._deliver_batch(batch)
+
+    def _due_retries(self) -> List[_Attempt]:
+        # On shutdown every retry is due: stop waiting, still make the attempts
+        now = float("inf") if self._stop.is_set() else time.monotonic()
+        due = []
+        while self._retry and self._retry[0][0] <= now and len(due) < self.batch_size:
+            due.append(heapq.heappop(self._retry)[2])
+        return due
+
+    def _wait_seconds(self) -> float:
+        if not self._retry:
+            return 0.2
+        return min(0.2, max(self._retry[0][0] - time.monotonic(), 0.0))
+
+    def _reclaim(self, include_failed: bool) -> None:
+        # Delivers what other (crashed) processes left undelivered; at
+        # startup also retries rows that earlier gave up
+        if self.outbox is None:
+            return
+
+        try:
+            self.outbox.touch()
+            replay = self.outbox.claim_undelivered(include_failed)
+        except Exception as e:
+            print(f"[CALLBACK OUTBOX ERROR] {e}")
+            return
+
+        if replay:
+            print(f"[CALLBACK REPLAY] {len(replay)} undelivered")
+            now = time.monotonic()
+            for start in range(0, len(replay), self.batch_size):
+                self._deliver_batch([
+                    _Attempt(payload, now, self.backoff_seconds, queued=False)
+                    for payload in replay[start:start + self.batch_size]
+                ])
+
+    def _maybe_reclaim(self) -> None:
+        now = time.monotonic()
+        if now < self._next_reclaim:
+            return
+        self._next_reclaim = now + self.reclaim_interval_seconds
+        self._reclaim(include_failed=False)
+
+    def _maybe_prune(self) -> None:
+        if self.outbox is None or not self.retention_seconds:
+            return
+
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.prune_interval_seconds
+
+        try:
+            self.outbox.prune(self.retention_seconds)
+        except Exception as e:
+            print(f"[CALLBACK OUTBOX ERROR] {e}")
+
+    def _next_batch(self, timeout: float, limit: int) -> List[_Attempt]:
+        if limit <= 0:
+            return []
+        try:
+            batch = [self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _deliver_batch(self, batch: List[_Attempt]) -> None:
+        if len(batch) == 1:
+            outcomes = [self._post(batch[0].payload)]
+        else:
+            outcomes = list(self._pool.map(self._post, [attempt.payload for attempt in batch]))
+
+        delivered: List[str] = []
+        failed: List[str] = []
+        for attempt, ok in zip(batch, outcomes):
+            attempt.attempts += 1
+            if ok:
+                self._delivered_one(attempt)
+                delivered.append(attempt.payload.sessionId)
+            elif attempt.attempts >= self.max_attempts:
+                self._failed += 1
+                print(f"[CALLBACK DROPPED] {attempt.payload.sessionId} after {self.max_attempts} attempts")
+                failed.append(attempt.payload.sessionId)
+            else:
+                # Stays PENDING (and claimed by us) in the outbox meanwhile
+                self._retries += 1
+                heapq.heappush(self._retry, (time.monotonic() + attempt.delay, next(self._retry_seq), attempt))
+                attempt.delay = min(attempt.delay * 2, self.max_backoff_seconds)
+                continue
+
+            if attempt.queued:
+                self._queue.task_done()
+
+        if self.outbox is not None:
+            try:
+                self.outbox.mark(delivered, DELIVERED)
+                self.outbox.mark(failed, FAILED)
+            except Exception as e:
+                print(f"[CALLBACK OUTBOX ERROR] {e}")
+
+    def _delivered_one(self, attempt: _Attempt) -> None:
+        latency = time.monotonic() - attempt.enqueued_at
+        CALLBACK_DELIVERY_SECONDS.observe(latency)
+        self._delivered += 1
+        self._last_latency = latency
+        self._total_latency += latency
+        if self.on_delivered is not None:
+            self.on_delivered(attempt.payload)
+
+    def _post(self, payload: CallbackPayload) -> bool:
+        started = time.perf_counter()
+        try:
+            response = self._session.post(
+                self.url,
+                data=payload.model_dump_json(),
+                timeout=self.timeout_seconds,
+            )
+        except requests.RequestException as e:
+            _POST_ERROR.observe(time.perf_counter() - started)
+            print(f"[CALLBACK EXCEPTION] {e}")
+            return False
+
+        if response.status_code != 200:
+            _POST_ERROR.observe(time.perf_counter() - started)
+            print(f"[CALLBACK ERROR] {response.status_code}")
+            return False
+
+        _POST_OK.observe(time.perf_counter() - started)
+        return True
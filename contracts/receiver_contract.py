@@ -13,6 +13,7 @@ class ReceiverInput(BaseModel):
 class ReceiverFlags(BaseModel):
     isFirstMessage: bool
     hasHistory: bool
+    serverHistory: bool = False    # history comes from the session store
 
 
 class ReceiverOutput(BaseModel):
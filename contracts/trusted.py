@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from contracts.common_types import Message, Metadata, ResponseStyle
+
+
+# ======================
+# Trusted internal forms
+# ======================
+# Slotted dataclasses with the same fields as the pydantic contracts, used
+# between stages inside one turn. Their inputs were validated once at the
+# boundary (receiver) or come from the session record / our own code, so
+# they are not validated again. Building one of these costs a fraction of
+# a pydantic constructor, and under pydantic 2 model_construct() is slower
+# still. Anything that leaves the process (callback payloads, HTTP
+# responses) keeps using the pydantic models.
+
+
+def fields_dict(obj) -> Dict:
+    return {name: getattr(obj, name) for name in obj.__slots__}
+
+
+# ----------------------
+# Decision
+# ----------------------
+@dataclass(slots=True)
+class IntelligencePresent:
+    # Which ExtractedIntelligence categories are non-empty: all decide()
+    # looks at, so the session's indicators are not copied every turn
+    bankAccounts: bool
+    upiIds: bool
+    phishingLinks: bool
+    phoneNumbers: bool
+    suspiciousKeywords: bool
+
+
+@dataclass(slots=True)
+class SessionStats:
+    totalMessages: int
+    scammerMessages: int
+    agentMessages: int
+    noNewIntelligenceTurns: int
+
+
+@dataclass(slots=True)
+class DecisionFlags:
+    isFirstMessage: bool
+    hasHistory: bool
+
+
+@dataclass(slots=True)
+class DecisionInput:
+    sessionId: str
+    currentState: str
+    currentMessage: Message
+    history: List[Message]
+    metadata: Metadata
+    extractedIntelligence: IntelligencePresent
+    sessionStats: SessionStats
+    flags: DecisionFlags
+
+
+@dataclass(slots=True)
+class NextAgentAction:
+    shouldReply: bool
+    responseStyle: ResponseStyle
+
+
+@dataclass(slots=True)
+class DecisionOutput:
+    scamDetected: bool
+    scamType: Optional[str]
+    continueConversation: bool
+    triggerFinalCallback: bool
+    agentNotes: str
+    nextState: str
+    nextAgentAction: NextAgentAction
+
+
+# ----------------------
+# Extraction
+# ----------------------
+@dataclass(slots=True)
+class ExtractionIntelligence:
+    bankAccounts: List[str]
+    upiIds: List[str]
+    phishingLinks: List[str]
+    phoneNumbers: List[str]
+    suspiciousKeywords: List[str]
+
+
+@dataclass(slots=True)
+class ExtractionOutput:
+    sessionId: str
+    intelligence: ExtractionIntelligence
+    deltaDetected: bool
+
+
+# ----------------------
+# Agent
+# ----------------------
+@dataclass(slots=True)
+class AgentConstraints:
+    noAccusation: bool
+    noIllegalAdvice: bool
+    softTone: bool
+
+
+@dataclass(slots=True)
+class AgentInput:
+    sessionId: str
+    currentMessage: Message
+    history: List[Message]
+    metadata: Metadata
+    responseStyle: ResponseStyle
+    constraints: AgentConstraints
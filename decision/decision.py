@@ -1,10 +1,9 @@
 from typing import List
-from contracts.decision_contract import (
-    DecisionInput,
-    DecisionOutput,
-    NextAgentAction,
-)
+from contracts.trusted import DecisionInput, DecisionOutput, NextAgentAction
 from contracts.common_types import ResponseStyle
+from keywords.automaton import KeywordAutomaton, load_keywords
+from receiver.analysis import analyze_message
+from app.config import SCAM_KEYWORDS_FILE
 
 
 # ======================
@@ -24,6 +23,10 @@ SCAM_KEYWORDS: List[str] = [
     "payment",
     "bank",
 ]
+if SCAM_KEYWORDS_FILE:
+    SCAM_KEYWORDS = SCAM_KEYWORDS + load_keywords(SCAM_KEYWORDS_FILE)
+
+SCAM_AUTOMATON = KeywordAutomaton(SCAM_KEYWORDS)
 
 # Number of turns with no new intelligence before saturation
 SATURATION_LIMIT = 3
@@ -33,8 +36,8 @@ SATURATION_LIMIT = 3
 # Helpers
 # ======================
 def _contains_scam_signals(text: str) -> bool:
-    text = text.lower()
-    return any(keyword in text for keyword in SCAM_KEYWORDS)
+    # Shares the analysis the receiver built for this message
+    return bool(analyze_message(text).keyword_hits(SCAM_AUTOMATON))
 
 
 def _intelligence_present(intel) -> bool:
@@ -0,0 +1,82 @@
+# extraction/accumulator.py
+
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+INTELLIGENCE_FIELDS = (
+    "bankAccounts",
+    "upiIds",
+    "phishingLinks",
+    "phoneNumbers",
+    "suspiciousKeywords",
+)
+
+
+# ======================
+# Intelligence Accumulator
+# ======================
+# Per-category ordered sets (dicts with None values keep first-seen order
+# and give O(1) membership), so a merge costs O(new items) and reports
+# exactly which indicators are new. Categories are only allocated once an
+# indicator of that kind is seen. Values are interned: the same keywords
+# and IDs recur across many sessions.
+class IntelligenceAccumulator:
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values: List[Optional[Dict[str, None]]] = [None] * len(INTELLIGENCE_FIELDS)
+
+    def merge(self, new: Dict[str, Iterable[str]]) -> Dict[str, List[str]]:
+        # Returns only the categories that gained values, with the new
+        # values in the order they were seen
+        delta: Dict[str, List[str]] = {}
+
+        for index, field in enumerate(INTELLIGENCE_FIELDS):
+            values = new.get(field)
+            if not values:
+                continue
+
+            existing = self._values[index]
+            if existing is None:
+                existing = self._values[index] = {}
+
+            added = []
+            for value in values:
+                if value not in existing:
+                    value = sys.intern(value)
+                    existing[value] = None
+                    added.append(value)
+            if added:
+                delta[field] = added
+
+        return delta
+
+    def __bool__(self) -> bool:
+        return any(self._values)
+
+    def present(self) -> Tuple[bool, ...]:
+        # Per category, in INTELLIGENCE_FIELDS order
+        return tuple(bool(values) for values in self._values)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        # Shape of ExtractedIntelligence / CallbackExtractedIntelligence
+        return {
+            field: list(values) if values else []
+            for field, values in zip(INTELLIGENCE_FIELDS, self._values)
+        }
+
+    # ----------------------
+    # Serialization
+    # ----------------------
+    def to_list(self) -> List[Optional[List[str]]]:
+        return [list(values) if values else None for values in self._values]
+
+    @classmethod
+    def from_list(cls, data: List[Optional[List[str]]]) -> "IntelligenceAccumulator":
+        accumulator = cls()
+        accumulator._values = [
+            dict.fromkeys(sys.intern(v) for v in values) if values else None
+            for values in data
+        ]
+        return accumulator
@@ -1,25 +1,35 @@
 # extraction/extraction.py
 
 import re
-from typing import List
+from typing import Iterable, List, Tuple
 
-from contracts.extraction_contract import (
-    ExtractionInput,
-    ExtractionOutput,
-    ExtractionIntelligence,
-)
+from app.config import SUSPICIOUS_KEYWORDS_FILE
+from extraction.scanner import KEYWORD, PHONE, UPI, UPI_DOMAIN_MAX, UPI_LOCAL_MAX, URL, IndicatorScanner
+from keywords.automaton import KeywordAutomaton, load_keywords
+from receiver.analysis import analyze_message
+from contracts.common_types import Message
+from contracts.extraction_contract import ExtractionInput
+from contracts.trusted import ExtractionIntelligence, ExtractionOutput
 
 
 # ---------- Regex Pattern----------
+#
+# These run on untrusted text, so every repetition is bounded: no match
+# attempt can look further than a fixed number of characters ahead, and
+# scanning stays linear in the message length (see
+# bench/extraction_regex.py for the adversarial inputs). The bounds are
+# well past any real UPI ID or link.
 
 UPI_REGEX = re.compile(
-    r"\b[a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,}\b",
+    r"\b[a-zA-Z0-9.\-_]{2,%d}@[a-zA-Z]{2,%d}\b" % (UPI_LOCAL_MAX, UPI_DOMAIN_MAX),
     re.IGNORECASE,
 )
+# Same as \b(?:\+91[\s-]?)?[6-9]\d{0,3}(?:[\s-]?\d){9}\b, written to start
+# with a character class so the regex engine can skip ahead to candidates
 PHONE_REGEX = re.compile(
-    r"\b(?:\+91[\s-]?)?[6-9]\d{0,3}(?:[\s-]?\d){9}\b"
+    r"[+6-9](?<=\b[+6-9])(?:(?<=\+)91[\s-]?[6-9]|(?<!\+))\d{0,3}(?:[\s-]?\d){9}\b"
 )
-URL_REGEX = re.compile(r"https?://[^\s]+")
+URL_REGEX = re.compile(r"https?://[^\s]{1,2048}")
 
 SUSPICIOUS_KEYWORDS = [
     "urgent",
@@ -33,32 +43,30 @@ SUSPICIOUS_KEYWORDS = [
     "click",
     "immediately",
 ]
+if SUSPICIOUS_KEYWORDS_FILE:
+    SUSPICIOUS_KEYWORDS = SUSPICIOUS_KEYWORDS + load_keywords(SUSPICIOUS_KEYWORDS_FILE)
 
-
-def _extract_upi(text: str) -> List[str]:
-    return list(set(UPI_REGEX.findall(text)))
-
-
-def _extract_phones(text: str) -> List[str]:
-    return list(set(PHONE_REGEX.findall(text)))
+KEYWORD_AUTOMATON = KeywordAutomaton(SUSPICIOUS_KEYWORDS)
 
 
-def _extract_urls(text: str) -> List[str]:
-    return list(set(URL_REGEX.findall(text)))
+SCANNER = IndicatorScanner(UPI_REGEX, PHONE_REGEX, URL_REGEX, KEYWORD_AUTOMATON)
 
 
-def _extract_keywords(text: str) -> List[str]:
-    lowered = text.lower()
-    return [kw for kw in SUSPICIOUS_KEYWORDS if kw in lowered]
+def _unique(values: List[str]) -> List[str]:
+    return list(dict.fromkeys(values))
 
 
-def extract(input_data: ExtractionInput) -> ExtractionOutput:
-    text = input_data.messageText
+def _extract_texts(session_id: str, texts: Iterable[str]) -> ExtractionOutput:
+    found = {UPI: [], PHONE: [], URL: [], KEYWORD: []}
+    for text in texts:
+        for match in analyze_message(text).indicators(SCANNER):
+            found[match.kind].append(match.value)
 
-    upi_ids = _extract_upi(text)
-    phone_numbers = _extract_phones(text)
-    phishing_links = _extract_urls(text)
-    suspicious_keywords = _extract_keywords(text)
+    upi_ids = _unique(found[UPI])
+    phone_numbers = _unique(found[PHONE])
+    phishing_links = _unique(found[URL])
+    seen_keywords = set(found[KEYWORD])
+    suspicious_keywords = [kw for kw in KEYWORD_AUTOMATON.keywords if kw in seen_keywords]
 
     delta_detected = any(
         [
@@ -78,7 +86,30 @@ def extract(input_data: ExtractionInput) -> ExtractionOutput:
     )
 
     return ExtractionOutput(
-        sessionId=input_data.sessionId,
+        sessionId=session_id,
         intelligence=intelligence,
         deltaDetected=delta_detected,
     )
+
+
+def extract(input_data: ExtractionInput) -> ExtractionOutput:
+    return _extract_texts(input_data.sessionId, [input_data.messageText])
+
+
+def extract_unseen(
+    session_id: str,
+    history: List[Message],
+    current_message: Message,
+    watermark: int,
+    offset: int = 0,
+) -> Tuple[ExtractionOutput, int]:
+    # Scans the scammer messages of `history` at or past the watermark plus
+    # the current message, and returns the merged result with the new
+    # watermark. Positions are absolute conversation indexes: history[i]
+    # is message offset + i. A watermark past the end means the history
+    # was rewritten or restarted; it is then reset without rescanning.
+    unseen = history[max(0, watermark - offset):]
+    texts = [m.text for m in unseen if m.sender == "scammer"]
+    texts.append(current_message.text)
+
+    return _extract_texts(session_id, texts), offset + len(history) + 1
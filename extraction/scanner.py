@@ -0,0 +1,135 @@
+# extraction/scanner.py
+
+import re
+from operator import itemgetter
+from typing import List, NamedTuple, Optional, Pattern
+
+from keywords.automaton import KeywordAutomaton
+
+
+# ---------- Match kinds ----------
+
+URL = "url"
+UPI = "upi"
+PHONE = "phone"
+KEYWORD = "keyword"
+
+
+class IndicatorMatch(NamedTuple):
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+# ---------- Scanner ----------
+#
+# A single alternation of all four patterns is slower under CPython's
+# `re` than the separate passes (every branch is tried at every
+# position), so the scanner instead gates each kind on a C-speed anchor
+# check and only walks the text with the patterns that can match:
+#   - URL:     "http" must occur
+#   - UPI:     each "@" is located with str.find, skipped unless a domain
+#              follows it, and searched for only in the window from the
+#              run of local-part characters before it to the end of the
+#              longest domain after it; the work per "@" is bounded, so a
+#              hostile message cannot make this super-linear
+#   - phone:   a 6-9 digit must occur (phone numbers start with one)
+#   - keyword: always, via the shared KeywordAutomaton
+# UPI and keyword matching runs on the lowercased text without
+# IGNORECASE; UPI values are sliced from the original text so their case
+# is preserved. URL/UPI/phone results are identical to one findall per
+# kind.
+
+_PHONE_LEADS = "6789"
+# Longest UPI local part / domain the extraction pattern accepts
+UPI_LOCAL_MAX = 256
+UPI_DOMAIN_MAX = 64
+_START = itemgetter(2)
+
+
+class IndicatorScanner:
+    def __init__(
+        self,
+        upi_regex: Pattern,
+        phone_regex: Pattern,
+        url_regex: Pattern,
+        keywords: KeywordAutomaton,
+    ):
+        self._upi = upi_regex
+        self._phone = phone_regex
+        self._url = url_regex
+        # Case-sensitive copy for the (ASCII) lowercased text
+        self._upi_lower = re.compile(upi_regex.pattern)
+        # Local-part characters of a UPI ID, matched backwards from the "@"
+        # (at most UPI_LOCAL_MAX of them: a match cannot start further back)
+        self._upi_local_run = re.compile(r"[a-z0-9._-]{0,%d}" % UPI_LOCAL_MAX)
+        self._upi_local_run_ignorecase = re.compile(self._upi_local_run.pattern, re.IGNORECASE)
+        # Domain after the "@", checked before any search for it
+        self._upi_domain = re.compile(r"[a-z]{2,%d}\b" % UPI_DOMAIN_MAX)
+        self._upi_domain_ignorecase = re.compile(self._upi_domain.pattern, re.IGNORECASE)
+        self._keywords = keywords
+
+    def scan(self, text: str, lowered: Optional[str] = None) -> List[IndicatorMatch]:
+        # `lowered` may be passed in when the caller already has it
+        if lowered is None:
+            lowered = text.lower()
+        matches: List[IndicatorMatch] = []
+
+        if "http" in text:
+            for m in self._url.finditer(text):
+                matches.append(IndicatorMatch(URL, m.group(), *m.span()))
+
+        if "@" in text:
+            matches.extend(self._scan_upi(text, lowered))
+
+        if any(lead in text for lead in _PHONE_LEADS):
+            for m in self._phone.finditer(text):
+                matches.append(IndicatorMatch(PHONE, m.group(), *m.span()))
+
+        for hit in self._keywords.scan(lowered):
+            matches.append(IndicatorMatch(KEYWORD, *hit))
+
+        matches.sort(key=_START)
+        return matches
+
+    def _scan_upi(self, text: str, lowered: str) -> List[IndicatorMatch]:
+        if text.isascii():
+            search_text, upi, local_run, domain = (
+                lowered, self._upi_lower, self._upi_local_run, self._upi_domain
+            )
+        else:
+            # Case folding of non-ASCII text can change what matches (and
+            # the length of the text), so search the original with IGNORECASE
+            search_text, upi, local_run, domain = (
+                text, self._upi, self._upi_local_run_ignorecase, self._upi_domain_ignorecase
+            )
+
+        found: List[IndicatorMatch] = []
+        reversed_text = search_text[::-1]
+        size = len(search_text)
+        pos = last_end = 0
+
+        while True:
+            at = search_text.find("@", pos)
+            if at < 0:
+                break
+            pos = at + 1
+
+            # No match can use this "@" unless a domain follows it
+            if not domain.match(search_text, pos):
+                continue
+
+            # A match for this "@" can only start inside the run of
+            # local-part characters right before it and end within the
+            # domain bound after it, so only that window is searched.
+            # Anything found past the "@" belongs to a later one.
+            run = local_run.match(reversed_text, size - at).end() - (size - at)
+            m = upi.search(search_text, max(at - run, last_end), at + UPI_DOMAIN_MAX + 2)
+            if m is None or m.start() > at:
+                continue
+
+            found.append(IndicatorMatch(UPI, text[m.start():m.end()], m.start(), m.end()))
+            pos = last_end = m.end()
+
+        return found
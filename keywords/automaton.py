@@ -0,0 +1,191 @@
+# keywords/automaton.py
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Pattern
+
+
+class KeywordHit(NamedTuple):
+    keyword: str
+    start: int
+    end: int
+
+
+# ---------- Keyword automaton ----------
+#
+# Keywords and phrases are stored in a character trie. The trie is also
+# compiled into one regex (shared prefixes factored out), so the C regex
+# engine does the walk over the text and reports every position where
+# some keyword starts; a pure-Python Aho-Corasick loop is slower per
+# character under CPython. At each such position the trie is walked in
+# Python to collect every keyword that ends there ("bank" and
+# "bank account" both hit).
+#
+# Matching is word-boundary aware on the left: a keyword that starts with
+# a letter/digit must start a word ("bank" does not hit "embankment").
+# It may run into a longer word ("urgent" hits "urgently") unless
+# whole_words is set. Whitespace inside a phrase matches any whitespace
+# run in the text.
+#
+# Keywords that are not a prefix of another keyword (the common case) are
+# reported straight from the regex match without walking the trie.
+
+_END = ""
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _normalize(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def load_keywords(path: str) -> List[str]:
+    # One keyword or phrase per line; blank lines and "#" comments ignored
+    with open(path, encoding="utf-8") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+class KeywordAutomaton:
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        self.whole_words = whole_words
+        self.keywords: List[str] = []
+        self._trie: Dict = {}
+        seen = set()
+
+        for keyword in keywords:
+            normalized = _normalize(keyword)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            self.keywords.append(normalized)
+
+            node = self._trie
+            for ch in normalized:
+                node = node.setdefault(ch, {})
+            node[_END] = normalized
+
+        # Keywords that are not a prefix of another keyword: when the regex
+        # matches one of these, it is the only hit at that position and the
+        # trie walk can be skipped
+        self._leaves = {
+            keyword for keyword in self.keywords
+            if len(self._node(keyword)) == 1
+        }
+        # Plain single-word keywords cannot overlap at word starts, so the
+        # scan can move on from the end of each match instead of start + 1
+        self._words_only = all(
+            all(_is_word_char(ch) for ch in keyword) for keyword in self.keywords
+        )
+        self._starts = self._compile()
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    # ----------------------
+    # Build
+    # ----------------------
+    def _node(self, keyword: str) -> Dict:
+        node = self._trie
+        for ch in keyword:
+            node = node[ch]
+        return node
+
+    def _compile(self) -> Pattern:
+        if not self._trie:
+            # Never matches
+            return re.compile(r"(?!)")
+        return re.compile(self._node_pattern(self._trie))
+
+    def _node_pattern(self, node: Dict) -> str:
+        # Only used to find start positions, so stop at the first keyword end
+        if _END in node:
+            return ""
+
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + self._node_pattern(child)
+            for ch, child in sorted(node.items())
+        ]
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    # ----------------------
+    # Match
+    # ----------------------
+    def scan(self, lowered: str, first_only: bool = False) -> List[KeywordHit]:
+        # `lowered` must already be lowercased
+        hits: List[KeywordHit] = []
+        leaves = self._leaves if not self.whole_words else ()
+
+        if self._words_only:
+            candidates = self._starts.finditer(lowered)
+        else:
+            candidates = self._overlapping(lowered)
+
+        for m in candidates:
+            start = m.start()
+            if (
+                start
+                and _is_word_char(lowered[start])
+                and _is_word_char(lowered[start - 1])
+            ):
+                continue
+
+            matched = m.group()
+            if matched in leaves:
+                hits.append(KeywordHit(matched, start, m.end()))
+            else:
+                self._walk(lowered, start, hits)
+            if first_only and hits:
+                break
+
+        return hits
+
+    def _overlapping(self, lowered: str):
+        search = self._starts.search
+        m = search(lowered)
+        while m is not None:
+            yield m
+            # Resume one character on, so overlapping hits are not skipped
+            m = search(lowered, m.start() + 1)
+
+    def _walk(self, lowered: str, start: int, hits: List[KeywordHit]) -> None:
+        node = self._trie
+        pos = start
+        size = len(lowered)
+
+        while True:
+            keyword = node.get(_END)
+            if keyword is not None and (
+                not self.whole_words
+                or pos == size
+                or not _is_word_char(lowered[pos])
+            ):
+                hits.append(KeywordHit(keyword, start, pos))
+
+            if pos == size:
+                return
+
+            ch = lowered[pos]
+            if ch.isspace():
+                node = node.get(" ")
+                if node is None:
+                    return
+                while pos < size and lowered[pos].isspace():
+                    pos += 1
+            else:
+                node = node.get(ch)
+                if node is None:
+                    return
+                pos += 1
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        return self.scan(text.lower())
+
+    def contains_any(self, text: str) -> bool:
+        return bool(self.scan(text.lower(), first_only=True))
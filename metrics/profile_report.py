@@ -0,0 +1,79 @@
+# metrics/profile_report.py
+#
+# Merges the per-turn cProfile dumps written by the sampling profiler
+# (PROFILE_DIR) and ranks functions across them, optionally only for some
+# states, sessions or slow turns.
+#   python -m metrics.profile_report profiles
+#   python -m metrics.profile_report profiles --state ENGAGING --min-ms 50 --sort tottime --top 20
+#   python -m metrics.profile_report profiles --output merged.prof   # for snakeviz etc.
+
+import argparse
+import os
+import pstats
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from metrics.profiler import FILE_PATTERN, list_dumps
+
+
+def select_dumps(
+    directory: str,
+    states: Optional[Sequence[str]] = None,
+    session: Optional[str] = None,
+    min_ms: int = 0,
+) -> List[Dict]:
+    selected = []
+    for name in list_dumps(directory):
+        tags = FILE_PATTERN.match(name).groupdict()
+        if states and tags["state"] not in states:
+            continue
+        if session and session not in tags["session"]:
+            continue
+        if int(tags["ms"]) < min_ms:
+            continue
+        selected.append({**tags, "ms": int(tags["ms"]), "path": os.path.join(directory, name)})
+    return selected
+
+
+def summarize(dumps: List[Dict]) -> str:
+    by_state: Dict[str, List[int]] = {}
+    for dump in dumps:
+        by_state.setdefault(dump["state"], []).append(dump["ms"])
+
+    lines = [f"{'state':<24} {'turns':>6} {'p50 ms':>8} {'max ms':>8}"]
+    for state, values in sorted(by_state.items()):
+        values.sort()
+        lines.append(f"{state:<24} {len(values):>6} {values[len(values) // 2]:>8} {values[-1]:>8}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", help="PROFILE_DIR of the service")
+    parser.add_argument("--state", nargs="+", help="only turns that moved to these states")
+    parser.add_argument("--session", help="only sessions whose id contains this")
+    parser.add_argument("--min-ms", type=int, default=0, help="only turns at least this slow")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, ncalls)")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--output", help="also write the merged stats here")
+    args = parser.parse_args(argv)
+
+    dumps = select_dumps(args.directory, args.state, args.session, args.min_ms)
+    if not dumps:
+        print("no matching profiles", file=sys.stderr)
+        return 1
+
+    print(summarize(dumps))
+    print()
+
+    stats = pstats.Stats(*(dump["path"] for dump in dumps), stream=sys.stdout)
+    if args.output:
+        stats.dump_stats(args.output)
+    # pstats would list every input file
+    stats.files = [f"{len(dumps)} profiles in {args.directory}"]
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import cProfile
+import itertools
+import os
+import re
+import threading
+import time
+from typing import List, Optional
+
+
+# ======================
+# Sampling request profiler
+# ======================
+# Opt-in (PROFILE_SAMPLE_EVERY): one turn in N runs under cProfile and its
+# stats are dumped to PROFILE_DIR, one .prof file per turn, tagged in the
+# file name with the session, the state the turn moved to and its wall
+# time. With PROFILE_SLOW_SECONDS set, a sampled turn is only kept when it
+# took at least that long (PROFILE_SAMPLE_EVERY=1 keeps every slow turn,
+# at the cost of profiling all of them). The directory keeps the newest
+# PROFILE_MAX_FILES dumps.
+#
+# The caller pauses the profile around awaits: on the event loop other
+# requests run meanwhile, and their CPU must not land in this profile.
+# One turn is profiled at a time (a sample due while another is in
+# flight is skipped), since a profiler hook is per process on newer
+# Pythons.
+#
+# Merge and rank the dumps with `python -m metrics.profile_report DIR`.
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+# 0001700000000000-1234-7-ENGAGING-812ms-sess_42.prof
+FILE_PATTERN = re.compile(
+    r"^(?P<stamp>\d+)-(?P<pid>\d+)-(?P<seq>\d+)-(?P<state>[A-Za-z_]+)-(?P<ms>\d+)ms-(?P<session>.*)\.prof$"
+)
+
+
+class ProfiledTurn:
+    __slots__ = ("_owner", "_profile", "_started", "session_id", "state")
+
+    def __init__(self, owner: "RequestProfiler"):
+        self._owner = owner
+        self._profile = cProfile.Profile()
+        self._started = 0.0
+        self.session_id = ""
+        self.state = ""
+
+    def tag(self, session_id: str, state: str) -> None:
+        self.session_id = session_id
+        self.state = state
+
+    def pause(self) -> None:
+        self._profile.disable()
+
+    def resume(self) -> None:
+        self._profile.enable()
+
+    def __enter__(self) -> "ProfiledTurn":
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profile.disable()
+        if not self.state:
+            self.state = "ERROR" if exc_type is not None else "NONE"
+        self._owner._finish(self, time.perf_counter() - self._started)
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        directory: str,
+        sample_every: int = 0,
+        slow_seconds: float = 0.0,
+        max_files: int = 200,
+    ):
+        self.directory = directory
+        self.sample_every = sample_every
+        self.slow_seconds = slow_seconds
+        self.max_files = max_files
+        self._counter = itertools.count()
+        self._seq = itertools.count()
+        self._in_flight = threading.Lock()
+        self.written = 0
+
+    def sample(self) -> Optional[ProfiledTurn]:
+        # None unless this turn is the 1-in-N and no other is being profiled
+        if not self.sample_every or next(self._counter) % self.sample_every:
+            return None
+        if not self._in_flight.acquire(blocking=False):
+            return None
+        return ProfiledTurn(self)
+
+    def _finish(self, turn: ProfiledTurn, elapsed: float) -> None:
+        try:
+            if elapsed >= self.slow_seconds:
+                self._write(turn, elapsed)
+        finally:
+            self._in_flight.release()
+
+    def _write(self, turn: ProfiledTurn, elapsed: float) -> None:
+        name = "%016d-%d-%d-%s-%dms-%s.prof" % (
+            time.time() * 1000,
+            os.getpid(),
+            next(self._seq),
+            turn.state,
+            elapsed * 1000,
+            _UNSAFE.sub("_", turn.session_id)[:64],
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            turn._profile.dump_stats(os.path.join(self.directory, name))
+            self.written += 1
+            self._rotate()
+        except OSError as e:
+            print(f"[PROFILE ERROR] {e}")
+
+    def _rotate(self) -> None:
+        if not self.max_files:
+            return
+        # Names start with the zero-padded time, so they sort by age
+        dumps = list_dumps(self.directory)
+        for name in dumps[: max(0, len(dumps) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def list_dumps(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if FILE_PATTERN.match(name))
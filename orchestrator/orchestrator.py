@@ -1,85 +1,188 @@
-from typing import Dict
+import asyncio
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
 
 from receiver.receiver import handle_receiver
 from decision.decision import decide
-from aiagent.agent import generate_reply
-from extraction.extraction import extract
-from callback.callback import send_callback
+from aiagent.agent import generate_reply, generate_reply_async
+from extraction.extraction import extract_unseen
+from callback.callback import enqueue_callback
 
-from contracts.decision_contract import DecisionInput, DecisionFlags, SessionStats
-from contracts.agent_contract import AgentInput
+from contracts.agent_contract import AgentOutput
 from contracts.callback_contract import CallbackPayload
-from contracts.extraction_contract import ExtractionInput
+from contracts.common_types import Message
+from contracts.receiver_contract import ReceiverOutput
+from contracts.trusted import (
+    AgentConstraints,
+    AgentInput,
+    DecisionFlags,
+    DecisionInput,
+    DecisionOutput,
+    IntelligencePresent,
+    SessionStats,
+    fields_dict,
+)
+from orchestrator.session_record import RuntimeState, SessionRecord
+from orchestrator.session_locks import SessionLocks
+from orchestrator.session_store import create_session_store
+from metrics.profiler import ProfiledTurn, RequestProfiler
+from metrics.registry import REGISTRY
+from app.config import (
+    SESSION_DB_PATH,
+    SESSION_IDLE_TTL_SECONDS,
+    SESSION_MAX_ENTRIES,
+    SESSION_STORE_BACKEND,
+    SERVER_HISTORY_ENABLED,
+    SERVER_HISTORY_MAX_MESSAGES,
+    BATCH_MAX_CONCURRENCY,
+    SESSION_LOCK_SHARDS,
+    PROFILE_DIR,
+    PROFILE_MAX_FILES,
+    PROFILE_SAMPLE_EVERY,
+    PROFILE_SLOW_SECONDS,
+)
 
 
 # ======================
 # Runtime States
 # ======================
-NEW_MESSAGE = "NEW_MESSAGE"
-SUSPECTED_SCAM = "SUSPECTED_SCAM"
-ENGAGING = "ENGAGING"
-INTELLIGENCE_SATURATED = "INTELLIGENCE_SATURATED"
-SOFT_EXIT = "SOFT_EXIT"
-CALLBACK_READY = "CALLBACK_READY"
-CLOSED = "CLOSED"
+NEW_MESSAGE = RuntimeState.NEW_MESSAGE
+SUSPECTED_SCAM = RuntimeState.SUSPECTED_SCAM
+ENGAGING = RuntimeState.ENGAGING
+INTELLIGENCE_SATURATED = RuntimeState.INTELLIGENCE_SATURATED
+SOFT_EXIT = RuntimeState.SOFT_EXIT
+CALLBACK_READY = RuntimeState.CALLBACK_READY
+CLOSED = RuntimeState.CLOSED
+
+_EXTRACTING_STATES = frozenset({SUSPECTED_SCAM, ENGAGING})
 
 
 # ======================
 # Session Store
 # ======================
-_SESSION_STORE: Dict[str, Dict] = {}
+_SESSION_STORE = create_session_store(
+    SESSION_STORE_BACKEND,
+    SESSION_DB_PATH,
+    idle_ttl_seconds=SESSION_IDLE_TTL_SECONDS,
+    max_entries=SESSION_MAX_ENTRIES,
+    is_closed=lambda session: session.state == CLOSED,
+    encode=SessionRecord.to_json,
+    decode=SessionRecord.from_json,
+)
+
+
+# Serializes the turns of one session (including the LLM call), while
+# different sessions run in parallel
+_SESSION_LOCKS = SessionLocks(SESSION_LOCK_SHARDS)
+
+
+# ======================
+# Metrics
+# ======================
+# Stage spans are taken with perf_counter() pairs rather than timer
+# context managers (a third of the cost per span); adjacent stages share
+# their boundary timestamp. Only turns that complete are timed.
+STAGE_SECONDS = REGISTRY.histogram(
+    "fraudguard_stage_seconds",
+    "Time spent in each stage of a /honeypot turn",
+    ("stage",),
+)
+STATE_TRANSITIONS = REGISTRY.counter(
+    "fraudguard_state_transitions_total",
+    "Session states chosen by the decision stage, by previous state",
+    ("from_state", "to_state"),
+)
+_RECEIVER_SECONDS = STAGE_SECONDS.labels("receiver")
+_LOCK_WAIT_SECONDS = STAGE_SECONDS.labels("lock_wait")
+_SESSION_SECONDS = STAGE_SECONDS.labels("session")
+_DECIDE_SECONDS = STAGE_SECONDS.labels("decide")
+_EXTRACT_SECONDS = STAGE_SECONDS.labels("extract")
+_CALLBACK_SECONDS = STAGE_SECONDS.labels("callback")
+_AGENT_SECONDS = STAGE_SECONDS.labels("agent")
+_RECORD_REPLY_SECONDS = STAGE_SECONDS.labels("record_reply")
+_TOTAL_SECONDS = STAGE_SECONDS.labels("total")
 
 
-def _init_session() -> Dict:
-    return {
-        "runtimeState": NEW_MESSAGE,
-        "totalMessages": 0,
-        "scammerMessages": 0,
-        "agentMessages": 0,
-        "noNewIntelligenceTurns": 0,
-        "extractedIntelligence": {
-            "bankAccounts": [],
-            "upiIds": [],
-            "phishingLinks": [],
-            "phoneNumbers": [],
-            "suspiciousKeywords": [],
-        },
-        "callbackSent": False,
-    }
+# Opt-in sampling of turns under cProfile (off unless PROFILE_SAMPLE_EVERY)
+_PROFILER = RequestProfiler(
+    PROFILE_DIR,
+    sample_every=PROFILE_SAMPLE_EVERY,
+    slow_seconds=PROFILE_SLOW_SECONDS,
+    max_files=PROFILE_MAX_FILES,
+)
 
 
-def _merge_intelligence(existing: Dict, new: Dict) -> bool:
-    before = sum(len(v) for v in existing.values())
-    for k in existing:
-        existing[k] = list(set(existing[k] + new.get(k, [])))
-    after = sum(len(v) for v in existing.values())
-    return after > before
+def session_stats() -> Dict[str, int]:
+    return {**_SESSION_STORE.stats(), "activeSessionLocks": len(_SESSION_LOCKS)}
 
 
 # ======================
-# Entry
+# Server-side History
 # ======================
-def handle_request(raw_payload: dict) -> dict:
-    receiver_output = handle_receiver(raw_payload)
-    session_id = receiver_output.sessionId
+def _sync_history(receiver_output: ReceiverOutput, session: SessionRecord) -> int:
+    # Returns the conversation position of receiver_output.history[0]
+    flags = receiver_output.flags
 
-    if session_id not in _SESSION_STORE:
-        _SESSION_STORE[session_id] = _init_session()
+    if flags.serverHistory:
+        # Delta payload: the stored history is this turn's history
+        offset = session.history_start
+        history = session.history or []
+        receiver_output.history = history
+        flags.isFirstMessage = not history
+        flags.hasHistory = bool(history)
+        session.append_history([receiver_output.currentMessage], SERVER_HISTORY_MAX_MESSAGES)
+        return offset
 
-    session = _SESSION_STORE[session_id]
+    # Full payload: the client's history replaces what is stored
+    session.history = None
+    session.history_start = 0
+    session.append_history(
+        receiver_output.history + [receiver_output.currentMessage],
+        SERVER_HISTORY_MAX_MESSAGES,
+    )
+    return 0
 
+
+def _record_reply(session_id: str, agent_output: Optional[AgentOutput]) -> None:
+    if not SERVER_HISTORY_ENABLED or not agent_output or not agent_output.reply:
+        return
+
+    reply = Message(
+        sender="user",
+        text=agent_output.reply,
+        timestamp=datetime.now(timezone.utc).isoformat(),
+    )
+    with _SESSION_STORE.transaction(session_id, SessionRecord) as session:
+        if session.state != CLOSED:
+            session.append_history([reply], SERVER_HISTORY_MAX_MESSAGES)
+
+
+# ======================
+# Turn Stages
+# ======================
+# Stage inputs are the trusted (unvalidated) dataclass forms: everything
+# in them was validated by the receiver or comes from the session record
+_AGENT_CONSTRAINTS = AgentConstraints(
+    noAccusation=True,
+    noIllegalAdvice=True,
+    softTone=True,
+)
+
+
+def _decide_turn(receiver_output: ReceiverOutput, session: SessionRecord) -> DecisionOutput:
     decision_input = DecisionInput(
-        sessionId=session_id,
-        currentState=session["runtimeState"],
+        sessionId=receiver_output.sessionId,
+        currentState=session.state.name,
         currentMessage=receiver_output.currentMessage,
         history=receiver_output.history,
         metadata=receiver_output.metadata,
-        extractedIntelligence=session["extractedIntelligence"],
+        extractedIntelligence=IntelligencePresent(*session.intelligence_present()),
         sessionStats=SessionStats(
-            totalMessages=session["totalMessages"],
-            scammerMessages=session["scammerMessages"],
-            agentMessages=session["agentMessages"],
-            noNewIntelligenceTurns=session["noNewIntelligenceTurns"],
+            totalMessages=session.total_messages,
+            scammerMessages=session.scammer_messages,
+            agentMessages=session.agent_messages,
+            noNewIntelligenceTurns=session.no_new_intelligence_turns,
         ),
         flags=DecisionFlags(
             isFirstMessage=receiver_output.flags.isFirstMessage,
@@ -87,66 +190,285 @@ def handle_request(raw_payload: dict) -> dict:
         ),
     )
 
+    started = perf_counter()
     decision_output = decide(decision_input)
+    _DECIDE_SECONDS.observe(perf_counter() - started)
+    STATE_TRANSITIONS.labels(session.state.name, decision_output.nextState).inc()
 
     # 🔑 SINGLE SOURCE OF TRUTH
-    session["runtimeState"] = decision_output.nextState
-
-    agent_output = None
-
-    if decision_output.nextAgentAction.shouldReply:
-        agent_output = generate_reply(
-            AgentInput(
-                sessionId=session_id,
-                currentMessage=receiver_output.currentMessage,
-                history=receiver_output.history,
-                metadata=receiver_output.metadata,
-                responseStyle=decision_output.nextAgentAction.responseStyle,
-                constraints={
-                    "noAccusation": True,
-                    "noIllegalAdvice": True,
-                    "softTone": True,
-                },
-            )
-        )
-        session["agentMessages"] += 1
-
-    if session["runtimeState"] in {SUSPECTED_SCAM, ENGAGING}:
-        extraction_output = extract(
-            ExtractionInput(
-                sessionId=session_id,
-                messageText=receiver_output.currentMessage.text,
-                sender=receiver_output.currentMessage.sender,
-                timestamp=receiver_output.currentMessage.timestamp,
-            )
-        )
-        delta = _merge_intelligence(
-            session["extractedIntelligence"],
-            extraction_output.intelligence.model_dump(),
+    session.state = RuntimeState[decision_output.nextState]
+
+    return decision_output
+
+
+def _agent_input(
+    receiver_output: ReceiverOutput,
+    decision_output: DecisionOutput,
+) -> AgentInput:
+    return AgentInput(
+        sessionId=receiver_output.sessionId,
+        currentMessage=receiver_output.currentMessage,
+        history=receiver_output.history,
+        metadata=receiver_output.metadata,
+        responseStyle=decision_output.nextAgentAction.responseStyle,
+        constraints=_AGENT_CONSTRAINTS,
+    )
+
+
+def _finish_turn(
+    receiver_output: ReceiverOutput,
+    decision_output: DecisionOutput,
+    session: SessionRecord,
+    history_offset: int = 0,
+    previous_state: Optional[RuntimeState] = None,
+) -> Optional[CallbackPayload]:
+    # Returns the callback payload when this turn reports the session
+    session_id = receiver_output.sessionId
+
+    if session.state in _EXTRACTING_STATES:
+        # Also picks up scammer messages from history that were never
+        # extracted (e.g. a resumed conversation); each is scanned once
+        started = perf_counter()
+        extraction_output, session.extracted_upto = extract_unseen(
+            session_id,
+            receiver_output.history,
+            receiver_output.currentMessage,
+            session.extracted_upto,
+            history_offset,
         )
-        session["noNewIntelligenceTurns"] = 0 if delta else session["noNewIntelligenceTurns"] + 1
+        _EXTRACT_SECONDS.observe(perf_counter() - started)
+        delta = session.merge_intelligence(fields_dict(extraction_output.intelligence))
+        session.no_new_intelligence_turns = 0 if delta else session.no_new_intelligence_turns + 1
 
-    session["totalMessages"] += 1
+    session.total_messages += 1
     if receiver_output.currentMessage.sender == "scammer":
-        session["scammerMessages"] += 1
-
-    if (
-        session["runtimeState"] == CALLBACK_READY
-        and not session["callbackSent"]
-    ):
-        send_callback(
-            CallbackPayload(
-                sessionId=session_id,
-                scamDetected=True,
-                totalMessagesExchanged=session["totalMessages"],
-                extractedIntelligence=session["extractedIntelligence"],
-                agentNotes=decision_output.agentNotes,
-            )
+        session.scammer_messages += 1
+
+    # Also when decide moves an unreported session on from CALLBACK_READY
+    # (the callback could not be handed over on an earlier turn). The
+    # session stays CALLBACK_READY until the worker accepts the callback.
+    if not session.callback_sent and CALLBACK_READY in (session.state, previous_state):
+        session.state = CALLBACK_READY
+        return CallbackPayload(
+            sessionId=session_id,
+            scamDetected=True,
+            totalMessagesExchanged=session.total_messages,
+            extractedIntelligence=session.intelligence_dict(),
+            agentNotes=decision_output.agentNotes,
         )
-        session["callbackSent"] = True
-        session["runtimeState"] = CLOSED
+    return None
+
+
+def _advance_session(receiver_output: ReceiverOutput) -> Tuple[DecisionOutput, Optional[CallbackPayload]]:
+    # All session state changes for a turn happen in one store transaction;
+    # the agent reply does not feed back into state, so the (slow) LLM call
+    # runs afterwards without holding the session.
+    with _SESSION_STORE.transaction(receiver_output.sessionId, SessionRecord) as session:
+        history_offset = 0
+        if SERVER_HISTORY_ENABLED:
+            history_offset = _sync_history(receiver_output, session)
+
+        previous_state = session.state
+        decision_output = _decide_turn(receiver_output, session)
+
+        if decision_output.nextAgentAction.shouldReply:
+            session.agent_messages += 1
+
+        callback = _finish_turn(receiver_output, decision_output, session, history_offset, previous_state)
+
+        if session.state == CLOSED:
+            # Nothing reads the history of a closed session
+            session.history = None
+
+    return decision_output, callback
+
 
+# ======================
+# Callback hand-off
+# ======================
+# The callback is handed to the worker after the turn's transaction, and
+# the session is marked reported only once the worker accepted it (it is
+# then in the durable outbox). The per-session lock is held throughout,
+# so no other turn of the session runs in between.
+def _mark_callback_sent(session_id: str) -> None:
+    with _SESSION_STORE.transaction(session_id, SessionRecord) as session:
+        session.callback_sent = True
+        session.state = CLOSED
+        session.history = None
+
+
+def _send_callback(payload: CallbackPayload) -> None:
+    started = perf_counter()
+    queued = enqueue_callback(payload)
+    _CALLBACK_SECONDS.observe(perf_counter() - started)
+    if queued:
+        _mark_callback_sent(payload.sessionId)
+
+
+async def _send_callback_async(payload: CallbackPayload, profile: Optional[ProfiledTurn]) -> None:
+    # The outbox write blocks (and waits on other processes): off the loop
+    started = perf_counter()
+    if profile is not None:
+        profile.pause()
+    queued = await asyncio.to_thread(enqueue_callback, payload)
+    if profile is not None:
+        profile.resume()
+    _CALLBACK_SECONDS.observe(perf_counter() - started)
+    if queued:
+        await _in_session_store(profile, _mark_callback_sent, payload.sessionId)
+
+
+async def _in_session_store(profile: Optional[ProfiledTurn], fn, *args):
+    # Store transactions that can block run off the event loop
+    if not _SESSION_STORE.blocking:
+        return fn(*args)
+
+    # BEGIN IMMEDIATE may wait on other processes' writes
+    if profile is not None:
+        profile.pause()
+    try:
+        return await asyncio.to_thread(fn, *args)
+    finally:
+        if profile is not None:
+            profile.resume()
+
+
+def _to_response(agent_output: Optional[AgentOutput]) -> dict:
     if agent_output:
         return agent_output.model_dump()
 
     return {"status": "success", "reply": ""}
+
+
+# ======================
+# Entry
+# ======================
+def handle_request(raw_payload: dict) -> dict:
+    profile = _PROFILER.sample()
+    if profile is None:
+        return _handle_turn(raw_payload, None)
+    with profile:
+        return _handle_turn(raw_payload, profile)
+
+
+async def handle_request_async(raw_payload: dict) -> dict:
+    profile = _PROFILER.sample()
+    if profile is None:
+        return await _handle_turn_async(raw_payload, None)
+    with profile:
+        return await _handle_turn_async(raw_payload, profile)
+
+
+def _handle_turn(raw_payload: dict, profile: Optional[ProfiledTurn]) -> dict:
+    started = perf_counter()
+    receiver_output = handle_receiver(raw_payload)
+    received = perf_counter()
+    _RECEIVER_SECONDS.observe(received - started)
+
+    with _SESSION_LOCKS.hold(receiver_output.sessionId):
+        locked = perf_counter()
+        _LOCK_WAIT_SECONDS.observe(locked - received)
+
+        decision_output, callback = _advance_session(receiver_output)
+        if callback is not None:
+            _send_callback(callback)
+        advanced = perf_counter()
+        _SESSION_SECONDS.observe(advanced - locked)
+        if profile is not None:
+            profile.tag(receiver_output.sessionId, decision_output.nextState)
+
+        agent_output = None
+
+        if decision_output.nextAgentAction.shouldReply:
+            agent_output = generate_reply(_agent_input(receiver_output, decision_output))
+            replied = perf_counter()
+            _AGENT_SECONDS.observe(replied - advanced)
+            _record_reply(receiver_output.sessionId, agent_output)
+            _RECORD_REPLY_SECONDS.observe(perf_counter() - replied)
+
+    response = _to_response(agent_output)
+    _TOTAL_SECONDS.observe(perf_counter() - started)
+    return response
+
+
+async def _handle_turn_async(raw_payload: dict, profile: Optional[ProfiledTurn]) -> dict:
+    # A sampled turn's profile is paused at each await: other requests run
+    # on the loop meanwhile
+    started = perf_counter()
+    receiver_output = handle_receiver(raw_payload)
+    received = perf_counter()
+    _RECEIVER_SECONDS.observe(received - started)
+
+    if profile is not None:
+        profile.pause()
+    async with _SESSION_LOCKS.hold_async(receiver_output.sessionId):
+        if profile is not None:
+            profile.resume()
+        locked = perf_counter()
+        _LOCK_WAIT_SECONDS.observe(locked - received)
+
+        decision_output, callback = await _in_session_store(profile, _advance_session, receiver_output)
+        if callback is not None:
+            await _send_callback_async(callback, profile)
+        advanced = perf_counter()
+        _SESSION_SECONDS.observe(advanced - locked)
+        if profile is not None:
+            profile.tag(receiver_output.sessionId, decision_output.nextState)
+
+        agent_output = None
+
+        if decision_output.nextAgentAction.shouldReply:
+            if profile is not None:
+                profile.pause()
+            agent_output = await generate_reply_async(
+                _agent_input(receiver_output, decision_output)
+            )
+            if profile is not None:
+                profile.resume()
+            replied = perf_counter()
+            _AGENT_SECONDS.observe(replied - advanced)
+            await _in_session_store(profile, _record_reply, receiver_output.sessionId, agent_output)
+            _RECORD_REPLY_SECONDS.observe(perf_counter() - replied)
+
+    response = _to_response(agent_output)
+    _TOTAL_SECONDS.observe(perf_counter() - started)
+    return response
+
+
+# ======================
+# Batch Entry
+# ======================
+async def _batch_item(raw_payload) -> dict:
+    # Same outcomes as a single /honeypot call, reported per item
+    if not isinstance(raw_payload, dict):
+        return {"status": 400, "detail": "Invalid ReceiverInput: item must be an object"}
+
+    try:
+        return {"status": 200, "response": await handle_request_async(raw_payload)}
+    except ValueError as e:
+        return {"status": 400, "detail": str(e)}
+    except Exception:
+        return {"status": 500, "detail": "Internal server error"}
+
+
+async def handle_batch_async(raw_payloads: List) -> List[dict]:
+    # Items of one session run in order; different sessions run
+    # concurrently (up to BATCH_MAX_CONCURRENCY at a time). Results come
+    # back in input order.
+    results: List[Optional[dict]] = [None] * len(raw_payloads)
+    by_session: Dict[object, List[int]] = {}
+    for index, raw_payload in enumerate(raw_payloads):
+        session_id = raw_payload.get("sessionId") if isinstance(raw_payload, dict) else None
+        # Unhashable ids are rejected by the receiver; keep them apart
+        key = session_id if isinstance(session_id, str) else ("item", index)
+        by_session.setdefault(key, []).append(index)
+
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def run_session(indexes: List[int]) -> None:
+        async with semaphore:
+            for index in indexes:
+                results[index] = await _batch_item(raw_payloads[index])
+
+    await asyncio.gather(*(run_session(indexes) for indexes in by_session.values()))
+    return results
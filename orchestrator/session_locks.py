@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List
+
+
+# ======================
+# Per-session locks
+# ======================
+# A turn (decision, extraction, LLM reply, recording the reply) must not
+# interleave with another turn of the same session, but different
+# sessions should never wait on each other. Each session gets its own
+# lock while it has turns in flight; the table of those locks is split
+# into shards, each guarded by a short-lived threading.Lock, so creating
+# and dropping entries does not serialize unrelated sessions either.
+# Entries are reference counted and removed when the last holder leaves,
+# so the table only holds sessions that are active right now.
+#
+# The sync path (threads) uses threading.Lock and the async path (event
+# loop) uses asyncio.Lock; a process serves requests through one of them.
+class _Shard:
+    __slots__ = ("guard", "locks")
+
+    def __init__(self):
+        self.guard = threading.Lock()
+        # session_id -> [lock, holders]
+        self.locks: Dict[str, List] = {}
+
+
+class SessionLocks:
+    def __init__(self, shards: int = 64):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._async_shards = [_Shard() for _ in range(max(1, shards))]
+
+    def _shard(self, shards: List[_Shard], session_id: str) -> _Shard:
+        # crc32 rather than hash(): stable across processes and runs
+        return shards[zlib.crc32(session_id.encode("utf-8")) % len(shards)]
+
+    def _checkout(self, shard: _Shard, session_id: str, factory):
+        with shard.guard:
+            entry = shard.locks.get(session_id)
+            if entry is None:
+                entry = shard.locks[session_id] = [factory(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _checkin(self, shard: _Shard, session_id: str) -> None:
+        with shard.guard:
+            entry = shard.locks[session_id]
+            entry[1] -= 1
+            if not entry[1]:
+                del shard.locks[session_id]
+
+    @contextmanager
+    def hold(self, session_id: str):
+        shard = self._shard(self._shards, session_id)
+        lock = self._checkout(shard, session_id, threading.Lock)
+        try:
+            with lock:
+                yield
+        finally:
+            self._checkin(shard, session_id)
+
+    @asynccontextmanager
+    async def hold_async(self, session_id: str):
+        shard = self._shard(self._async_shards, session_id)
+        lock = self._checkout(shard, session_id, asyncio.Lock)
+        try:
+            async with lock:
+                yield
+        finally:
+            self._checkin(shard, session_id)
+
+    def __len__(self) -> int:
+        # Sessions with a turn in flight or waiting
+        return sum(len(shard.locks) for shard in self._shards + self._async_shards)
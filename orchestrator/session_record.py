@@ -0,0 +1,140 @@
+import json
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from contracts.common_types import Message
+from extraction.accumulator import INTELLIGENCE_FIELDS, IntelligenceAccumulator
+
+
+# ======================
+# Runtime States
+# ======================
+class RuntimeState(IntEnum):
+    NEW_MESSAGE = 0
+    SUSPECTED_SCAM = 1
+    ENGAGING = 2
+    INTELLIGENCE_SATURATED = 3
+    SOFT_EXIT = 4
+    CALLBACK_READY = 5
+    CLOSED = 6
+
+
+# ======================
+# Session Record
+# ======================
+class SessionRecord:
+    __slots__ = (
+        "state",
+        "total_messages",
+        "scammer_messages",
+        "agent_messages",
+        "no_new_intelligence_turns",
+        "callback_sent",
+        "intelligence",
+        "history",
+        "history_start",
+        "extracted_upto",
+    )
+
+    def __init__(self):
+        self.state = RuntimeState.NEW_MESSAGE
+        self.total_messages = 0
+        self.scammer_messages = 0
+        self.agent_messages = 0
+        self.no_new_intelligence_turns = 0
+        self.callback_sent = False
+        # Only allocated once the session yields its first indicator
+        self.intelligence: Optional[IntelligenceAccumulator] = None
+        # Server-side conversation history (SERVER_HISTORY_ENABLED only)
+        self.history: Optional[List[Message]] = None
+        # Conversation position of history[0] (older messages were dropped)
+        self.history_start = 0
+        # Messages before this conversation position have been extracted
+        self.extracted_upto = 0
+
+    # ----------------------
+    # Intelligence
+    # ----------------------
+    def merge_intelligence(self, new: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        # Returns the indicators that are new to this session, by category
+        if self.intelligence is None:
+            if not any(new.get(field) for field in INTELLIGENCE_FIELDS):
+                return {}
+            self.intelligence = IntelligenceAccumulator()
+        return self.intelligence.merge(new)
+
+    def intelligence_present(self) -> Tuple[bool, ...]:
+        if self.intelligence is None:
+            return (False,) * len(INTELLIGENCE_FIELDS)
+        return self.intelligence.present()
+
+    def intelligence_dict(self) -> Dict[str, List[str]]:
+        if self.intelligence is None:
+            return {field: [] for field in INTELLIGENCE_FIELDS}
+        return self.intelligence.to_dict()
+
+    # ----------------------
+    # History
+    # ----------------------
+    def append_history(self, messages: List[Message], limit: int) -> None:
+        # Keeps only the most recent `limit` messages (0 keeps everything)
+        history = (self.history or []) + messages
+        if limit and len(history) > limit:
+            self.history_start += len(history) - limit
+            history = history[-limit:]
+        self.history = history
+
+    # ----------------------
+    # Serialization (SQLite backend)
+    # ----------------------
+    def to_json(self) -> str:
+        return json.dumps(
+            [
+                int(self.state),
+                self.total_messages,
+                self.scammer_messages,
+                self.agent_messages,
+                self.no_new_intelligence_turns,
+                self.callback_sent,
+                None if self.intelligence is None else self.intelligence.to_list(),
+                None if self.history is None else [
+                    [m.sender, m.text, m.timestamp] for m in self.history
+                ],
+                self.history_start,
+                self.extracted_upto,
+            ]
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> "SessionRecord":
+        (
+            state,
+            total_messages,
+            scammer_messages,
+            agent_messages,
+            no_new_intelligence_turns,
+            callback_sent,
+            intelligence,
+            *rest,
+        ) = json.loads(data)
+        # Rows written by older versions lack the trailing fields
+        history, history_start, extracted_upto = rest + [None, 0, 0][len(rest):]
+
+        record = cls()
+        record.state = RuntimeState(state)
+        record.total_messages = total_messages
+        record.scammer_messages = scammer_messages
+        record.agent_messages = agent_messages
+        record.no_new_intelligence_turns = no_new_intelligence_turns
+        record.callback_sent = callback_sent
+        record.history_start = history_start
+        record.extracted_upto = extracted_upto
+        if intelligence is not None:
+            record.intelligence = IntelligenceAccumulator.from_list(intelligence)
+        if history is not None:
+            # Validated when first received
+            record.history = [
+                Message.model_construct(sender=sender, text=text, timestamp=timestamp)
+                for sender, text, timestamp in history
+            ]
+        return record
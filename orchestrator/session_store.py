@@ -0,0 +1,330 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+SessionFactory = Callable[[], Any]
+ClosedPredicate = Callable[[Any], bool]
+
+# Sessions sampled when estimating the in-memory footprint
+_MEMORY_SAMPLE_SIZE = 64
+
+
+def _never_closed(session: Any) -> bool:
+    return False
+
+
+def _deep_sizeof(obj) -> int:
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k) + _deep_sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(v) for v in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(
+            _deep_sizeof(getattr(obj, name))
+            for name in obj.__slots__
+            if hasattr(obj, name)
+        )
+    return size
+
+
+# ======================
+# Interface
+# ======================
+class SessionStore(ABC):
+    # Whether a transaction can block on I/O or on other processes; the
+    # async path then runs it off the event loop
+    blocking = False
+
+    def __init__(
+        self,
+        idle_ttl_seconds: float = 0,
+        max_entries: int = 0,
+        is_closed: ClosedPredicate = _never_closed,
+        encode: Callable[[Any], str] = json.dumps,
+        decode: Callable[[str], Any] = json.loads,
+    ):
+        # 0 disables the corresponding limit
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_entries = max_entries
+        self.is_closed = is_closed
+        # Used by backends that persist sessions outside the process
+        self.encode = encode
+        self.decode = decode
+        self.evictions = {"expired": 0, "closed": 0, "lru": 0}
+
+    # transaction() yields the (possibly new) session for an atomic
+    # read-modify-write; changes are persisted when the block exits.
+    @abstractmethod
+    def transaction(self, session_id: str, factory: SessionFactory):
+        ...
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def memory_bytes(self) -> int:
+        ...
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self),
+            "evictedExpired": self.evictions["expired"],
+            "evictedClosed": self.evictions["closed"],
+            "evictedLru": self.evictions["lru"],
+            "memoryBytes": self.memory_bytes(),
+        }
+
+
+# ======================
+# In-memory (single process)
+# ======================
+class InMemorySessionStore(SessionStore):
+    def __init__(self, *args, clock: Callable[[], float] = time.monotonic, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clock = clock
+        # Ordered by last access: the front is the least recently used
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        # CLOSED sessions, oldest first; reclaimed before live ones
+        self._closed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self, session_id: str, factory: SessionFactory) -> Iterator[Any]:
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = factory()
+            else:
+                self._sessions.move_to_end(session_id)
+            self._touched[session_id] = now
+
+            yield session
+
+            if self.is_closed(session):
+                self._closed[session_id] = None
+            else:
+                self._closed.pop(session_id, None)
+            self._evict_overflow()
+
+    def _remove(self, session_id: str, reason: str) -> None:
+        del self._sessions[session_id]
+        del self._touched[session_id]
+        self._closed.pop(session_id, None)
+        self.evictions[reason] += 1
+
+    def _evict_expired(self, now: float) -> None:
+        if not self.idle_ttl_seconds:
+            return
+
+        deadline = now - self.idle_ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            if self._touched[oldest] > deadline:
+                break
+            self._remove(oldest, "expired")
+
+    def _evict_overflow(self) -> None:
+        if not self.max_entries:
+            return
+
+        while len(self._sessions) > self.max_entries:
+            if self._closed:
+                self._remove(next(iter(self._closed)), "closed")
+            else:
+                self._remove(next(iter(self._sessions)), "lru")
+
+    def get(self, session_id: str) -> Optional[Any]:
+        return self._sessions.get(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._touched.clear()
+            self._closed.clear()
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            count = len(self._sessions)
+            if not count:
+                return sys.getsizeof(self._sessions)
+            sample = list(islice(reversed(self._sessions.values()), _MEMORY_SAMPLE_SIZE))
+
+        per_session = sum(_deep_sizeof(s) for s in sample) / len(sample)
+        # Key string + LRU/touched/closed bookkeeping per entry
+        overhead = sys.getsizeof(self._sessions) + sys.getsizeof(self._touched)
+        return int(count * per_session) + overhead
+
+
+# ======================
+# SQLite (shared by all workers on a box)
+# ======================
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    closed INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+)
+"""
+_CLOSED_INDEX = "CREATE INDEX IF NOT EXISTS sessions_by_closed ON sessions (closed, updated_at)"
+_AGE_INDEX = "CREATE INDEX IF NOT EXISTS sessions_by_update ON sessions (updated_at)"
+
+
+class SQLiteSessionStore(SessionStore):
+    blocking = True
+
+    def __init__(self, path: str, *args, eviction_interval_seconds: float = 30, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = path
+        self.eviction_interval_seconds = eviction_interval_seconds
+        self._next_eviction = 0.0
+        self._eviction_lock = threading.Lock()
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute(_SCHEMA)
+        conn.execute(_CLOSED_INDEX)
+        conn.execute(_AGE_INDEX)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, session_id: str, factory: SessionFactory) -> Iterator[Any]:
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front, so concurrent turns for
+        # the same session (from any process) serialize instead of racing
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            session = self.decode(row[0]) if row else factory()
+
+            yield session
+
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, closed, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, self.encode(session), int(self.is_closed(session)), time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._maybe_evict()
+
+    def _maybe_evict(self) -> None:
+        # Sweeps run at most once per interval per process, off the
+        # critical section of the turn that triggers them
+        now = time.monotonic()
+        if now < self._next_eviction or not self._eviction_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_eviction = now + self.eviction_interval_seconds
+            self.evict()
+        finally:
+            self._eviction_lock.release()
+
+    def evict(self) -> None:
+        conn = self._conn()
+
+        if self.idle_ttl_seconds:
+            cursor = conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?",
+                (time.time() - self.idle_ttl_seconds,),
+            )
+            self.evictions["expired"] += cursor.rowcount
+
+        if self.max_entries:
+            overflow = len(self) - self.max_entries
+            for reason, closed_only in (("closed", True), ("lru", False)):
+                if overflow <= 0:
+                    break
+                cursor = conn.execute(
+                    "DELETE FROM sessions WHERE session_id IN ("
+                    "SELECT session_id FROM sessions "
+                    + ("WHERE closed = 1 " if closed_only else "")
+                    + "ORDER BY updated_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions[reason] += cursor.rowcount
+                overflow -= cursor.rowcount
+
+    def get(self, session_id: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        return self.decode(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM sessions")
+
+    def memory_bytes(self) -> int:
+        conn = self._conn()
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return pages * page_size
+
+
+def create_session_store(
+    backend: str,
+    path: str,
+    idle_ttl_seconds: float = 0,
+    max_entries: int = 0,
+    is_closed: ClosedPredicate = _never_closed,
+    encode: Callable[[Any], str] = json.dumps,
+    decode: Callable[[str], Any] = json.loads,
+) -> SessionStore:
+    limits = {
+        "idle_ttl_seconds": idle_ttl_seconds,
+        "max_entries": max_entries,
+        "is_closed": is_closed,
+        "encode": encode,
+        "decode": decode,
+    }
+
+    if backend == "memory":
+        return InMemorySessionStore(**limits)
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(path, **limits)
+
+    raise ValueError(f"Unknown session store backend: {backend}")
@@ -0,0 +1,73 @@
+# receiver/analysis.py
+
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from app.config import ANALYSIS_CACHE_SIZE, ANALYSIS_MAX_CHARS
+
+
+def _bounded(text: str, limit: int) -> str:
+    # Keeps scanning cost per message bounded whatever a client sends. The
+    # cut goes at the last whitespace before the limit when there is one
+    # nearby, so the final token is not scanned as a partial link or ID.
+    if not limit or len(text) <= limit:
+        return text
+    cut = max(text.rfind(" ", 0, limit + 1), text.rfind("\n", 0, limit + 1))
+    return text[:cut if cut >= limit // 2 else limit]
+
+
+# ======================
+# Analyzed Message
+# ======================
+# The receiver analyzes the current message once; decision and extraction
+# read from the same object instead of lowercasing and scanning the text
+# again. Everything except the lowercased text is computed on first use
+# and kept on the object, so a stage only pays for what it asks for.
+#
+# Keyword hits and indicator matches are cached per automaton / scanner
+# (decision and extraction use different keyword lists). The analysis
+# module does not import those stages; they pass their own matcher in.
+#
+# `text` is the message cut to ANALYSIS_MAX_CHARS; nothing past that is
+# scanned.
+class AnalyzedMessage:
+    __slots__ = ("text", "lowered", "_keyword_hits", "_indicators")
+
+    def __init__(self, text: str):
+        text = _bounded(text, ANALYSIS_MAX_CHARS)
+        self.text = text
+        self.lowered = text.lower()
+        self._keyword_hits: Optional[Dict] = None
+        self._indicators: Optional[Dict] = None
+
+    def keyword_hits(self, automaton) -> List:
+        if self._keyword_hits is None:
+            self._keyword_hits = {}
+        hits = self._keyword_hits.get(automaton)
+        if hits is None:
+            hits = self._keyword_hits[automaton] = automaton.scan(self.lowered)
+        return hits
+
+    def indicators(self, scanner) -> List:
+        if self._indicators is None:
+            self._indicators = {}
+        matches = self._indicators.get(scanner)
+        if matches is None:
+            matches = self._indicators[scanner] = scanner.scan(self.text, self.lowered)
+        return matches
+
+
+# Keyed by text, so later stages that only see the message text (decision,
+# extraction) get the object the receiver built for this turn. The cached
+# results are read-only to callers.
+#
+# The key is the text already cut to ANALYSIS_MAX_CHARS: the cache must
+# not hold on to the full body of oversized messages (history included),
+# and messages that only differ past the cut analyze the same anyway.
+def analyze_message(text: str) -> AnalyzedMessage:
+    return _analyze_bounded(_bounded(text, ANALYSIS_MAX_CHARS))
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _analyze_bounded(text: str) -> AnalyzedMessage:
+    return AnalyzedMessage(text)
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+
+# Fields that decide whether a raw history entry is unchanged
+_ENTRY_KEY = itemgetter("sender", "text", "timestamp")
+
+
+class _Validated(NamedTuple):
+    count: int
+    digest: int
+    messages: List
+    touched: float
+
+
+# ======================
+# Validated history prefixes
+# ======================
+# Clients resend the whole conversationHistory on every turn. For each
+# session this remembers how many entries were already validated and a
+# digest of them, so the next turn only validates the new tail. Entries
+# are keyed on their raw (sender, text, timestamp); map/itemgetter and
+# tuple hashing run in C, which is far cheaper than building a pydantic
+# Message per entry. If the prefix differs (edited or truncated history,
+# or a session this process has not seen), the caller does a full pass.
+class HistoryCache:
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # 0 disables the corresponding limit
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # LRU order: the front is the least recently used session
+        self._entries: "OrderedDict[str, _Validated]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def split(self, session_id: str, raw_history: List[dict]) -> Tuple[List, int, List[Tuple]]:
+        # Returns (already validated messages, index of the first entry
+        # still to validate, keys of all raw entries). Raises KeyError for
+        # entries missing a field, like a full validation would.
+        keys = list(map(_ENTRY_KEY, raw_history))
+
+        with self._lock:
+            cached = self._entries.get(session_id)
+
+        if cached is not None and 0 < cached.count <= len(keys):
+            try:
+                same_prefix = hash(tuple(keys[:cached.count])) == cached.digest
+            except TypeError:
+                # Unhashable field values; let validation report them
+                same_prefix = False
+            if same_prefix:
+                self.hits += 1
+                return cached.messages, cached.count, keys
+
+        self.misses += 1
+        return [], 0, keys
+
+    def store(self, session_id: str, keys: List[Tuple], messages: List) -> None:
+        if not messages:
+            return
+
+        now = self._clock()
+        entry = _Validated(len(messages), hash(tuple(keys)), messages, now)
+        with self._lock:
+            self._entries[session_id] = entry
+            self._entries.move_to_end(session_id)
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            deadline = now - self.ttl_seconds
+            while self._entries and next(iter(self._entries.values())).touched <= deadline:
+                self._entries.popitem(last=False)
+
+        if self.max_entries:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "historySessions": len(self._entries),
+            "historyHits": self.hits,
+            "historyMisses": self.misses,
+        }
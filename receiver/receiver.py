@@ -9,6 +9,16 @@ from contracts.receiver_contract import (
     ReceiverFlags,
 )
 from contracts.common_types import Message, Metadata
+from receiver.analysis import analyze_message
+from receiver.history_cache import HistoryCache
+from app.config import (
+    HISTORY_CACHE_MAX_SESSIONS,
+    HISTORY_CACHE_TTL_SECONDS,
+    SERVER_HISTORY_ENABLED,
+)
+
+
+_HISTORY_CACHE = HistoryCache(HISTORY_CACHE_TTL_SECONDS, HISTORY_CACHE_MAX_SESSIONS)
 
 
 def _normalize_timestamp(ts):
@@ -21,6 +31,28 @@ def _normalize_timestamp(ts):
     return ts
 
 
+def _normalize_history(session_id: str, raw_history: list) -> list:
+    # Only the entries after the already-validated prefix are rebuilt
+    validated, start, keys = _HISTORY_CACHE.split(session_id, raw_history)
+
+    history = list(validated)
+    for m in raw_history[start:]:
+        history.append(
+            Message(
+                sender=m["sender"],
+                text=m["text"],
+                timestamp=_normalize_timestamp(m["timestamp"]),
+            )
+        )
+
+    _HISTORY_CACHE.store(session_id, keys, history)
+    return history
+
+
+def history_stats() -> dict:
+    return _HISTORY_CACHE.stats()
+
+
 def handle_receiver(raw_payload: dict) -> ReceiverOutput:
     try:
         # ---- Normalize message ----
@@ -31,15 +63,21 @@ def handle_receiver(raw_payload: dict) -> ReceiverOutput:
             timestamp=_normalize_timestamp(msg["timestamp"]),
         )
 
+        # ---- Analyze once for decision / extraction ----
+        analyze_message(normalized_message.text)
+
         # ---- Normalize conversation history ----
-        history = []
-        for m in raw_payload.get("conversationHistory", []):
-            history.append(
-                Message(
-                    sender=m["sender"],
-                    text=m["text"],
-                    timestamp=_normalize_timestamp(m["timestamp"]),
-                )
+        # With server-side history a client may send only the new message;
+        # the orchestrator fills the history in from the session store
+        server_history = (
+            SERVER_HISTORY_ENABLED and "conversationHistory" not in raw_payload
+        )
+        if server_history:
+            history = []
+        else:
+            history = _normalize_history(
+                raw_payload["sessionId"],
+                raw_payload.get("conversationHistory", []),
             )
 
         # ---- Normalize metadata ----
@@ -53,6 +91,7 @@ def handle_receiver(raw_payload: dict) -> ReceiverOutput:
         flags = ReceiverFlags(
             isFirstMessage=len(history) == 0,
             hasHistory=len(history) > 0,
+            serverHistory=server_history,
         )
 
         return ReceiverOutput(
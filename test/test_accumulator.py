@@ -0,0 +1,33 @@
+from extraction.accumulator import IntelligenceAccumulator
+
+
+def test_merge_returns_only_new_indicators_in_order():
+    accumulator = IntelligenceAccumulator()
+
+    first = accumulator.merge({"upiIds": ["b@upi", "a@upi"], "phoneNumbers": []})
+    second = accumulator.merge(
+        {"upiIds": ["a@upi", "c@upi"], "suspiciousKeywords": ["otp", "otp"]}
+    )
+
+    assert first == {"upiIds": ["b@upi", "a@upi"]}
+    assert second == {"upiIds": ["c@upi"], "suspiciousKeywords": ["otp"]}
+    assert accumulator.merge({"upiIds": ["c@upi"]}) == {}
+    assert accumulator.to_dict() == {
+        "bankAccounts": [],
+        "upiIds": ["b@upi", "a@upi", "c@upi"],
+        "phishingLinks": [],
+        "phoneNumbers": [],
+        "suspiciousKeywords": ["otp"],
+    }
+
+
+def test_list_round_trip_keeps_order():
+    accumulator = IntelligenceAccumulator()
+    assert not accumulator
+
+    accumulator.merge({"phishingLinks": ["https://z.example", "https://a.example"]})
+    restored = IntelligenceAccumulator.from_list(accumulator.to_list())
+
+    assert restored
+    assert restored.to_dict() == accumulator.to_dict()
+    assert restored.merge({"phishingLinks": ["https://a.example"]}) == {}
@@ -0,0 +1,230 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from callback.outbox import DELIVERED, PENDING, CallbackOutbox, process_owner
+from callback.sent_sessions import SentSessions
+from callback.worker import CallbackWorker
+from contracts.callback_contract import CallbackPayload
+
+
+class _Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def _payload(session_id: str) -> CallbackPayload:
+    return CallbackPayload(
+        sessionId=session_id,
+        scamDetected=True,
+        totalMessagesExchanged=4,
+        extractedIntelligence={
+            "bankAccounts": [],
+            "upiIds": ["scammer@upi"],
+            "phishingLinks": [],
+            "phoneNumbers": [],
+            "suspiciousKeywords": ["urgent"],
+        },
+        agentNotes="Conversation complete, ready for callback.",
+    )
+
+
+def _worker(delivered: list) -> CallbackWorker:
+    return CallbackWorker(
+        url="http://callback.test/api",
+        timeout_seconds=1,
+        max_attempts=3,
+        backoff_seconds=0.01,
+        max_backoff_seconds=0.02,
+        max_queue_size=10,
+        on_delivered=lambda payload: delivered.append(payload.sessionId),
+    )
+
+
+def test_worker_retries_until_delivered(monkeypatch):
+    delivered = []
+    worker = _worker(delivered)
+    responses = iter([_Response(500), _Response(200)])
+    monkeypatch.setattr(worker._session, "post", lambda *a, **kw: next(responses))
+
+    assert worker.enqueue(_payload("sess-1")) is True
+    worker.join()
+    worker.stop()
+
+    stats = worker.stats()
+    assert delivered == ["sess-1"]
+    assert stats["delivered"] == 1
+    assert stats["retries"] == 1
+    assert stats["queueDepth"] == 0
+
+
+def test_worker_gives_up_after_max_attempts(monkeypatch):
+    delivered = []
+    worker = _worker(delivered)
+    monkeypatch.setattr(worker._session, "post", lambda *a, **kw: _Response(503))
+
+    worker.enqueue(_payload("sess-2"))
+    worker.join()
+    worker.stop()
+
+    assert delivered == []
+    assert worker.stats()["failed"] == 1
+
+
+def test_failing_callback_does_not_hold_up_later_ones(monkeypatch):
+    delivered = []
+    worker = _worker(delivered)
+    worker.backoff_seconds = worker.max_backoff_seconds = 5
+
+    def post(url, data, timeout):
+        return _Response(500 if "sess-slow" in data else 200)
+
+    monkeypatch.setattr(worker._session, "post", post)
+
+    worker.enqueue(_payload("sess-slow"))
+    time.sleep(0.1)
+    worker.enqueue(_payload("sess-fast"))
+    deadline = time.monotonic() + 2
+    while not delivered and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Delivered while sess-slow is still waiting out its 5 s backoff
+    assert delivered == ["sess-fast"]
+    assert worker.stats()["retryPending"] == 1
+    worker.stop()
+
+
+def test_outbox_dedupes_by_session(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    first = CallbackOutbox(path, owner="proc-a", claim_ttl_seconds=300)
+    second = CallbackOutbox(path, owner="proc-b", claim_ttl_seconds=300)
+
+    assert len(first.record_many([_payload("sess-3")])) == 1
+    assert second.record_many([_payload("sess-3")]) == []
+
+
+def _dead_owner() -> str:
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return f"{socket.gethostname()}:{child.pid}:0badf00d"
+
+
+def test_outbox_replays_undelivered_after_restart(tmp_path, monkeypatch):
+    path = str(tmp_path / "outbox.sqlite3")
+    # Crashed moments ago, well within the default claim TTL
+    crashed = CallbackOutbox(path, owner=_dead_owner(), claim_ttl_seconds=300)
+    crashed.record_many([_payload("sess-4"), _payload("sess-5")])
+    crashed.mark(["sess-5"], DELIVERED)
+    crashed.close()
+
+    delivered = []
+    worker = _worker(delivered)
+    worker.outbox = CallbackOutbox(path, owner=process_owner(), claim_ttl_seconds=300)
+    monkeypatch.setattr(worker._session, "post", lambda *a, **kw: _Response(200))
+
+    worker.start()
+    worker.stop()
+
+    assert delivered == ["sess-4"]
+    assert worker.outbox.status_of("sess-4") == DELIVERED
+
+
+def test_outbox_leaves_rows_of_live_processes(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    live = CallbackOutbox(path, owner=f"{socket.gethostname()}:{os.getppid()}:feedbeef", claim_ttl_seconds=300)
+    live.record_many([_payload("sess-6")])
+
+    assert CallbackOutbox(path, owner=process_owner(), claim_ttl_seconds=300).claim_undelivered() == []
+
+
+def test_enqueue_records_before_returning(tmp_path, monkeypatch):
+    release = threading.Event()
+    worker = _worker([])
+    worker.outbox = CallbackOutbox(str(tmp_path / "outbox.sqlite3"), owner=process_owner(), claim_ttl_seconds=300)
+    monkeypatch.setattr(worker._session, "post", lambda *a, **kw: release.wait(5) and _Response(200))
+
+    assert worker.enqueue(_payload("sess-7")) is True
+    assert worker.outbox.status_of("sess-7") == PENDING
+
+    release.set()
+    worker.join()
+    worker.stop()
+    assert worker.outbox.status_of("sess-7") == DELIVERED
+
+
+def test_queue_full_leaves_callback_in_the_outbox(tmp_path, monkeypatch):
+    delivered = []
+    worker = _worker(delivered)
+    worker._queue.maxsize = 1
+    worker.outbox = CallbackOutbox(str(tmp_path / "outbox.sqlite3"), owner=process_owner(), claim_ttl_seconds=300)
+    monkeypatch.setattr(worker, "start", lambda: None)
+    monkeypatch.setattr(worker._session, "post", lambda *a, **kw: _Response(200))
+
+    assert worker.enqueue(_payload("sess-9")) is True
+    assert worker.enqueue(_payload("sess-10")) is True
+    assert worker.outbox.status_of("sess-10") == PENDING
+
+    worker._reclaim(include_failed=False)
+    assert delivered == ["sess-10"]
+    assert worker.outbox.status_of("sess-10") == DELIVERED
+
+
+def test_concurrent_records_share_a_transaction(tmp_path, monkeypatch):
+    worker = _worker([])
+    worker.outbox = CallbackOutbox(str(tmp_path / "outbox.sqlite3"), owner=process_owner(), claim_ttl_seconds=300)
+    record_many = worker.outbox.record_many
+    batches = []
+
+    def slow_record_many(payloads):
+        payloads = list(payloads)
+        batches.append(len(payloads))
+        time.sleep(0.05)
+        return record_many(payloads)
+
+    monkeypatch.setattr(worker.outbox, "record_many", slow_record_many)
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(worker._record(_payload(f"sess-g{i}"))))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    assert sum(batches) == 8
+    assert len(batches) < 8
+
+
+def test_worker_takes_over_rows_while_running(tmp_path, monkeypatch):
+    path = str(tmp_path / "outbox.sqlite3")
+    delivered = []
+    worker = _worker(delivered)
+    worker.reclaim_interval_seconds = 0.05
+    worker.outbox = CallbackOutbox(path, owner=process_owner(), claim_ttl_seconds=300)
+    monkeypatch.setattr(worker._session, "post", lambda *a, **kw: _Response(200))
+    worker.start()
+
+    crashed = CallbackOutbox(path, owner=_dead_owner(), claim_ttl_seconds=300)
+    crashed.record_many([_payload("sess-8")])
+
+    deadline = time.monotonic() + 5
+    while not delivered and time.monotonic() < deadline:
+        time.sleep(0.02)
+    worker.stop()
+    assert delivered == ["sess-8"]
+
+
+def test_sent_sessions_are_bounded():
+    sent = SentSessions(ttl_seconds=0, max_entries=2)
+
+    for session_id in ("sess-a", "sess-b", "sess-c"):
+        sent.add(session_id)
+
+    assert "sess-a" not in sent
+    assert "sess-c" in sent
+    assert sent.stats()["sentEvictedLru"] == 1
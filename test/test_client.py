@@ -0,0 +1,18 @@
+import asyncio
+
+from aiagent import client
+
+
+def test_clients_are_shared_until_closed(monkeypatch):
+    monkeypatch.setattr(client, "GROQ_API_KEY", "test-key")
+
+    sync_client = client.get_client()
+    async_client = client.get_async_client()
+
+    assert client.get_client() is sync_client
+    assert client.get_async_client() is async_client
+
+    asyncio.run(client.aclose_clients())
+
+    assert client._CLIENT is None
+    assert client._ASYNC_CLIENT is None
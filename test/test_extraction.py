@@ -1,6 +1,9 @@
+import time
+
 import pytest
 
-from extraction.extraction import extract
+from extraction.extraction import SCANNER, UPI_REGEX, extract
+from extraction.scanner import PHONE, UPI, URL
 from contracts.extraction_contract import ExtractionInput
 
 
@@ -107,3 +110,115 @@ def test_duplicate_intelligence_no_delta():
     assert output.intelligence.phishingLinks == []
     assert output.intelligence.suspiciousKeywords == []
     assert output.deltaDetected is False
+
+
+def test_scanner_reports_typed_matches_with_positions():
+    text = "Pay pay.now@okaxis or visit https://kyc.example/9876543210"
+
+    matches = SCANNER.scan(text)
+
+    kinds = [(m.kind, m.value) for m in matches]
+    assert (UPI, "pay.now@okaxis") in kinds
+    assert (URL, "https://kyc.example/9876543210") in kinds
+    assert (PHONE, "9876543210") in kinds
+    assert all(text[m.start:m.end].lower() == m.value.lower() for m in matches)
+    assert [m.start for m in matches] == sorted(m.start for m in matches)
+
+
+def test_keywords_must_start_a_word():
+    input_data = ExtractionInput(
+        sessionId="sess-8",
+        messageText="Meet me at the embankment, it is urgent",
+        sender="scammer",
+        timestamp="2026-01-01T10:07:00Z",
+    )
+
+    output = extract(input_data)
+
+    assert output.intelligence.suspiciousKeywords == ["urgent"]
+
+
+def test_decision_and_extraction_share_one_analysis():
+    from receiver.analysis import analyze_message
+    from decision.decision import SCAM_AUTOMATON, _contains_scam_signals
+
+    text = "URGENT: verify your bank account at secure@upi"
+    analysis = analyze_message(text)
+
+    assert _contains_scam_signals(text)
+    output = extract(
+        ExtractionInput(
+            sessionId="sess-shared",
+            messageText=text,
+            sender="scammer",
+            timestamp="2026-01-01T10:00:00Z",
+        )
+    )
+
+    assert analyze_message(text) is analysis
+    assert analysis.lowered == text.lower()
+    assert analysis.indicators(SCANNER) == SCANNER.scan(text)
+    assert [hit.keyword for hit in analysis.keyword_hits(SCAM_AUTOMATON)] == [
+        "urgent", "verify", "bank", "account", "upi",
+    ]
+    assert output.intelligence.upiIds == ["secure@upi"]
+
+
+def test_scanner_upi_matches_regex_on_edge_cases():
+    texts = [
+        "x" * 300 + "@okaxis",
+        "q " + "a" * 256 + "@okaxis",
+        "ab@" + "c" * 64 + " and ab@" + "c" * 65,
+        "a@b@cd@ef refund@ybl@x",
+        "é Kelvin.ſ@OKAXIS é",
+    ]
+    for text in texts:
+        expected = [(m.group(), m.start(), m.end()) for m in UPI_REGEX.finditer(text)]
+        found = [(m.value, m.start, m.end) for m in SCANNER.scan(text) if m.kind == UPI]
+        assert found == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "a." * 50_000 + "@1",
+        "é " + "a." * 50_000 + "@1",
+        "9 " * 50_000,
+        "https://" + "x" * 100_000,
+    ],
+)
+def test_scanner_stays_fast_on_hostile_input(text):
+    # The unbounded patterns took minutes on the first two
+    start = time.perf_counter()
+    SCANNER.scan(text)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_oversized_message_is_cut_before_scanning():
+    from receiver.analysis import _bounded
+
+    text = "call 9876543210 " + "word " * 10 + "refund@okaxis"
+
+    assert _bounded(text, 0) == text
+    assert _bounded(text, len(text)) == text
+    # Cut at the last space, not inside the UPI ID
+    assert _bounded(text, len(text) - 3) == text[: text.rindex(" ")]
+    assert _bounded("x" * 100, 40) == "x" * 40
+
+
+def test_analysis_cache_does_not_keep_oversized_messages():
+    import sys
+
+    from app.config import ANALYSIS_MAX_CHARS
+    from receiver.analysis import analyze_message
+
+    body = "pay to refund@okaxis now " * (ANALYSIS_MAX_CHARS // 10)
+    big = body + "tail one"
+    refs = sys.getrefcount(big)
+
+    analysis = analyze_message(big)
+
+    # Cached under the cut text, not the full body
+    assert sys.getrefcount(big) == refs
+    assert len(analysis.text) <= ANALYSIS_MAX_CHARS
+    assert analyze_message(body + "tail two") is analysis
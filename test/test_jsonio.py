@@ -0,0 +1,20 @@
+import pytest
+
+from app import jsonio
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_round_trip_matches_json_response_format(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(jsonio, "orjson", None)
+    elif jsonio.orjson is None:
+        pytest.skip("orjson not installed")
+
+    body = '{"sessionId": "s-1", "message": {"text": "नमस्ते"}}'.encode("utf-8")
+
+    assert jsonio.loads(body) == {"sessionId": "s-1", "message": {"text": "नमस्ते"}}
+    assert jsonio.dumps({"status": "success", "reply": "ठीक है"}) == (
+        '{"status":"success","reply":"ठीक है"}'.encode("utf-8")
+    )
+    with pytest.raises(ValueError):
+        jsonio.loads(b"{not json")
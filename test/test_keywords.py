@@ -0,0 +1,43 @@
+from keywords.automaton import KeywordAutomaton, load_keywords
+
+
+def test_all_hits_found_in_one_scan():
+    automaton = KeywordAutomaton(["bank", "bank account", "account", "otp"])
+
+    hits = automaton.find_all("Share your BANK   Account number and OTP")
+
+    assert [h.keyword for h in hits] == ["bank", "bank account", "account", "otp"]
+    assert hits[1].start == 11 and hits[1].end == 25
+
+
+def test_left_word_boundary():
+    automaton = KeywordAutomaton(["bank", "urgent"])
+
+    assert automaton.contains_any("walk along the embankment") is False
+    assert [h.keyword for h in automaton.find_all("urgently visit the bank")] == ["urgent", "bank"]
+
+
+def test_whole_words():
+    automaton = KeywordAutomaton(["urgent"], whole_words=True)
+
+    assert automaton.contains_any("urgently") is False
+    assert automaton.contains_any("this is urgent!") is True
+
+
+def test_keywords_loaded_from_file(tmp_path):
+    path = tmp_path / "keywords.txt"
+    path.write_text("# campaign phrases\nKYC update\n\nelectricity bill\n", encoding="utf-8")
+
+    automaton = KeywordAutomaton(load_keywords(str(path)))
+
+    assert automaton.keywords == ["kyc update", "electricity bill"]
+    assert automaton.contains_any("Your KYC\nupdate is pending")
+
+
+def test_scales_to_thousands_of_keywords():
+    keywords = [f"campaign{i} offer" for i in range(5000)]
+    automaton = KeywordAutomaton(keywords)
+
+    hits = automaton.find_all("claim CAMPAIGN4999 offer and campaign12 offer now")
+
+    assert [h.keyword for h in hits] == ["campaign4999 offer", "campaign12 offer"]
@@ -0,0 +1,55 @@
+from metrics.registry import Registry, render_gauges
+
+
+def test_counter_renders_labelled_samples():
+    registry = Registry()
+    transitions = registry.counter("x_transitions_total", "State changes", ("from_state", "to_state"))
+
+    transitions.labels("NEW_MESSAGE", "ENGAGING").inc()
+    transitions.labels("NEW_MESSAGE", "ENGAGING").inc(2)
+    transitions.labels('we"ird', "a\\b").inc()
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP x_transitions_total State changes", "# TYPE x_transitions_total counter"]
+    assert 'x_transitions_total{from_state="NEW_MESSAGE",to_state="ENGAGING"} 3.0' in lines
+    assert 'x_transitions_total{from_state="we\\"ird",to_state="a\\\\b"} 1.0' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("x_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    decide = latency.labels("decide")
+
+    for value in (0.05, 0.5, 0.7, 3.0):
+        decide.observe(value)
+    with decide.time():
+        pass
+
+    text = registry.render()
+    assert 'x_seconds_bucket{stage="decide",le="0.1"} 2' in text
+    assert 'x_seconds_bucket{stage="decide",le="1.0"} 4' in text
+    assert 'x_seconds_bucket{stage="decide",le="+Inf"} 5' in text
+    assert 'x_seconds_count{stage="decide"} 5' in text
+    assert decide.count == 5
+    assert abs(decide.sum - 4.25) < 0.01
+
+
+def test_registering_a_name_twice_returns_the_same_family():
+    registry = Registry()
+    first = registry.counter("x_total", "Things")
+
+    assert registry.counter("x_total", "Things") is first
+    try:
+        registry.histogram("x_total", "Things")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("conflicting registration accepted")
+
+
+def test_stats_dicts_render_as_gauges():
+    text = render_gauges("x_callback", {"queueDepth": 3, "avgDeliveryLatencySeconds": 0.5, "label": "n/a"})
+
+    assert "# TYPE x_callback_queue_depth gauge\nx_callback_queue_depth 3.0\n" in text
+    assert "x_callback_avg_delivery_latency_seconds 0.5" in text
+    assert "label" not in text
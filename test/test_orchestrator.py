@@ -0,0 +1,251 @@
+import asyncio
+
+import pytest
+
+from orchestrator import orchestrator
+from contracts.agent_contract import AgentOutput
+
+
+def _payload(session_id: str, text: str):
+    return {
+        "sessionId": session_id,
+        "message": {
+            "sender": "scammer",
+            "text": text,
+            "timestamp": 1767261600000,
+        },
+        "conversationHistory": [],
+        "metadata": {
+            "channel": "SMS",
+            "language": "en",
+            "locale": "IN",
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def _stub_io(monkeypatch):
+    async def fake_reply_async(agent_input):
+        return AgentOutput(status="success", reply="async reply")
+
+    monkeypatch.setattr(orchestrator, "generate_reply", lambda _: AgentOutput(status="success", reply="sync reply"))
+    monkeypatch.setattr(orchestrator, "generate_reply_async", fake_reply_async)
+    monkeypatch.setattr(orchestrator, "enqueue_callback", lambda _: True)
+    orchestrator._SESSION_STORE.clear()
+
+
+def test_sync_request_replies_on_scam_signal():
+    result = orchestrator.handle_request(_payload("sess-sync", "Your account is blocked, verify now"))
+
+    assert result == {"status": "success", "reply": "sync reply"}
+    assert orchestrator._SESSION_STORE.get("sess-sync").state == orchestrator.SUSPECTED_SCAM
+
+
+def test_async_request_matches_sync_flow():
+    result = asyncio.run(
+        orchestrator.handle_request_async(_payload("sess-async", "Your account is blocked, verify now"))
+    )
+
+    assert result == {"status": "success", "reply": "async reply"}
+    assert orchestrator._SESSION_STORE.get("sess-async").state == orchestrator.SUSPECTED_SCAM
+
+
+def test_async_requests_run_concurrently():
+    async def run():
+        return await asyncio.gather(
+            *[
+                orchestrator.handle_request_async(_payload(f"sess-{i}", "Hello there"))
+                for i in range(50)
+            ]
+        )
+
+    results = asyncio.run(run())
+
+    assert all(r == {"status": "success", "reply": ""} for r in results)
+    assert len(orchestrator._SESSION_STORE) == 50
+
+
+def test_async_request_runs_sqlite_session_off_the_loop(monkeypatch, tmp_path):
+    import threading
+
+    from orchestrator.session_record import SessionRecord
+    from orchestrator.session_store import create_session_store
+
+    store = create_session_store(
+        "sqlite",
+        str(tmp_path / "sessions.sqlite3"),
+        encode=SessionRecord.to_json,
+        decode=SessionRecord.from_json,
+    )
+    monkeypatch.setattr(orchestrator, "_SESSION_STORE", store)
+    threads = []
+    advance = orchestrator._advance_session
+    monkeypatch.setattr(
+        orchestrator,
+        "_advance_session",
+        lambda receiver_output: (threads.append(threading.get_ident()), advance(receiver_output))[1],
+    )
+
+    async def run():
+        result = await orchestrator.handle_request_async(_payload("sess-sqlite", "Your account is blocked, verify now"))
+        return result, threading.get_ident()
+
+    result, loop_thread = asyncio.run(run())
+
+    assert result == {"status": "success", "reply": "async reply"}
+    assert threads and loop_thread not in threads
+    assert store.get("sess-sqlite").state == orchestrator.SUSPECTED_SCAM
+
+
+def test_async_reply_is_recorded_off_the_loop_with_sqlite(monkeypatch, tmp_path):
+    import threading
+
+    from orchestrator.session_record import SessionRecord
+    from orchestrator.session_store import create_session_store
+
+    store = create_session_store(
+        "sqlite",
+        str(tmp_path / "sessions.sqlite3"),
+        encode=SessionRecord.to_json,
+        decode=SessionRecord.from_json,
+    )
+    monkeypatch.setattr(orchestrator, "_SESSION_STORE", store)
+    monkeypatch.setattr(orchestrator, "SERVER_HISTORY_ENABLED", True)
+    threads = []
+    record_reply = orchestrator._record_reply
+    monkeypatch.setattr(
+        orchestrator,
+        "_record_reply",
+        lambda *args: (threads.append(threading.get_ident()), record_reply(*args))[1],
+    )
+
+    async def run():
+        await orchestrator.handle_request_async(_payload("sess-sqlite-history", "Your account is blocked, verify now"))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert threads and loop_thread not in threads
+    history = store.get("sess-sqlite-history").history
+    assert [m.text for m in history] == ["Your account is blocked, verify now", "async reply"]
+
+
+def test_callback_not_handed_over_is_retried_next_turn(monkeypatch):
+    attempts = []
+    monkeypatch.setattr(orchestrator, "enqueue_callback", lambda payload: attempts.append(payload) or len(attempts) > 1)
+    with orchestrator._SESSION_STORE.transaction("sess-cb", orchestrator.SessionRecord) as session:
+        session.state = orchestrator.CALLBACK_READY
+
+    orchestrator.handle_request(_payload("sess-cb", "Hello?"))
+    session = orchestrator._SESSION_STORE.get("sess-cb")
+    assert (session.state, session.callback_sent) == (orchestrator.CALLBACK_READY, False)
+
+    asyncio.run(orchestrator.handle_request_async(_payload("sess-cb", "Hello?")))
+    session = orchestrator._SESSION_STORE.get("sess-cb")
+    assert (session.state, session.callback_sent) == (orchestrator.CLOSED, True)
+    assert [p.sessionId for p in attempts] == ["sess-cb", "sess-cb"]
+
+
+def test_server_side_history_accepts_delta_payloads(monkeypatch):
+    from receiver import receiver
+
+    monkeypatch.setattr(receiver, "SERVER_HISTORY_ENABLED", True)
+    monkeypatch.setattr(orchestrator, "SERVER_HISTORY_ENABLED", True)
+    seen = []
+
+    def fake_reply(agent_input):
+        seen.append([(m.sender, m.text) for m in agent_input.history])
+        return AgentOutput(status="success", reply=f"reply {len(seen)}")
+
+    monkeypatch.setattr(orchestrator, "generate_reply", fake_reply)
+
+    for text in ("Your account is blocked", "Verify with OTP urgently"):
+        payload = _payload("sess-delta", text)
+        del payload["conversationHistory"]
+        orchestrator.handle_request(payload)
+
+    assert seen == [
+        [],
+        [("scammer", "Your account is blocked"), ("user", "reply 1")],
+    ]
+    session = orchestrator._SESSION_STORE.get("sess-delta")
+    assert [m.text for m in session.history][-1] == "reply 2"
+
+
+def test_resumed_conversation_extracts_history_once(monkeypatch):
+    from extraction import extraction
+
+    scanned = []
+    real_extract_texts = extraction._extract_texts
+    monkeypatch.setattr(
+        extraction,
+        "_extract_texts",
+        lambda session_id, texts: scanned.append(list(texts)) or real_extract_texts(session_id, texts),
+    )
+
+    history = [
+        {"sender": "scammer", "text": "Pay to refund@upi", "timestamp": 1767261500000},
+        {"sender": "user", "text": "Why? Call 9876543210?", "timestamp": 1767261510000},
+    ]
+    payload = _payload("sess-resume", "Your account is blocked, verify now")
+    payload["conversationHistory"] = history
+    orchestrator.handle_request(payload)
+
+    session = orchestrator._SESSION_STORE.get("sess-resume")
+    assert session.intelligence_dict()["upiIds"] == ["refund@upi"]
+    assert session.intelligence_dict()["phoneNumbers"] == []
+    assert session.extracted_upto == 3
+
+    payload = _payload("sess-resume", "Send the OTP urgently")
+    payload["conversationHistory"] = history + [
+        {"sender": "scammer", "text": "Your account is blocked, verify now", "timestamp": 1767261600000},
+        {"sender": "user", "text": "sync reply", "timestamp": 1767261610000},
+    ]
+    orchestrator.handle_request(payload)
+
+    assert scanned == [
+        ["Pay to refund@upi", "Your account is blocked, verify now"],
+        ["Send the OTP urgently"],
+    ]
+    assert orchestrator._SESSION_STORE.get("sess-resume").extracted_upto == 5
+
+
+def test_batch_keeps_per_session_order_and_reports_each_item(monkeypatch):
+    calls = []
+
+    async def slow_reply(agent_input):
+        calls.append((agent_input.sessionId, agent_input.currentMessage.text))
+        await asyncio.sleep(0.01)
+        return AgentOutput(status="success", reply=agent_input.currentMessage.text)
+
+    monkeypatch.setattr(orchestrator, "generate_reply_async", slow_reply)
+
+    payloads = []
+    for turn in range(3):
+        for session in ("a", "b"):
+            payloads.append(_payload(f"sess-batch-{session}", f"verify {session}{turn}"))
+    payloads.insert(2, {"sessionId": "sess-bad"})
+    payloads.append("not an object")
+
+    results = asyncio.run(orchestrator.handle_batch_async(payloads))
+
+    assert [r["status"] for r in results] == [200, 200, 400, 200, 200, 200, 200, 400]
+    assert results[0]["response"] == {"status": "success", "reply": "verify a0"}
+    for session in ("a", "b"):
+        texts = [text for sid, text in calls if sid == f"sess-batch-{session}"]
+        assert texts == [f"verify {session}{turn}" for turn in range(3)]
+    # The two sessions were interleaved rather than run one after the other
+    assert calls[:2] == [("sess-batch-a", "verify a0"), ("sess-batch-b", "verify b0")]
+
+
+def test_turn_records_stage_timings_and_transitions():
+    total = orchestrator._TOTAL_SECONDS.count
+    decided = orchestrator.STATE_TRANSITIONS.labels("NEW_MESSAGE", "SUSPECTED_SCAM").value
+
+    orchestrator.handle_request(_payload("sess-metrics", "Your account is blocked, verify now"))
+
+    assert orchestrator._TOTAL_SECONDS.count == total + 1
+    assert orchestrator.STATE_TRANSITIONS.labels("NEW_MESSAGE", "SUSPECTED_SCAM").value == decided + 1
+    text = orchestrator.REGISTRY.render()
+    for stage in ("receiver", "lock_wait", "session", "decide", "extract", "agent", "record_reply"):
+        assert f'fraudguard_stage_seconds_count{{stage="{stage}"}}' in text
@@ -0,0 +1,85 @@
+import asyncio
+import os
+
+from metrics import profile_report
+from metrics.profiler import RequestProfiler, list_dumps
+from orchestrator import orchestrator
+from contracts.agent_contract import AgentOutput
+
+
+def _work():
+    return sum(i * i for i in range(2000))
+
+
+def _profile_turns(profiler: RequestProfiler, count: int, state: str = "ENGAGING") -> None:
+    for i in range(count):
+        profile = profiler.sample()
+        if profile is None:
+            continue
+        with profile:
+            _work()
+            profile.tag(f"sess/{i}", state)
+
+
+def test_one_turn_in_n_is_written_with_its_tags(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_every=3)
+
+    _profile_turns(profiler, 9)
+
+    dumps = list_dumps(str(tmp_path))
+    assert len(dumps) == 3
+    assert all("-ENGAGING-" in name for name in dumps)
+    # Unsafe characters in the session id are replaced
+    assert dumps[0].endswith("-sess_0.prof")
+
+
+def test_fast_turns_are_dropped_and_directory_rotates(tmp_path):
+    slow_only = RequestProfiler(str(tmp_path / "slow"), sample_every=1, slow_seconds=60)
+    _profile_turns(slow_only, 5)
+    assert slow_only.written == 0
+
+    rotating = RequestProfiler(str(tmp_path / "all"), sample_every=1, max_files=4)
+    _profile_turns(rotating, 10)
+    dumps = list_dumps(str(tmp_path / "all"))
+    assert rotating.written == 10
+    assert len(dumps) == 4
+    assert dumps[-1].endswith("-sess_9.prof")
+
+
+def test_report_merges_and_filters_dumps(tmp_path, capsys):
+    profiler = RequestProfiler(str(tmp_path), sample_every=1)
+    _profile_turns(profiler, 2, state="ENGAGING")
+    _profile_turns(profiler, 1, state="SOFT_EXIT")
+    merged = tmp_path / "merged.prof"
+
+    assert profile_report.main([str(tmp_path), "--state", "ENGAGING", "--output", str(merged)]) == 0
+
+    out = capsys.readouterr().out
+    assert "ENGAGING" in out and "SOFT_EXIT" not in out
+    assert "_work" in out
+    assert merged.exists()
+    assert profile_report.main([str(tmp_path), "--session", "nope"]) == 1
+
+
+def test_async_turn_profile_is_tagged_with_session_state(tmp_path, monkeypatch):
+    async def fake_reply_async(agent_input):
+        await asyncio.sleep(0)
+        return AgentOutput(status="success", reply="async reply")
+
+    monkeypatch.setattr(orchestrator, "generate_reply_async", fake_reply_async)
+    monkeypatch.setattr(orchestrator, "_PROFILER", RequestProfiler(str(tmp_path), sample_every=1))
+    orchestrator._SESSION_STORE.clear()
+
+    asyncio.run(
+        orchestrator.handle_request_async(
+            {
+                "sessionId": "sess-profiled",
+                "message": {"sender": "scammer", "text": "Your account is blocked", "timestamp": 1767261600000},
+                "conversationHistory": [],
+                "metadata": {"channel": "SMS", "language": "en", "locale": "IN"},
+            }
+        )
+    )
+
+    (name,) = os.listdir(tmp_path)
+    assert "-SUSPECTED_SCAM-" in name and name.endswith("-sess-profiled.prof")
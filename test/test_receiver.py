@@ -0,0 +1,65 @@
+import pytest
+
+from receiver import receiver
+from receiver.history_cache import HistoryCache
+
+
+def _payload(session_id, history, text="Share the OTP now"):
+    return {
+        "sessionId": session_id,
+        "message": {"sender": "scammer", "text": text, "timestamp": 1767261600000},
+        "conversationHistory": history,
+        "metadata": {"channel": "SMS", "language": "English", "locale": "IN"},
+    }
+
+
+def _entry(i, sender="scammer"):
+    return {"sender": sender, "text": f"message {i}", "timestamp": 1767261600000 + i}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(receiver, "_HISTORY_CACHE", HistoryCache(0, 0))
+
+
+def test_only_new_history_entries_are_validated(monkeypatch):
+    history = [_entry(i) for i in range(3)]
+    first = receiver.handle_receiver(_payload("sess-h", history))
+
+    built = []
+    real_message = receiver.Message
+    monkeypatch.setattr(
+        receiver, "Message", lambda **kw: built.append(kw) or real_message(**kw)
+    )
+    history = history + [_entry(3, "user"), _entry(4)]
+    second = receiver.handle_receiver(_payload("sess-h", history))
+
+    # The current message plus the two new history entries
+    assert [kw["text"] for kw in built] == ["Share the OTP now", "message 3", "message 4"]
+    assert second.history[:3] == first.history
+    assert [m.text for m in second.history] == [f"message {i}" for i in range(5)]
+    assert receiver.history_stats()["historyHits"] == 1
+
+
+def test_changed_prefix_falls_back_to_full_validation():
+    history = [_entry(i) for i in range(3)]
+    receiver.handle_receiver(_payload("sess-e", history))
+
+    edited = [dict(history[0], text="edited")] + history[1:] + [_entry(3)]
+    output = receiver.handle_receiver(_payload("sess-e", edited))
+
+    assert output.history[0].text == "edited"
+    assert len(output.history) == 4
+    assert receiver.history_stats()["historyHits"] == 0
+
+
+def test_invalid_new_entry_is_still_rejected():
+    history = [_entry(i) for i in range(2)]
+    receiver.handle_receiver(_payload("sess-i", history))
+
+    with pytest.raises(ValueError):
+        receiver.handle_receiver(
+            _payload("sess-i", history + [{"sender": "bot", "text": "x", "timestamp": "t"}])
+        )
+    with pytest.raises(ValueError):
+        receiver.handle_receiver(_payload("sess-i", history + [{"sender": "user"}]))
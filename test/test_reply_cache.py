@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiagent import agent
+from aiagent.reply_cache import ReplyCache
+from contracts.common_types import Message, Metadata, ResponseStyle
+from contracts.trusted import AgentConstraints, AgentInput
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _message(sender: str, text: str) -> Message:
+    return Message(sender=sender, text=text, timestamp="2026-01-01T10:00:00+00:00")
+
+
+def _agent_input(text: str, style=ResponseStyle.HESITANT, locale="IN") -> AgentInput:
+    return AgentInput(
+        sessionId="sess",
+        currentMessage=_message("scammer", text),
+        history=[_message("scammer", "Your account is blocked"), _message("user", "Which account?")],
+        metadata=Metadata(channel="SMS", language="English", locale=locale),
+        responseStyle=style,
+        constraints=AgentConstraints(noAccusation=True, noIllegalAdvice=True, softTone=True),
+    )
+
+
+def _key(cache: ReplyCache, agent_input: AgentInput) -> bytes:
+    return cache.key(
+        agent_input.responseStyle.value,
+        agent_input.metadata.language,
+        agent_input.metadata.locale,
+        agent_input.history,
+        agent_input.currentMessage,
+    )
+
+
+def test_same_script_with_different_details_shares_a_key():
+    cache = ReplyCache(100, 0, 0)
+
+    first = _key(cache, _agent_input("Pay Rs 10 to refund1@okaxis or call 9876543210"))
+    second = _key(cache, _agent_input("Pay  Rs 99 to desk.77@ybl or call 9123456780"))
+
+    assert first == second
+    assert _key(cache, _agent_input("Pay Rs 10 now", style=ResponseStyle.NAIVE)) != _key(
+        cache, _agent_input("Pay Rs 10 now")
+    )
+    assert _key(cache, _agent_input("Pay Rs 10 now", locale="US")) != _key(cache, _agent_input("Pay Rs 10 now"))
+
+
+def test_reply_is_dropped_after_max_reuse():
+    cache = ReplyCache(100, 0, max_reuse=2)
+    cache.put(b"k", "Okay, what should I do first?")
+
+    assert cache.get(b"k") == "Okay, what should I do first?"
+    assert cache.get(b"k") == "Okay, what should I do first?"
+    assert cache.get(b"k") is None
+    assert cache.stats()["replyCacheExhausted"] == 1
+
+
+def test_entries_expire_and_are_bounded():
+    clock = _Clock()
+    cache = ReplyCache(2, ttl_seconds=10, max_reuse=0, clock=clock)
+    cache.put(b"a", "reply a")
+    cache.put(b"b", "reply b")
+
+    clock.now = 5
+    assert cache.get(b"a") == "reply a"
+    cache.put(b"c", "reply c")
+    # b was the least recently used
+    assert cache.get(b"b") is None
+
+    clock.now = 20
+    assert cache.get(b"a") is None
+    stats = cache.stats()
+    assert stats["replyCacheExpired"] == 1
+    assert stats["replyCacheHitRate"] == 1 / 3
+
+
+def test_agent_serves_repeated_script_from_cache(monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        reply = "" if len(calls) == 1 else "Sorry, which account do you mean?"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    async def create_async(**kwargs):
+        return create(**kwargs)
+
+    completions = SimpleNamespace(create=create)
+    monkeypatch.setattr(agent, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(agent, "get_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(
+        agent,
+        "get_async_client",
+        lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create_async))),
+    )
+    monkeypatch.setattr(agent, "_REPLY_CACHE", ReplyCache(100, 0, 0))
+    monkeypatch.setattr(agent, "AGENT_TEMPLATE_FALLBACK", False)
+
+    # An empty (failed) reply is not cached
+    assert agent.generate_reply(_agent_input("Send OTP to 9876543210")).status == "fail"
+    assert agent.generate_reply(_agent_input("Send OTP to 9876543210")).reply == "Sorry, which account do you mean?"
+    assert len(calls) == 2
+
+    served = agent.generate_reply(_agent_input("Send OTP to 9123456789"))
+    served_async = asyncio.run(agent.generate_reply_async(_agent_input("Send OTP to 9000000001")))
+
+    assert served.reply == served_async.reply == "Sorry, which account do you mean?"
+    assert len(calls) == 2
+    assert agent.reply_cache_stats()["replyCacheHits"] == 2
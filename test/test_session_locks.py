@@ -0,0 +1,125 @@
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+from contracts.agent_contract import AgentOutput
+from orchestrator import orchestrator
+from orchestrator.session_locks import SessionLocks
+from receiver import receiver
+
+
+def test_same_session_is_exclusive_and_others_run_in_parallel():
+    locks = SessionLocks(shards=1)
+    inside = {"a": 0, "b": 0}
+    overlap = []
+    both_sessions_inside = threading.Event()
+
+    def turn(session_id):
+        with locks.hold(session_id):
+            inside[session_id] += 1
+            overlap.append(inside[session_id])
+            if inside["a"] and inside["b"]:
+                both_sessions_inside.set()
+            time.sleep(0.01)
+            inside[session_id] -= 1
+
+    threads = [threading.Thread(target=turn, args=(sid,)) for sid in "abababab"]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max(overlap) == 1
+    # Both sessions share the only shard, yet were inside at the same time
+    assert both_sessions_inside.is_set()
+    assert len(locks) == 0
+
+
+# ======================
+# Stress: concurrent turns through the orchestrator
+# ======================
+def _payload(session_id, text):
+    return {
+        "sessionId": session_id,
+        "message": {"sender": "scammer", "text": text, "timestamp": 1767261600000},
+        "metadata": {"channel": "SMS", "language": "en", "locale": "IN"},
+    }
+
+
+def _reply(agent_input):
+    return AgentOutput(status="success", reply="re: " + agent_input.currentMessage.text)
+
+
+@pytest.fixture
+def server_history(monkeypatch):
+    monkeypatch.setattr(receiver, "SERVER_HISTORY_ENABLED", True)
+    monkeypatch.setattr(orchestrator, "SERVER_HISTORY_ENABLED", True)
+    monkeypatch.setattr(orchestrator, "SERVER_HISTORY_MAX_MESSAGES", 0)
+    monkeypatch.setattr(orchestrator, "enqueue_callback", lambda _: True)
+    orchestrator._SESSION_STORE.clear()
+
+
+def _check_invariants(session_ids, turns):
+    for session_id in session_ids:
+        session = orchestrator._SESSION_STORE.get(session_id)
+        assert session.total_messages == turns
+        assert session.scammer_messages == turns
+        assert session.agent_messages == turns
+        assert session.state == orchestrator.SUSPECTED_SCAM
+
+        # Every message is directly followed by its own reply
+        history = session.history
+        assert len(history) == 2 * turns
+        for message, reply in zip(history[::2], history[1::2]):
+            assert (message.sender, reply.sender) == ("scammer", "user")
+            assert reply.text == "re: " + message.text
+    assert len(orchestrator._SESSION_LOCKS) == 0
+
+
+def test_concurrent_sync_turns_keep_session_invariants(monkeypatch, server_history):
+    def slow_reply(agent_input):
+        time.sleep(random.uniform(0, 0.002))
+        return _reply(agent_input)
+
+    monkeypatch.setattr(orchestrator, "generate_reply", slow_reply)
+    session_ids = ["sess-hot", "sess-cold-1", "sess-cold-2"]
+    turns = 24
+
+    def worker(offset):
+        for i in range(turns // 4):
+            for session_id in session_ids:
+                orchestrator.handle_request(_payload(session_id, f"verify {offset}-{i}"))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    _check_invariants(session_ids, turns)
+
+
+def test_concurrent_async_turns_keep_session_invariants(monkeypatch, server_history):
+    async def slow_reply(agent_input):
+        await asyncio.sleep(random.uniform(0, 0.002))
+        return _reply(agent_input)
+
+    monkeypatch.setattr(orchestrator, "generate_reply_async", slow_reply)
+    session_ids = [f"sess-async-{n}" for n in range(5)]
+    turns = 20
+
+    async def run():
+        await asyncio.gather(
+            *[
+                orchestrator.handle_request_async(_payload(session_id, f"verify {i}"))
+                for i in range(turns)
+                for session_id in session_ids
+            ]
+        )
+
+    asyncio.run(run())
+
+    _check_invariants(session_ids, turns)
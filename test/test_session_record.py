@@ -0,0 +1,58 @@
+from contracts.common_types import Message
+from orchestrator.session_record import RuntimeState, SessionRecord
+
+
+def test_merge_reports_only_new_intelligence():
+    record = SessionRecord()
+
+    assert record.merge_intelligence({"upiIds": []}) == {}
+    assert record.intelligence is None
+
+    assert record.merge_intelligence({"upiIds": ["scammer@upi"]}) == {"upiIds": ["scammer@upi"]}
+    assert record.merge_intelligence({"upiIds": ["scammer@upi"]}) == {}
+    assert record.intelligence_dict()["upiIds"] == ["scammer@upi"]
+    assert record.intelligence_dict()["phoneNumbers"] == []
+
+
+def test_intelligence_present_follows_field_order():
+    record = SessionRecord()
+    assert record.intelligence_present() == (False, False, False, False, False)
+
+    record.merge_intelligence({"upiIds": ["scammer@upi"], "suspiciousKeywords": ["urgent"]})
+    assert record.intelligence_present() == (False, True, False, False, True)
+
+
+def test_json_round_trip():
+    record = SessionRecord()
+    record.state = RuntimeState.ENGAGING
+    record.total_messages = 4
+    record.merge_intelligence({"phoneNumbers": ["9876543210"], "suspiciousKeywords": ["otp"]})
+
+    restored = SessionRecord.from_json(record.to_json())
+
+    assert restored.state is RuntimeState.ENGAGING
+    assert restored.total_messages == 4
+    assert restored.intelligence_dict() == record.intelligence_dict()
+
+
+def test_stored_history_is_bounded():
+    record = SessionRecord()
+    for i in range(5):
+        record.append_history(
+            [Message(sender="scammer", text=str(i), timestamp="2026-01-01T00:00:00Z")], 3
+        )
+
+    assert [m.text for m in record.history] == ["2", "3", "4"]
+    restored = SessionRecord.from_json(record.to_json())
+    assert [m.text for m in restored.history] == ["2", "3", "4"]
+    assert restored.history_start == 2
+
+
+def test_records_from_older_rows_still_load():
+    old_row = '[2, 4, 2, 1, 0, false, null]'
+
+    record = SessionRecord.from_json(old_row)
+
+    assert record.state is RuntimeState.ENGAGING
+    assert record.history is None
+    assert record.extracted_upto == 0
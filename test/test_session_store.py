@@ -0,0 +1,130 @@
+import multiprocessing
+
+import pytest
+
+from orchestrator.session_store import InMemorySessionStore, SQLiteSessionStore
+
+
+def _new_session():
+    return {"runtimeState": "NEW_MESSAGE", "totalMessages": 0}
+
+
+def _increment(path: str, turns: int):
+    store = SQLiteSessionStore(path)
+    for _ in range(turns):
+        with store.transaction("sess-shared", _new_session) as session:
+            session["totalMessages"] += 1
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+
+
+def test_transaction_creates_and_persists_session(store):
+    with store.transaction("sess-1", _new_session) as session:
+        session["runtimeState"] = "SUSPECTED_SCAM"
+
+    assert store.get("sess-1")["runtimeState"] == "SUSPECTED_SCAM"
+    assert len(store) == 1
+
+
+def test_failed_transaction_is_rolled_back(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+
+    with pytest.raises(RuntimeError):
+        with store.transaction("sess-2", _new_session) as session:
+            session["totalMessages"] = 99
+            raise RuntimeError("boom")
+
+    assert store.get("sess-2") is None
+
+
+def test_sqlite_store_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    SQLiteSessionStore(path)
+
+    workers = [
+        multiprocessing.Process(target=_increment, args=(path, 50))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert SQLiteSessionStore(path).get("sess-shared")["totalMessages"] == 200
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_idle_sessions_expire():
+    clock = _Clock()
+    store = InMemorySessionStore(idle_ttl_seconds=60, clock=clock)
+
+    with store.transaction("sess-old", _new_session):
+        pass
+    clock.now = 120
+    with store.transaction("sess-new", _new_session):
+        pass
+
+    assert store.get("sess-old") is None
+    assert store.stats()["evictedExpired"] == 1
+
+
+def test_closed_sessions_are_evicted_before_live_ones():
+    store = InMemorySessionStore(
+        max_entries=2,
+        is_closed=lambda s: s["runtimeState"] == "CLOSED",
+    )
+
+    with store.transaction("sess-live", _new_session):
+        pass
+    with store.transaction("sess-closed", _new_session) as session:
+        session["runtimeState"] = "CLOSED"
+    with store.transaction("sess-third", _new_session):
+        pass
+
+    assert store.get("sess-live") is not None
+    assert store.get("sess-closed") is None
+    assert store.stats()["evictedClosed"] == 1
+
+
+def test_least_recently_used_session_is_evicted():
+    store = InMemorySessionStore(max_entries=2)
+
+    for session_id in ("sess-a", "sess-b", "sess-a", "sess-c"):
+        with store.transaction(session_id, _new_session):
+            pass
+
+    assert store.get("sess-b") is None
+    assert store.get("sess-a") is not None
+    assert store.stats()["evictedLru"] == 1
+    assert store.stats()["memoryBytes"] > 0
+
+
+def test_sqlite_store_reclaims_closed_sessions_first(tmp_path):
+    store = SQLiteSessionStore(
+        str(tmp_path / "sessions.sqlite3"),
+        max_entries=2,
+        is_closed=lambda s: s["runtimeState"] == "CLOSED",
+    )
+
+    with store.transaction("sess-live", _new_session):
+        pass
+    with store.transaction("sess-closed", _new_session) as session:
+        session["runtimeState"] = "CLOSED"
+    with store.transaction("sess-third", _new_session):
+        pass
+    store.evict()
+
+    assert len(store) == 2
+    assert store.get("sess-closed") is None
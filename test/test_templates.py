@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from aiagent import agent
+from aiagent.reply_cache import ReplyCache
+from aiagent.templates import _ENGLISH, _HINDI, template_reply
+from contracts.common_types import Message, Metadata, ResponseStyle
+from contracts.trusted import AgentConstraints, AgentInput
+
+
+def _message(sender: str, text: str) -> Message:
+    return Message(sender=sender, text=text, timestamp="2026-01-01T10:00:00+00:00")
+
+
+def _agent_input(text: str, language="English") -> AgentInput:
+    return AgentInput(
+        sessionId="sess-templates",
+        currentMessage=_message("scammer", text),
+        history=[_message("scammer", "Your account is blocked")],
+        metadata=Metadata(channel="SMS", language=language, locale="IN"),
+        responseStyle=ResponseStyle.CONFUSED,
+        constraints=AgentConstraints(noAccusation=True, noIllegalAdvice=True, softTone=True),
+    )
+
+
+def _fake_clients(monkeypatch, delay: float, reply: str = "Which bank is this from?"):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        time.sleep(delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    async def create_async(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    monkeypatch.setattr(agent, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(
+        agent,
+        "get_client",
+        lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))),
+    )
+    monkeypatch.setattr(
+        agent,
+        "get_async_client",
+        lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create_async))),
+    )
+    monkeypatch.setattr(agent, "_REPLY_CACHE", ReplyCache(100, 0, 0))
+    monkeypatch.setattr(agent, "AGENT_TEMPLATE_FALLBACK", True)
+    return calls
+
+
+def test_template_follows_style_and_language():
+    assert template_reply("s1", ResponseStyle.NAIVE, "English", []) in _ENGLISH[ResponseStyle.NAIVE]
+    assert template_reply("s1", ResponseStyle.HESITANT, "hi", []) in _HINDI[ResponseStyle.HESITANT]
+    # Unknown language -> English; styles without phrases -> neutral
+    assert template_reply("s1", ResponseStyle.CONFUSED, "Tamil", []) in _ENGLISH[ResponseStyle.CONFUSED]
+    assert template_reply("s1", ResponseStyle.URGENT, "English", []) in _ENGLISH[ResponseStyle.NEUTRAL]
+
+
+def test_template_does_not_repeat_within_a_session():
+    history = []
+    for _ in range(len(_ENGLISH[ResponseStyle.CONFUSED])):
+        reply = template_reply("sess", ResponseStyle.CONFUSED, "English", history)
+        history += [_message("scammer", "Send the OTP"), _message("user", reply)]
+
+    sent = [m.text for m in history if m.sender == "user"]
+    assert sorted(sent) == sorted(_ENGLISH[ResponseStyle.CONFUSED])
+
+
+def test_missing_api_key_answers_from_templates(monkeypatch):
+    monkeypatch.setattr(agent, "GROQ_API_KEY", None)
+    monkeypatch.setattr(agent, "AGENT_TEMPLATE_FALLBACK", True)
+
+    output = agent.generate_reply(_agent_input("Send OTP now", language="Hindi"))
+
+    assert output.status == "success"
+    assert output.reply in _HINDI[ResponseStyle.CONFUSED]
+
+
+def test_slow_llm_is_cut_off_and_its_late_reply_cached(monkeypatch):
+    calls = _fake_clients(monkeypatch, delay=0.3)
+    monkeypatch.setattr(agent, "AGENT_REPLY_BUDGET_SECONDS", 0.05)
+    cached = threading.Event()
+    remember = agent._remember
+    monkeypatch.setattr(agent, "_remember", lambda key, output: (remember(key, output), cached.set())[0])
+
+    started = time.perf_counter()
+    output = agent.generate_reply(_agent_input("Send OTP to 9876543210"))
+
+    assert time.perf_counter() - started < 0.25
+    assert output.reply in _ENGLISH[ResponseStyle.CONFUSED]
+    assert cached.wait(2)
+    assert agent.generate_reply(_agent_input("Send OTP to 9123456789")).reply == "Which bank is this from?"
+    assert len(calls) == 1
+
+
+def test_slow_llm_is_cut_off_async(monkeypatch):
+    calls = _fake_clients(monkeypatch, delay=0.3)
+    monkeypatch.setattr(agent, "AGENT_REPLY_BUDGET_SECONDS", 0.05)
+
+    async def run():
+        started = time.perf_counter()
+        output = await agent.generate_reply_async(_agent_input("Send OTP to 9876543210"))
+        elapsed = time.perf_counter() - started
+        # Let the abandoned call finish on the loop
+        await asyncio.sleep(0.4)
+        later = await agent.generate_reply_async(_agent_input("Send OTP to 9123456789"))
+        return output, elapsed, later
+
+    output, elapsed, later = asyncio.run(run())
+
+    assert elapsed < 0.25
+    assert output.reply in _ENGLISH[ResponseStyle.CONFUSED]
+    assert later.reply == "Which bank is this from?"
+    assert len(calls) == 1
+
+
+def test_llm_within_budget_is_used(monkeypatch):
+    _fake_clients(monkeypatch, delay=0)
+    monkeypatch.setattr(agent, "AGENT_REPLY_BUDGET_SECONDS", 1.0)
+
+    assert agent.generate_reply(_agent_input("Send OTP now")).reply == "Which bank is this from?"
+    assert asyncio.run(agent.generate_reply_async(_agent_input("Pay the fee"))).reply == "Which bank is this from?"
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+from aiagent import agent
+from aiagent.reply_cache import ReplyCache
+from contracts import agent_contract, decision_contract
+from contracts import trusted
+from contracts.common_types import Message, Metadata, ResponseStyle
+from decision.decision import decide
+
+
+def _message(sender: str, text: str) -> Message:
+    return Message(sender=sender, text=text, timestamp="2026-01-01T10:00:00+00:00")
+
+
+def _decision_fields(state: str, text: str, upi_ids, quiet_turns: int) -> dict:
+    return {
+        "sessionId": "sess-trusted",
+        "currentState": state,
+        "currentMessage": _message("scammer", text),
+        "history": [_message("scammer", "Hello")],
+        "metadata": Metadata(channel="SMS", language="English", locale="IN"),
+        "extractedIntelligence": {
+            "bankAccounts": [],
+            "upiIds": upi_ids,
+            "phishingLinks": [],
+            "phoneNumbers": [],
+            "suspiciousKeywords": [],
+        },
+        "sessionStats": {
+            "totalMessages": 4,
+            "scammerMessages": 2,
+            "agentMessages": 2,
+            "noNewIntelligenceTurns": quiet_turns,
+        },
+        "flags": {"isFirstMessage": False, "hasHistory": True},
+    }
+
+
+def _trusted_decision_input(fields: dict) -> trusted.DecisionInput:
+    return trusted.DecisionInput(
+        **{
+            **fields,
+            "extractedIntelligence": trusted.IntelligencePresent(
+                **{field: bool(values) for field, values in fields["extractedIntelligence"].items()}
+            ),
+            "sessionStats": trusted.SessionStats(**fields["sessionStats"]),
+            "flags": trusted.DecisionFlags(**fields["flags"]),
+        }
+    )
+
+
+def test_trusted_input_decides_like_the_pydantic_contract():
+    cases = [
+        ("NEW_MESSAGE", "Your account is blocked, verify now", [], 0),
+        ("NEW_MESSAGE", "Are we meeting tomorrow?", [], 0),
+        ("SUSPECTED_SCAM", "Pay to refund@okaxis", ["refund@okaxis"], 0),
+        ("ENGAGING", "Hello?", ["refund@okaxis"], 3),
+        ("INTELLIGENCE_SATURATED", "Reply fast", ["refund@okaxis"], 4),
+        ("SOFT_EXIT", "Sir?", ["refund@okaxis"], 5),
+    ]
+    for case in cases:
+        fields = _decision_fields(*case)
+        from_contract = decide(decision_contract.DecisionInput(**fields))
+        from_trusted = decide(_trusted_decision_input(fields))
+
+        assert trusted.fields_dict(from_trusted) == trusted.fields_dict(from_contract), case
+
+
+def test_trusted_input_gives_the_same_agent_output(monkeypatch):
+    prompts = []
+
+    def create(**kwargs):
+        prompts.append(kwargs["messages"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Which account is it?"))])
+
+    monkeypatch.setattr(agent, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(
+        agent,
+        "get_client",
+        lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))),
+    )
+    monkeypatch.setattr(agent, "_REPLY_CACHE", ReplyCache(0, 0, 0))
+    monkeypatch.setattr(agent, "AGENT_REPLY_BUDGET_SECONDS", 0)
+
+    fields = {
+        "sessionId": "sess-trusted-agent",
+        "currentMessage": _message("scammer", "Send the OTP now"),
+        "history": [_message("scammer", "Your account is blocked"), _message("user", "Which bank?")],
+        "metadata": Metadata(channel="SMS", language="English", locale="IN"),
+        "responseStyle": ResponseStyle.CONFUSED,
+    }
+    constraints = {"noAccusation": True, "noIllegalAdvice": True, "softTone": True}
+
+    from_contract = agent.generate_reply(
+        agent_contract.AgentInput(**fields, constraints=agent_contract.AgentConstraints(**constraints))
+    )
+    from_trusted = agent.generate_reply(
+        trusted.AgentInput(**fields, constraints=trusted.AgentConstraints(**constraints))
+    )
+
+    assert from_trusted == from_contract
+    assert prompts[0] == prompts[1]